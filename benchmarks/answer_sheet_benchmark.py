@@ -0,0 +1,69 @@
+"""
+Benchmark of the answer sheet template compared to drawing every box of the answer sheet one by one.
+
+Run from the root of the repository: python benchmarks/answer_sheet_benchmark.py
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from checkmark.generator.pdf import PDF, PDFData
+from checkmark.generator.question import Question
+
+
+def _pdf_data(student_number: int, question_number: int) -> PDFData:
+    questions = [
+        Question(index, f"Árvíztűrő tükörfúrógép kérdés {index}?", ["Első", "Második", "Harmadik", "Negyedik"], 0)
+        for index in range(1, question_number + 1)
+    ]
+    return PDFData(
+        f"Diák {student_number}",
+        "9-b",
+        "Földrajz",
+        "5. Németország vízrajza",
+        "2042-01-01",
+        questions,
+        "",
+        "PASSWORD",
+    )
+
+
+def _time_answer_sheets(documents: int, question_number: int, *, template: bool) -> float:
+    """Average time of adding the answer sheet to a single document."""
+    total = 0.0
+    for student_number in range(documents):
+        pdf = PDF(_pdf_data(student_number, question_number))
+        pdf.add_page()
+        pdf.add_questions()
+        pdf.add_page()
+        start = time.perf_counter()
+        if template:
+            pdf.add_checkmark_boxes()
+        else:
+            pdf.draw_checkmark_boxes()
+        total += time.perf_counter() - start
+    return total / documents
+
+
+def main() -> None:
+    """Compares the answer sheet template and the per-call drawing."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=30, help="Number of documents per measurement")
+    parser.add_argument("--questions", type=int, default=20, help="Number of questions per document")
+    args = parser.parse_args()
+
+    # Warm up, so the template run does not pay for rendering the template.
+    _time_answer_sheets(1, args.questions, template=True)
+    direct = _time_answer_sheets(args.documents, args.questions, template=False)
+    template = _time_answer_sheets(args.documents, args.questions, template=True)
+    print(f"Per-call drawing: {direct * 1000:.2f} ms/answer sheet")  # noqa: T201
+    print(f"Template:         {template * 1000:.2f} ms/answer sheet")  # noqa: T201
+    print(f"Speedup:          {direct / template:.2f}x")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark of the process-wide font cache used by the PDF documents.
+
+Run from the root of the repository: python benchmarks/font_cache_benchmark.py
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from checkmark.generator.pdf import PDF, PDFData
+from checkmark.generator.question import Question
+
+
+class UncachedPDF(PDF):
+    """PDF document that parses the font file for every document, as fpdf2 does by default."""
+
+    def add_cached_font(self: UncachedPDF, font_path: str, family: str) -> None:
+        """Adds the font without the process-wide cache."""
+        self.add_font(fname=font_path, family=family)
+
+
+def _pdf_data(student_number: int) -> PDFData:
+    questions = [
+        Question(index, f"Árvíztűrő tükörfúrógép kérdés {index}?", ["Első", "Második", "Harmadik", "Negyedik"], 0)
+        for index in range(1, 21)
+    ]
+    return PDFData(
+        f"Diák {student_number}",
+        "9-b",
+        "Földrajz",
+        "5. Németország vízrajza",
+        "2042-01-01",
+        questions,
+        "",
+        "PASSWORD",
+    )
+
+
+def _time_documents(pdf_class: type[PDF], documents: int) -> float:
+    """Average time of creating and writing out a single document."""
+    start = time.perf_counter()
+    for student_number in range(documents):
+        pdf = pdf_class(_pdf_data(student_number))
+        pdf.add_page()
+        pdf.add_questions()
+        pdf.add_page()
+        pdf.add_checkmark_boxes()
+        pdf.output()
+    return (time.perf_counter() - start) / documents
+
+
+def main() -> None:
+    """Compares the cached and uncached font loading."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=30, help="Number of documents per measurement")
+    args = parser.parse_args()
+
+    # Warm up, so the cached run does not pay for the first parse.
+    _time_documents(PDF, 1)
+    uncached = _time_documents(UncachedPDF, args.documents)
+    cached = _time_documents(PDF, args.documents)
+    print(f"Uncached font: {uncached * 1000:.1f} ms/document")  # noqa: T201
+    print(f"Cached font:   {cached * 1000:.1f} ms/document")  # noqa: T201
+    print(f"Speedup:       {uncached / cached:.2f}x")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
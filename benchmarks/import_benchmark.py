@@ -0,0 +1,109 @@
+"""
+Startup time benchmark of the checkmark commands, based on the output of python -X importtime.
+
+Each command imports its module in a fresh interpreter, the cumulative import time of the module is
+compared to the budget of the command. The modules that must not be imported at startup are checked as well.
+
+Run from the root of the repository:
+    python benchmarks/import_benchmark.py
+    python benchmarks/import_benchmark.py --budget cli=20 --repeat 10
+
+Exits with 1 if a command is over its budget or imports a forbidden module.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+HEAVY_MODULES = ["pandas", "fpdf", "cryptography", "qrcode", "requests", "ttkbootstrap", "cv2", "pyzbar"]
+
+
+@dataclass
+class Command:
+    """Module imported when a command starts, its import time budget and the modules it must not import."""
+
+    module: str
+    budget_ms: float
+    forbidden_modules: list[str] = field(default_factory=list)
+
+
+COMMANDS = {
+    # checkmark --version, and the entry point of every other command
+    "cli": Command("checkmark.cli", 25, HEAVY_MODULES),
+    "index": Command("checkmark.generator.catalog", 60, HEAVY_MODULES),
+    "generate": Command(
+        "checkmark.generator.generator_interface",
+        250,
+        ["pandas", "fpdf", "cryptography", "qrcode", "requests", "cv2", "pyzbar"],
+    ),
+    "evaluate": Command("checkmark.evaluator.evaluator_interface", 200, ["pandas", "fpdf", "cv2", "pyzbar"]),
+}
+
+
+def measure_import(module: str) -> tuple[float, set[str]]:
+    """Imports the module in a fresh interpreter.
+
+    Returns:
+        tuple[float, set[str]]: Cumulative import time of the module in milliseconds and the imported modules.
+    """
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    imported_modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        imported_modules.add(name.strip())
+        if name.strip() == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, imported_modules
+
+
+def main() -> int:
+    """Measures the startup of every command and checks the budgets."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measurements, the fastest one is used")
+    parser.add_argument(
+        "--budget",
+        type=str,
+        nargs="+",
+        default=[],
+        help="Override the budget of a command in milliseconds, e.g. cli=20",
+        metavar="COMMAND=MS",
+    )
+    args = parser.parse_args()
+    for budget in args.budget:
+        name, milliseconds = budget.split("=")
+        COMMANDS[name].budget_ms = float(milliseconds)
+
+    failures = []
+    print(f"{'Command':<12}{'Module':<45}{'Import [ms]':>12}{'Budget [ms]':>12}")  # noqa: T201
+    for name, command in COMMANDS.items():
+        measurements = [measure_import(command.module) for _ in range(args.repeat)]
+        milliseconds = min(milliseconds for milliseconds, _ in measurements)
+        imported_modules = measurements[0][1]
+        print(f"{name:<12}{command.module:<45}{milliseconds:>12.1f}{command.budget_ms:>12.1f}")  # noqa: T201
+
+        if milliseconds > command.budget_ms:
+            failures.append(f"{name}: {milliseconds:.1f} ms is over the budget of {command.budget_ms:.1f} ms")
+        forbidden_imports = sorted(set(command.forbidden_modules) & imported_modules)
+        if forbidden_imports:
+            failures.append(f"{name}: imports {', '.join(forbidden_imports)} at startup")
+
+    for failure in failures:
+        print(f"Regression! {failure}", file=sys.stderr)  # noqa: T201
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
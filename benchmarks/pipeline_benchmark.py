@@ -0,0 +1,246 @@
+"""
+Benchmark suite of the assessment generation pipeline.
+
+The stages of the pipeline are measured on a synthetic question bank and synthetic rosters.
+For every stage the duration, the peak memory allocated by Python and the size of the output is reported.
+
+Run from the root of the repository:
+    python benchmarks/pipeline_benchmark.py --save-baseline benchmarks/baseline.json
+    python benchmarks/pipeline_benchmark.py --compare benchmarks/baseline.json
+
+The comparison run exits with 1 if a stage got slower (or allocates more memory) than the allowed tolerance.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+from checkmark.generator.bank import import_excel_banks, read_topic_questions
+from checkmark.generator.generate import CheckmarkFields, GenerationOptions, generate_assessment
+from checkmark.generator.pdf import PDFData, create_pdf, create_qr_matrix
+from checkmark.generator.question import QuestionCache, read_questions_from_excel, select_questions
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from checkmark.generator.question import QuestionBank
+
+CLASS = "9-x"
+SUBJECT = "Benchmark"
+TOPIC = "1. Szintetikus téma"
+DATE = "2042-01-01"
+QUESTION_NUMBER = 20
+
+
+@dataclass
+class StageResult:
+    """Measurements of a single stage."""
+
+    seconds: float
+    peak_memory: int
+    output_bytes: int = 0
+
+
+def _create_workspace(workspace: Path, bank_size: int, roster_sizes: list[int]) -> None:
+    """Creates the data directory of the generator with a synthetic question bank and rosters."""
+    (workspace / "data/app").mkdir(parents=True)
+    shutil.copy(Path("data/app/FreeSans.ttf"), workspace / "data/app/FreeSans.ttf")
+
+    generator = random.Random(0)
+    questions = pd.DataFrame(
+        {
+            "Feladat sorszám": range(1, bank_size + 1),
+            "Kérdés": [f"Árvíztűrő tükörfúrógép kérdés {index}?" for index in range(1, bank_size + 1)],
+            **{letter: [f"{letter} válasz {index}" for index in range(1, bank_size + 1)] for letter in "ABCD"},
+            "Megoldás": [generator.choice("ABCD") for _ in range(bank_size)],
+        },
+    )
+    class_number = CLASS.split("-")[0]
+    (workspace / f"data/assessments/{SUBJECT}-{class_number}").mkdir(parents=True)
+    questions.to_excel(workspace / _questions_path(), index=False)
+
+    (workspace / "data/classes").mkdir(parents=True)
+    for roster_size in roster_sizes:
+        students = ", ".join(f"Diák {number:04d}" for number in range(roster_size))
+        (workspace / f"data/classes/{CLASS}{roster_size}.csv").write_text(students + "\n", encoding="utf-8")
+
+
+def _questions_path() -> str:
+    class_number = CLASS.split("-")[0]
+    return f"data/assessments/{SUBJECT}-{class_number}/{TOPIC.replace(' ', '_').replace('.', '')}.xlsx"
+
+
+def _students(roster_size: int) -> list[str]:
+    with Path(f"data/classes/{CLASS}{roster_size}.csv").open("r", encoding="utf-8") as file_handle:
+        return file_handle.readline().strip().split(", ")
+
+
+def _measure(stage: Callable[[], int | None]) -> StageResult:
+    """Runs the stage twice, first for the duration and then for the peak memory under tracemalloc."""
+    start = time.perf_counter()
+    output_bytes = stage() or 0
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    stage()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return StageResult(seconds, peak_memory, output_bytes)
+
+
+def _pdf_data_list(all_questions: QuestionBank, students: list[str]) -> list[PDFData]:
+    return [
+        PDFData(
+            student,
+            CLASS,
+            SUBJECT,
+            TOPIC,
+            DATE,
+            select_questions(all_questions, QUESTION_NUMBER, random_questions=True, random_option_order=True),
+            "",
+            "PASSWORD",
+        )
+        for student in students
+    ]
+
+
+def run_benchmarks(roster_sizes: list[int], bank_size: int, workers: int) -> dict[str, StageResult]:
+    """Runs every stage of the pipeline in a temporary workspace and returns the measurements."""
+    results: dict[str, StageResult] = {}
+    package_root = Path.cwd()
+    with tempfile.TemporaryDirectory() as workspace:
+        _create_workspace(Path(workspace), bank_size, roster_sizes)
+        os.chdir(workspace)
+        try:
+            random.seed(0)
+            results["read_questions_from_excel"] = _measure(lambda: len(read_questions_from_excel(_questions_path())))
+            cache = QuestionCache()
+            read_questions_from_excel(_questions_path(), cache)
+            results["read_questions_from_excel[cached]"] = _measure(
+                lambda: len(read_questions_from_excel(_questions_path(), cache)),
+            )
+            import_excel_banks()
+            results["read_topic_questions[bank]"] = _measure(lambda: len(read_topic_questions(_questions_path())))
+            all_questions = read_questions_from_excel(_questions_path())
+
+            for roster_size in roster_sizes:
+                students = _students(roster_size)
+                pdf_data_list = _pdf_data_list(all_questions, students)
+                solution_data = [create_pdf(pdf_data).create_solution_qr_data() for pdf_data in pdf_data_list]
+
+                results[f"select_questions[{roster_size}]"] = _measure(
+                    lambda students=students: len(_pdf_data_list(all_questions, students)),
+                )
+                results[f"create_qr[{roster_size}]"] = _measure(
+                    lambda solution_data=solution_data: sum(len(create_qr_matrix(data)) for data in solution_data),
+                )
+                results[f"create_pdf[{roster_size}]"] = _measure(
+                    lambda pdf_data_list=pdf_data_list: sum(
+                        len(create_pdf(pdf_data).output()) for pdf_data in pdf_data_list
+                    ),
+                )
+                checkmark_fields = CheckmarkFields(
+                    CLASS,
+                    SUBJECT,
+                    TOPIC,
+                    students,
+                    online_evaluator=False,
+                    date=DATE,
+                    question_number=QUESTION_NUMBER,
+                    random_question_order=True,
+                    random_option_order=True,
+                )
+                results[f"generate_assessment[{roster_size}]"] = _measure(
+                    lambda checkmark_fields=checkmark_fields: _generate(checkmark_fields, workers),
+                )
+        finally:
+            os.chdir(package_root)
+    return results
+
+
+def _generate(checkmark_fields: CheckmarkFields, workers: int) -> int:
+    """Generates the assessments and returns the size of the generated files."""
+    generate_assessment(checkmark_fields, GenerationOptions(workers=workers))
+    generated_path = Path(f"data/generated/{DATE}_{SUBJECT}_{CLASS}")
+    output_bytes = sum(path.stat().st_size for path in generated_path.glob("*.pdf"))
+    shutil.rmtree(generated_path)
+    return output_bytes
+
+
+def compare(
+    results: dict[str, StageResult],
+    baseline: dict[str, StageResult],
+    tolerance: float,
+    min_seconds: float = 0.01,
+) -> list[str]:
+    """Returns the stages that are slower or use more memory than the baseline allows.
+
+    Differences below min_seconds are ignored, as the fastest stages are dominated by timer noise.
+    """
+    regressions = []
+    for stage, result in results.items():
+        if stage not in baseline:
+            continue
+        reference = baseline[stage]
+        slowdown = result.seconds - reference.seconds
+        if slowdown > min_seconds and result.seconds > reference.seconds * (1 + tolerance):
+            regressions.append(f"{stage}: {reference.seconds:.3f} s -> {result.seconds:.3f} s")
+        if result.peak_memory > reference.peak_memory * (1 + tolerance):
+            regressions.append(f"{stage}: {reference.peak_memory} B -> {result.peak_memory} B peak memory")
+    return regressions
+
+
+def main() -> int:
+    """Runs the benchmarks, then saves or compares the baseline."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 300, 3000], help="Roster sizes")
+    parser.add_argument("--bank-size", type=int, default=200, help="Number of questions in the bank")
+    parser.add_argument("--workers", type=int, default=1, help="Workers of generate_assessment")
+    parser.add_argument("--save-baseline", type=str, help="Save the results as the baseline to this file")
+    parser.add_argument("--compare", type=str, help="Compare the results to the baseline of this file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.bank_size, args.workers)
+    print(f"{'Stage':<40}{'Time [s]':>12}{'Peak memory [MB]':>20}{'Output [kB]':>14}")  # noqa: T201
+    for stage, result in results.items():
+        print(  # noqa: T201
+            f"{stage:<40}{result.seconds:>12.3f}{result.peak_memory / 1e6:>20.2f}{result.output_bytes / 1e3:>14.1f}",
+        )
+
+    if args.save_baseline:
+        baseline_data = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "stages": {stage: asdict(result) for stage, result in results.items()},
+        }
+        Path(args.save_baseline).write_text(json.dumps(baseline_data, indent=4), encoding="utf-8")
+
+    if args.compare:
+        baseline_data = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        baseline = {stage: StageResult(**result) for stage, result in baseline_data["stages"].items()}
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression! {regression}", file=sys.stderr)  # noqa: T201
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
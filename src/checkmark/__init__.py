@@ -4,7 +4,6 @@ Init file for checkmark package.
 @author "Daniel Mizsak" <info@pythonvilag.hu>
 """
 
-import importlib.metadata
 import locale
 
 try:
@@ -12,7 +11,15 @@ try:
 except locale.Error:
     locale.setlocale(locale.LC_ALL, "C.UTF-8")
 
-__version__ = importlib.metadata.version("checkmark-assistant")
+
+def __getattr__(name: str) -> str:
+    """Reads the version lazily, as reading the package metadata slows down the startup."""
+    if name == "__version__":
+        import importlib.metadata
+
+        return importlib.metadata.version("checkmark-assistant")
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
 
 
 # Variables for submodules
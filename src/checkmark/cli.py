@@ -5,12 +5,8 @@ Command Line Interface for the Checkmark application.
 """
 
 import argparse
-import importlib.metadata
 import sys
 
-from checkmark.evaluator.evaluator_interface import EvaluatorInterface
-from checkmark.generator.generator_interface import GeneratorInterface
-
 
 def _parse_arguments() -> argparse.Namespace:
     """Parses command line arguments."""
@@ -33,27 +29,227 @@ def _parse_arguments() -> argparse.Namespace:
         default="HUN",
         choices=["HUN", "ENG"],
     )
+    generate_parser.add_argument(
+        "--batch",
+        type=str,
+        help="Generate the jobs of the given JSON file without the graphical interface",
+        required=False,
+        metavar="JOBS",
+    )
+    generate_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes used in batch mode (default: number of CPUs)",
+        required=False,
+        default=None,
+    )
+    generate_parser.add_argument(
+        "--merged",
+        action="store_true",
+        help="Write the assessments of each job into a single print-ordered PDF (requires the merged extra)",
+        required=False,
+    )
+    generate_parser.add_argument(
+        "--duplex",
+        action="store_true",
+        help="Start every assessment of a merged PDF on a new sheet for double-sided printing",
+        required=False,
+    )
+    generate_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only generate the assessments whose questions, pocket or student changed since the last run",
+        required=False,
+    )
+
+    index_parser = subparsers.add_parser("index", help="Build the catalog of the classes, subjects and topics")
+    index_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Read every question bank and class again instead of only the changed ones",
+        required=False,
+    )
 
-    subparsers.add_parser("evaluate", help="Graphical User Interface for Assessment Evaluation")
+    bank_parser = subparsers.add_parser("bank", help="Manage the question bank databases")
+    bank_subparsers = bank_parser.add_subparsers(title="Bank commands", dest="bank_command", required=True)
+    bank_import_parser = bank_subparsers.add_parser(
+        "import",
+        help="Import the Excel files of data/assessments into the question bank database of each subject",
+    )
+    bank_import_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Import the unchanged Excel files as well",
+        required=False,
+    )
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Graphical User Interface for Assessment Evaluation")
+    evaluate_parser.add_argument(
+        "--input",
+        type=str,
+        help="Evaluate the scans (images, multi-page TIFF or PDF files) of the given directory or glob pattern "
+        "without the graphical interface",
+        required=False,
+        metavar="SCANS",
+    )
+    evaluate_parser.add_argument(
+        "--output",
+        type=str,
+        help="Write the results into the given CSV or JSON file as the sheets are evaluated",
+        required=False,
+        metavar="RESULTS",
+    )
+    evaluate_parser.add_argument(
+        "--pocket",
+        type=str,
+        help="pocket_data.json of the assessments, used for the password and the names of the students "
+        "(required for the compact solution QR codes)",
+        required=False,
+    )
+    evaluate_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: number of CPUs)",
+        required=False,
+        default=None,
+    )
 
     return parser.parse_args()
 
 
-def main() -> int:
+def main() -> int:  # noqa: PLR0911
     """Main function of the checkmark application."""
     args = _parse_arguments()
 
     if args.version:
-        print(f"Checkmark v{importlib.metadata.version('checkmark-assistant')}")  # noqa: T201
+        from checkmark import __version__
+
+        print(f"Checkmark v{__version__}")  # noqa: T201
         return 0
 
+    if args.command == "generate" and args.batch:
+        return _generate_batch(
+            args.batch,
+            args.workers,
+            merged=args.merged,
+            duplex=args.duplex,
+            incremental=args.incremental,
+        )
+
+    if args.command == "evaluate" and args.input:
+        return _evaluate_scans(args.input, args.output, args.pocket, args.workers)
+
+    if args.command == "index":
+        return _build_index(rebuild=args.rebuild)
+
+    if args.command == "bank" and args.bank_command == "import":
+        return _import_banks(force=args.force)
+
     if args.command == "generate":
+        from checkmark.generator.generator_interface import GeneratorInterface
+
         GeneratorInterface(args.language).mainloop()
         return 0
 
     if args.command == "evaluate":
-        EvaluatorInterface().mainloop()
+        from checkmark.evaluator.evaluator_interface import EvaluatorInterface
+
+        EvaluatorInterface(args.pocket).mainloop()
         return 0
 
     print("Error! No command given. Use --help for more information.", file=sys.stderr)  # noqa: T201
     return 1
+
+
+def _generate_batch(jobs_path: str, workers: int | None, *, merged: bool, duplex: bool, incremental: bool) -> int:
+    """Generates the assessments of a job specification file and prints a throughput summary."""
+    from checkmark.generator.batch import read_batch_jobs, run_batch
+    from checkmark.generator.generate import GenerationOptions
+
+    try:
+        jobs = read_batch_jobs(jobs_path)
+    except (OSError, ValueError, KeyError) as exception:
+        print(f"Error! Could not read the batch jobs: {exception}", file=sys.stderr)  # noqa: T201
+        return 1
+
+    summary = run_batch(jobs, workers, GenerationOptions(merged=merged, duplex=duplex, incremental=incremental))
+    print(summary)  # noqa: T201
+    return 1 if summary.failed_jobs else 0
+
+
+def _evaluate_scans(input_path: str, output_path: str | None, pocket_path: str | None, workers: int | None) -> int:
+    """Evaluates the scans of a directory, prints each result as it finishes and a throughput summary."""
+    from checkmark.evaluator.bulk import ResultWriter, SheetResult, evaluate_scans, list_scans, read_pocket_credentials
+    from checkmark.evaluator.decode import MissingRosterError
+
+    paths = list_scans(input_path)
+    if not paths:
+        print(f"Error! No scans found: {input_path}", file=sys.stderr)  # noqa: T201
+        return 1
+    password, students = None, None
+    if pocket_path is not None:
+        try:
+            password, students = read_pocket_credentials(pocket_path)
+        except (OSError, ValueError, KeyError) as exception:
+            print(f"Error! Could not read the pocket data: {exception}", file=sys.stderr)  # noqa: T201
+            return 1
+
+    writer = ResultWriter(output_path) if output_path else None
+
+    def report(result: SheetResult) -> None:
+        if writer is not None:
+            writer.write(result)
+        outcome = (
+            f"{result.student} {result.score} [QR: {result.qr_strategy}]"
+            if result.success
+            else f"FAILED - {result.error}"
+        )
+        print(f"{result.label}: {outcome} ({result.seconds:.2f} s)", flush=True)  # noqa: T201
+
+    try:
+        summary = evaluate_scans(paths, workers, password, students, report)
+    except MissingRosterError:
+        print(  # noqa: T201
+            "Error! The scans have compact solution QR codes, their students can only be named with the pocket: "
+            "use --pocket with the pocket_data.json of the assessments.",
+            file=sys.stderr,
+        )
+        return 1
+    finally:
+        if writer is not None:
+            writer.close()
+    print(summary)  # noqa: T201
+    return 1 if summary.failed_sheets else 0
+
+
+def _build_index(*, rebuild: bool) -> int:
+    """Builds and saves the catalog of the data directory and prints its content."""
+    from checkmark.generator.catalog import CATALOG_PATH, build_catalog, read_catalog, write_catalog
+
+    catalog = build_catalog(previous=None if rebuild else read_catalog())
+    write_catalog(catalog)
+    for class_entry in catalog.classes:
+        print(f"{class_entry.class_}: {class_entry.roster_size} students")  # noqa: T201
+    for subject_entry in catalog.subjects:
+        for topic_entry in subject_entry.topics:
+            question_count = "invalid" if topic_entry.question_count is None else topic_entry.question_count
+            print(f"{subject_entry.directory}/{topic_entry.topic}: {question_count} questions")  # noqa: T201
+    topic_count = sum(len(subject_entry.topics) for subject_entry in catalog.subjects)
+    print(  # noqa: T201
+        f"Indexed {len(catalog.classes)} classes, {len(catalog.subjects)} subjects "
+        f"and {topic_count} topics into {CATALOG_PATH}.",
+    )
+    return 0
+
+
+def _import_banks(*, force: bool) -> int:
+    """Imports the Excel files into the question bank databases and prints the outcome of each file."""
+    from checkmark.generator.bank import import_excel_banks
+
+    results = import_excel_banks(force=force)
+    for result in results:
+        print(f"{result.path}: {result.status}" + (f" - {result.error}" if result.error else ""))  # noqa: T201
+    failed = sum(result.status == "failed" for result in results)
+    imported = sum(result.status == "imported" for result in results)
+    print(f"Imported {imported} of {len(results)} Excel files, {failed} failed.")  # noqa: T201
+    return 1 if failed else 0
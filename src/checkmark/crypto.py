@@ -0,0 +1,105 @@
+"""
+Encryption of the solution data, shared by the generator and the evaluator.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import base64
+import hmac
+import random
+import sys
+from functools import lru_cache
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.hashes import SHA256
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+
+class CryptoContext:
+    """Key derived from a pocket password, used to encrypt and decrypt the solution QR codes.
+
+    The context has no mutable state, so a single instance can be shared between threads.
+    """
+
+    def __init__(self: CryptoContext, password: str) -> None:
+        """Derives the key of the pocket password.
+
+        Args:
+            self (CryptoContext): The CryptoContext object.
+            password (str): The pocket password.
+        """
+        # The salt is the first 128 bits of a random generator seeded with 0. It is kept for compatibility
+        # with the already printed assessments, but generated without touching the global random state.
+        salt = random.Random(0).getrandbits(128).to_bytes(16, sys.byteorder)  # noqa: S311
+        kdf = PBKDF2HMAC(algorithm=SHA256(), length=32, salt=salt, iterations=1)
+        derived_key = kdf.derive(password.encode())
+        self.key = base64.urlsafe_b64encode(derived_key)
+        self.fernet = Fernet(self.key)
+
+        # Separate keys of the compact tokens, derived from the same password.
+        hkdf = HKDF(algorithm=SHA256(), length=48, salt=None, info=b"checkmark compact token")
+        compact_keys = hkdf.derive(derived_key)
+        self._compact_encryption_key = compact_keys[:16]
+        self._compact_signing_key = compact_keys[16:]
+
+    def encrypt(self: CryptoContext, message: str) -> bytes:
+        """Encrypts a message into a token."""
+        return self.fernet.encrypt(message.encode("utf-8"))
+
+    def decrypt(self: CryptoContext, token: bytes) -> str:
+        """Decrypts a token into the original message."""
+        return self.fernet.decrypt(token).decode("utf-8")
+
+    def seal(self: CryptoContext, data: bytes, associated_data: bytes = b"", tag_size: int = 8) -> bytes:
+        """Encrypts data into a compact token, the counterpart of open.
+
+        The token is the truncated HMAC-SHA256 tag of the associated data and the data, followed by the data
+        encrypted with AES-CTR. The tag is used as the nonce as well (synthetic IV), so the token has no other
+        overhead, and the same data always results in the same token.
+
+        Args:
+            self (CryptoContext): The CryptoContext object.
+            data (bytes): The data to encrypt.
+            associated_data (bytes, optional): Authenticated, but not encrypted data, e.g. a format version.
+            Defaults to b"".
+            tag_size (int, optional): Size of the authentication tag in bytes. Defaults to 8.
+
+        Returns:
+            bytes: The compact token.
+        """
+        tag = self._compact_tag(data, associated_data)[:tag_size]
+        return tag + self._compact_cipher(tag, data)
+
+    def open(self: CryptoContext, token: bytes, associated_data: bytes = b"", tag_size: int = 8) -> bytes:
+        """Decrypts a compact token created by seal.
+
+        Raises:
+            ValueError: If the token was not created with this password or it was modified.
+        """
+        tag, encrypted_data = token[:tag_size], token[tag_size:]
+        data = self._compact_cipher(tag, encrypted_data)
+        if len(tag) != tag_size or not hmac.compare_digest(tag, self._compact_tag(data, associated_data)[:tag_size]):
+            msg = "Invalid token."
+            raise ValueError(msg)
+        return data
+
+    def _compact_tag(self: CryptoContext, data: bytes, associated_data: bytes) -> bytes:
+        """HMAC-SHA256 of the length-prefixed associated data and the data."""
+        message = len(associated_data).to_bytes(2, "big") + associated_data + data
+        return hmac.digest(self._compact_signing_key, message, "sha256")
+
+    def _compact_cipher(self: CryptoContext, tag: bytes, data: bytes) -> bytes:
+        """Encrypts or decrypts the data with AES-CTR, the initial counter block is the padded tag."""
+        nonce = tag.ljust(16, b"\0")
+        encryptor = Cipher(algorithms.AES(self._compact_encryption_key), modes.CTR(nonce)).encryptor()
+        return encryptor.update(data) + encryptor.finalize()
+
+
+@lru_cache(maxsize=32)
+def get_crypto_context(password: str) -> CryptoContext:
+    """Returns the crypto context of the password, the key is derived only once per process."""
+    return CryptoContext(password)
@@ -0,0 +1,264 @@
+"""
+Headless evaluation of the scanned assessments of a directory.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+import cv2
+
+from checkmark.evaluator.decode import MissingRosterError, decode_solution_token
+from checkmark.evaluator.evaluate import EvaluationContext, evaluate_assessment
+from checkmark.evaluator.locate import locate_solution_qr
+from checkmark.evaluator.scan import MULTI_PAGE_EXTENSIONS, is_multi_page, iter_scan_pages
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    import numpy as np
+
+SCAN_EXTENSIONS = (".heic", ".jpeg", ".jpg", ".png", *MULTI_PAGE_EXTENSIONS)
+
+
+@dataclass
+class SheetResult:
+    """Outcome of the evaluation of a single scanned sheet, the page is only set for multi-page scans."""
+
+    path: str
+    success: bool
+    seconds: float
+    student: str | None = None
+    date: str | None = None
+    score: str | None = None
+    error: str | None = None
+    page: int | None = None
+    qr_strategy: str | None = None
+
+    @property
+    def label(self: SheetResult) -> str:
+        """Identifier of the sheet used in the output, e.g. "scans/stack.pdf#12"."""
+        return self.path if self.page is None else f"{self.path}#{self.page}"
+
+
+@dataclass
+class EvaluationSummary:
+    """Throughput summary of a bulk evaluation run."""
+
+    results: list[SheetResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failed_sheets(self: EvaluationSummary) -> list[SheetResult]:
+        """Sheets that could not be evaluated."""
+        return [result for result in self.results if not result.success]
+
+    def __str__(self: EvaluationSummary) -> str:
+        """Returns a human readable summary of the run."""
+        sheets_per_second = len(self.results) / self.seconds if self.seconds else 0.0
+        return (
+            f"Evaluated {len(self.results)} sheets in {self.seconds:.2f} s ({sheets_per_second:.2f} sheets/s), "
+            f"{len(self.failed_sheets)} failed."
+        )
+
+
+class ResultWriter:
+    """Writes the results into a CSV or JSON file (chosen by the extension) as soon as each sheet is evaluated.
+
+    The file is flushed after every result, so the finished sheets are kept even if the run is interrupted.
+    """
+
+    def __init__(self: ResultWriter, path: str | Path) -> None:
+        """Constructor of the ResultWriter class.
+
+        Args:
+            path (str | Path): Path to the output file, ".json" for JSON and any other extension for CSV.
+        """
+        self.path = Path(path)
+        self.is_json = self.path.suffix.lower() == ".json"
+        self.file_handle: IO[str] = self.path.open("w", encoding="utf-8", newline="")
+        self.count = 0
+        if self.is_json:
+            self.file_handle.write("[")
+        else:
+            fieldnames = [result_field.name for result_field in fields(SheetResult)]
+            self.csv_writer = csv.DictWriter(self.file_handle, fieldnames=fieldnames)
+            self.csv_writer.writeheader()
+        self.file_handle.flush()
+
+    def write(self: ResultWriter, result: SheetResult) -> None:
+        """Appends the result of a sheet to the file."""
+        if self.is_json:
+            separator = "," if self.count else ""
+            self.file_handle.write(f"{separator}\n    {json.dumps(asdict(result), ensure_ascii=False)}")
+        else:
+            self.csv_writer.writerow(asdict(result))
+        self.count += 1
+        self.file_handle.flush()
+
+    def close(self: ResultWriter) -> None:
+        """Finishes and closes the file."""
+        if self.is_json:
+            self.file_handle.write("\n]\n" if self.count else "]\n")
+        self.file_handle.close()
+
+
+def list_scans(input_path: str) -> list[str]:
+    """Lists the scanned sheets of a directory, or the files matching a glob pattern, in ascending order.
+
+    Args:
+        input_path (str): Directory of the scans or a glob pattern, e.g. "scans/**/*.jpg".
+
+    Returns:
+        list[str]: Paths of the scans, only the image files are listed from a directory.
+    """
+    if Path(input_path).is_dir():
+        return sorted(str(path) for path in Path(input_path).iterdir() if path.suffix.lower() in SCAN_EXTENSIONS)
+    return sorted(path for path in glob.glob(input_path, recursive=True) if Path(path).is_file())  # noqa: PTH207
+
+
+def read_pocket_credentials(pocket_path: str | Path) -> tuple[str, list[str]]:
+    """Reads the password and the roster of a pocket from its "pocket_data.json" file.
+
+    The roster holds every student the pocket was generated for, indexed by the student IDs of the
+    compact solution QR codes. Pockets saved without a roster use their students instead.
+    """
+    with Path(pocket_path).open("r", encoding="utf-8") as file_handle:
+        pocket_data = json.load(file_handle)
+    return pocket_data["pocket_password"], pocket_data.get("roster") or pocket_data["students"]
+
+
+def evaluate_scans(
+    paths: list[str],
+    workers: int | None = None,
+    password: str | None = None,
+    students: list[str] | None = None,
+    progress: Callable[[SheetResult], None] | None = None,
+) -> EvaluationSummary:
+    """Evaluates the scanned sheets concurrently, without any graphical interface.
+
+    Every page of the multi-page scans is a separate sheet. Their pages are read in order in this process
+    and sent to the workers, as reaching a page of a TIFF file walks every page before it. Only a few
+    pages are read ahead of the workers, so the memory use does not grow with the size of the scan.
+
+    Args:
+        paths (list[str]): Paths of the scans.
+        workers (int | None, optional): Number of worker processes, None uses every CPU. Defaults to None.
+        password (str | None, optional): Password of the solution QR codes. Defaults to the password of
+        "data/app/credentials.json".
+        students (list[str] | None, optional): Roster of the pocket, used to name the students of the
+        compact solution QR codes. Defaults to None.
+        progress (Callable[[SheetResult], None] | None, optional): Called with the result of each sheet
+        as soon as it is evaluated, in the order of completion. Defaults to None.
+
+    Raises:
+        MissingRosterError: If a sheet has a compact solution QR code and no roster is given, the remaining
+        sheets are not evaluated.
+
+    Returns:
+        EvaluationSummary: Outcome of each sheet in the order of completion and the overall duration.
+    """
+    start = time.perf_counter()
+    summary = EvaluationSummary()
+
+    def record(result: SheetResult) -> None:
+        summary.results.append(result)
+        if progress is not None:
+            progress(result)
+
+    max_pending = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker) as executor:
+        pending: set[Future[SheetResult]] = set()
+
+        def wait_for_results(limit: int) -> None:
+            nonlocal pending
+            while len(pending) > limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(future.result())
+
+        try:
+            for path in paths:
+                for page, image in _scan_sheets(path, record):
+                    pending.add(executor.submit(_evaluate_sheet, path, page, image, password, students))
+                    wait_for_results(max_pending)
+            wait_for_results(0)
+        except MissingRosterError:
+            # Every other sheet of the pocket would fail the same way.
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+    summary.seconds = time.perf_counter() - start
+    return summary
+
+
+def _initialize_worker() -> None:
+    """Limits OpenCV to a single thread, the sheets are already evaluated in parallel by the processes."""
+    cv2.setNumThreads(1)
+
+
+def _scan_sheets(
+    path: str,
+    record: Callable[[SheetResult], None],
+) -> Iterator[tuple[int | None, np.ndarray | None]]:
+    """Page number and image of each page of a multi-page scan, the single images are read by the workers.
+
+    A scan that can not be read is recorded as a single failed sheet, from the first page that was not read.
+    """
+    if not is_multi_page(path):
+        yield None, None
+        return
+    page = 0
+    try:
+        for scan_page in iter_scan_pages(path):
+            page = scan_page.page
+            yield page, scan_page.image
+    except Exception as exception:  # noqa: BLE001
+        error = _error_message(exception)
+        record(SheetResult(path, success=False, seconds=0.0, error=error, page=page + 1 if page else None))
+
+
+def _evaluate_sheet(
+    path: str,
+    page: int | None,
+    image: np.ndarray | None,
+    password: str | None,
+    students: list[str] | None,
+) -> SheetResult:
+    """Decodes the solution and evaluates a single sheet (a page of a multi-page scan) in a worker process."""
+    start = time.perf_counter()
+    try:
+        context = EvaluationContext(Path(path) if image is None else image)
+        solution_qr = locate_solution_qr(context.gray, search_image=context.search_gray)
+        solution = decode_solution_token(solution_qr.data, password, students)
+        student, date, _, correct_data = solution
+        score, _ = evaluate_assessment(context, correct_data)
+    except MissingRosterError:
+        raise
+    # An unreadable sheet (e.g. blurry QR code) should not stop the rest of the scans.
+    except Exception as exception:  # noqa: BLE001
+        error = _error_message(exception)
+        return SheetResult(path, success=False, seconds=time.perf_counter() - start, error=error, page=page)
+    return SheetResult(
+        path,
+        success=True,
+        seconds=time.perf_counter() - start,
+        student=student,
+        date=date,
+        score=score,
+        page=page,
+        qr_strategy=solution_qr.strategy,
+    )
+
+
+def _error_message(exception: Exception) -> str:
+    return str(exception) or type(exception).__name__
@@ -1,32 +1,68 @@
-import base64
+from __future__ import annotations
+
 import json
-import random
-import sys
+from functools import cache
+from typing import TYPE_CHECKING
 
 import numpy as np
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives.hashes import SHA256
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from PIL import Image
-from pyzbar import pyzbar
 
+from checkmark.crypto import get_crypto_context
+from checkmark.payload import decode_solution_payload, is_compact_payload
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+    from checkmark.evaluator.evaluate import EvaluationContext
+
+
+class MissingRosterError(ValueError):
+    """The student of a compact solution QR code can only be named with the roster of the pocket."""
+
+
+def decode_solution_data(
+    qr_img: Image.Image | np.ndarray | EvaluationContext,
+    password: str | None = None,
+    students: list[str] | None = None,
+) -> tuple[str, str, list[int], list[int]]:
+    from checkmark.evaluator.evaluate import EvaluationContext
+    from checkmark.evaluator.locate import locate_solution_qr
 
-def decode_solution_data(qr_img: Image.Image, password: str | None = None) -> tuple[str, str, list[int], list[int]]:
     if password is None:
-        with open("data/app/credentials.json", "r", encoding="utf-8") as f:
-            password = json.loads(f.read())["password"]
-    random.seed(0)
-    salt = random.getrandbits(128).to_bytes(16, sys.byteorder)
-    kdf = PBKDF2HMAC(algorithm=SHA256(), length=32, salt=salt, iterations=1)
-    key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-
-    qr_array = np.array(qr_img, dtype=np.uint8)
-    token = pyzbar.decode(qr_array)[0].data
-    fernet = Fernet(key)
-    secret_message = fernet.decrypt(token).decode()
+        password = read_credentials_password()
+
+    # The image of an evaluation context is shared with the evaluation instead of being copied.
+    if not isinstance(qr_img, EvaluationContext):
+        qr_img = EvaluationContext(np.asarray(qr_img, dtype=np.uint8))
+    token = locate_solution_qr(qr_img.gray, search_image=qr_img.search_gray).data
+    return decode_solution_token(token, password, students)
+
+
+def decode_solution_token(
+    token: bytes,
+    password: str | None = None,
+    students: list[str] | None = None,
+) -> tuple[str, str, list[int], list[int]]:
+    # The compact payload stores the ID of the student, the position of the student in the roster of the pocket.
+    if is_compact_payload(token):
+        if students is None:
+            msg = "The roster of the pocket is needed to identify the student of a compact solution QR code."
+            raise MissingRosterError(msg)
+        solution = decode_solution_payload(token, password or read_credentials_password())
+        if solution.student_id >= len(students):
+            msg = f"Student ID {solution.student_id} is not in the roster of the pocket."
+            raise ValueError(msg)
+        return students[solution.student_id], solution.date, solution.question_indices, solution.correct_options
+
+    secret_message = get_crypto_context(password or read_credentials_password()).decrypt(token)
 
     student, date, joined_question_data, joined_correct_data = secret_message.split("; ")
     question_data = [int(index) for index in joined_question_data.split(" ")]
     correct_data = [int(correct) for correct in joined_correct_data.split(" ")]
 
     return student, date, question_data, correct_data
+
+
+@cache
+def read_credentials_password(path: str = "data/app/credentials.json") -> str:
+    with open(path, "r", encoding="utf-8") as file_handle:
+        return json.loads(file_handle.read())["password"]
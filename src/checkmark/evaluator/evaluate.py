@@ -6,42 +6,17 @@ Assessment evaluation functionalities.
 
 from __future__ import annotations
 
-import base64
-import json
-import random
-import sys
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 
 import cv2
 import numpy as np
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives.hashes import SHA256
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from PIL import Image
 from pillow_heif import register_heif_opener
-from pyzbar import pyzbar
 
-
-def decode_solution_data(qr_img: Image.Image, password: str | None = None) -> tuple[str, str, list[int], list[int]]:
-    if password is None:
-        with open("data/app/credentials.json", "r", encoding="utf-8") as file_handle:
-            password = json.loads(file_handle.read())["password"]
-    random.seed(0)
-    salt = random.getrandbits(128).to_bytes(16, sys.byteorder)
-    kdf = PBKDF2HMAC(algorithm=SHA256(), length=32, salt=salt, iterations=1)
-    key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-
-    qr_array = np.array(qr_img, dtype=np.uint8)
-    token = pyzbar.decode(qr_array)[0].data
-    fernet = Fernet(key)
-    secret_message = fernet.decrypt(token).decode()
-
-    student, date, joined_question_data, joined_correct_data = secret_message.split("; ")
-    question_data = [int(index) for index in joined_question_data.split(" ")]
-    correct_data = [int(correct) for correct in joined_correct_data.split(" ")]
-
-    return student, date, question_data, correct_data
+THRESHOLDS = np.arange(16, 240, 4)
+WORKING_SIZE = (1200, 800)
 
 
 @dataclass
@@ -56,18 +31,53 @@ class ResultData:
     result_image: np.ndarray
 
 
+class EvaluationContext:
+    """Image of an assessment shared by the QR code decoding and the evaluation.
+
+    The file is decoded only once, the views derived from it are computed on first use and cached.
+    """
+
+    def __init__(self, image_or_path):
+        self.image_or_path = image_or_path
+
+    @cached_property
+    def image(self):
+        # full resolution BGR image
+        return load_image(self.image_or_path)
+
+    @cached_property
+    def gray(self):
+        return to_gray(self.image)
+
+    @cached_property
+    def working_image(self):
+        return cv2.resize(self.image, WORKING_SIZE)
+
+    @cached_property
+    def working_gray(self):
+        return to_gray(self.working_image)
+
+    @cached_property
+    def search_gray(self):
+        # downscaled for the finder pattern search of the QR code locator
+        from checkmark.evaluator.locate import downscale_for_search
+
+        return downscale_for_search(self.gray)
+
+
 def evaluate_assessment(
-    image_or_path: Path | Image.Image, correct_answers=None, password: str | None = None
+    image_or_path: Path | Image.Image | EvaluationContext, correct_answers=None, password: str | None = None, debug=None
 ) -> tuple[str, str, str, np.ndarray]:
-    big_image = load_image(image_or_path)
-    image = cv2.resize(big_image, (1200, 800))
-    image_canny = preprocess_image(image)
+    context = image_or_path if isinstance(image_or_path, EvaluationContext) else EvaluationContext(image_or_path)
+    image = context.working_image
+    image_canny = preprocess_image(context.working_gray)
     contours = get_contours(image_canny)
 
     ##get_warped_images and get_answers replaced by x_marks_the_spot
     # warped_images = get_warped_images(image.shape[1], image.shape[0], contours, image, threshold1=threshold)
     # given_answers = get_answers(warped_images)
-    warped_images, given_answers = x_marks_the_spot(image, contours, correct_answers)
+    # pass debug=show_debug_images to see the blocks and answers of every threshold
+    warped_images, given_answers = x_marks_the_spot(context.working_gray, contours, correct_answers, debug=debug)
 
     score, corrected_images = grade_test(warped_images, correct_answers, given_answers)
 
@@ -86,8 +96,14 @@ def load_image(image_path: Path | Image.Image):
     return image
 
 
+def to_gray(image):
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
 def preprocess_image(image):
-    image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    image_gray = to_gray(image)
     image_blur = cv2.GaussianBlur(image_gray, (15, 15), 1)
     image_canny = cv2.Canny(image_blur, 10, 70)
     return image_canny
@@ -165,43 +181,81 @@ def order_contours(contours):
     # return ordered_contours
 
 
-def x_marks_the_spot(image, contours, correct_answers):
-    cumulator = [[0, 0, 0, 0, 0] for _ in correct_answers]
-    uncertains = [0 for _ in correct_answers]
-    for threshold in range(16, 240, 4):
-        warped_images = get_warped_images(image.shape[1], image.shape[0], contours, image, threshold1=threshold)
-        given_answers = get_answers(warped_images)
-
-        ### debug ###
-        for k, img in enumerate(warped_images):
-            cv2.imshow(f"img_{k}", img)
-        print(f"{threshold=}")
-        for k, ans in enumerate(given_answers, 1):
-            if ans is None:
-                print("0", end=" ")
-            else:
-                print("ABCD"[ans], end=" ")
-            if k % 5 == 0:
-                print("")
-        cv2.waitKey(0)
-        cv2.destroyAllWindows()
-        ### debug end ###
-
-        for k, answer in enumerate(given_answers):
-            if answer is not None:
-                cumulator[k][answer] += 1
-            else:
-                uncertains[k] += 1
+def x_marks_the_spot(image, contours, correct_answers, debug=None):
+    # Every block is warped once, the pixel counts of all the thresholds come from the histograms of the boxes.
+    gray_images = get_gray_warped_images(image.shape[1], image.shape[0], contours, image)
+    filled_pixels = [np.zeros((0, 4, len(THRESHOLDS)), dtype=np.int64)]
+    box_sizes = [np.zeros(0, dtype=np.int64)]
+    for gray_image in gray_images:
+        histograms = get_box_histograms(gray_image)
+        filled_pixels.append(count_filled_pixels(histograms, THRESHOLDS))
+        box_sizes.append(np.full(histograms.shape[0], histograms[0, 0].sum()))
+    filled_pixels = np.concatenate(filled_pixels)
+    box_sizes = np.concatenate(box_sizes)
+
+    # answer of every question at every threshold, -1 if uncertain
+    threshold_answers = get_threshold_answers(filled_pixels, box_sizes)
+
+    if debug is not None:
+        for t, threshold in enumerate(THRESHOLDS):
+            warped_images = [
+                cv2.threshold(gray_image, int(threshold), 255, cv2.THRESH_BINARY_INV)[1] for gray_image in gray_images
+            ]
+            given_answers = [None if answer < 0 else int(answer) for answer in threshold_answers[:, t]]
+            debug(int(threshold), warped_images, given_answers)
+
+    counts = (threshold_answers[:, :, None] == np.arange(4)).sum(axis=1)
+    uncertains = (threshold_answers < 0).sum(axis=1)
     given_answers = list()
-    for k, (counts, uncertain) in enumerate(zip(cumulator, uncertains)):
-        if max(counts) * 2 > sum(counts) and max(counts) * 20 > uncertain:
-            given_answers.append(np.argmax(counts))
+    for k in range(len(correct_answers)):
+        if k < len(counts) and max(counts[k]) * 2 > sum(counts[k]) and max(counts[k]) * 20 > uncertains[k]:
+            given_answers.append(int(np.argmax(counts[k])))
         else:
             given_answers.append(None)
-    return warped_images, given_answers
+    # only the shape of the warped images is used for grading
+    return gray_images, given_answers
 
 
-def get_warped_images(width, height, contours, image, threshold1=150, threshold2=255):
+def show_debug_images(threshold, warped_images, given_answers):
+    for k, img in enumerate(warped_images):
+        cv2.imshow(f"img_{k}", img)
+    print(f"{threshold=}")
+    for k, ans in enumerate(given_answers, 1):
+        if ans is None:
+            print("0", end=" ")
+        else:
+            print("ABCD"[ans], end=" ")
+        if k % 5 == 0:
+            print("")
+    cv2.waitKey(0)
+    cv2.destroyAllWindows()
+
+
+def get_box_histograms(image, rows=5, cols=4):
+    # intensity histogram of every box, in the order of the questions: shape (rows, cols, 256)
+    height, width = image.shape
+    boxes = image.reshape(rows, height // rows, cols, width // cols).transpose(0, 2, 1, 3).reshape(rows * cols, -1)
+    offsets = np.arange(rows * cols)[:, None] * 256
+    histograms = np.bincount((boxes + offsets).ravel(), minlength=rows * cols * 256)
+    return histograms.reshape(rows, cols, 256)
+
+
+def count_filled_pixels(histograms, thresholds):
+    # THRESH_BINARY_INV keeps the pixels not brighter than the threshold
+    return np.cumsum(histograms, axis=-1)[..., thresholds]
+
+
+def get_threshold_answers(filled_pixels, box_sizes):
+    # same rule as get_answers, for every question (axis 0) and threshold (axis 2) at once
+    sorted_values = -np.sort(-filled_pixels, axis=1)
+    certain = (
+        sorted_values[:, 0] - sorted_values[:, 1]
+        > box_sizes[:, None] * 0.01 + sorted_values[:, 1] - sorted_values[:, -1]
+    )
+    return np.where(certain, np.argmax(filled_pixels, axis=1), -1)
+
+
+def get_gray_warped_images(width, height, contours, image):
     dst_matrix = np.array(
         [
             [0, 0],
@@ -211,18 +265,26 @@ def get_warped_images(width, height, contours, image, threshold1=150, threshold2
         ],
         dtype="float32",
     )
-    warped_images = []
+    gray_images = []
 
-    for k, contour in enumerate(contours):
+    for contour in contours:
         reordered_points = order_points(contour)
 
         matrix = cv2.getPerspectiveTransform(reordered_points, dst_matrix)
 
+        # a grayscale image is warped without any conversion
         warped_image = cv2.warpPerspective(image, matrix, (width, height))
-        warped_image = cv2.cvtColor(warped_image, cv2.COLOR_BGR2GRAY)
-        warped_image = cv2.threshold(warped_image, threshold1, threshold2, cv2.THRESH_BINARY_INV)[1]
+        warped_image = to_gray(warped_image)
 
         warped_image = cut_image_border(warped_image)
+        gray_images.append(warped_image)
+    return gray_images
+
+
+def get_warped_images(width, height, contours, image, threshold1=150, threshold2=255):
+    warped_images = []
+    for gray_image in get_gray_warped_images(width, height, contours, image):
+        warped_image = cv2.threshold(gray_image, threshold1, threshold2, cv2.THRESH_BINARY_INV)[1]
         warped_images.append(warped_image)
     return warped_images
 
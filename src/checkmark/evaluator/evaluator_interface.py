@@ -7,14 +7,20 @@ Graphical User Interface for evaluating the images of the assessments generated
 from __future__ import annotations
 
 import tkinter as tk
+from pathlib import Path
+from tkinter import filedialog, messagebox
 
+import ttkbootstrap as ttk
 from ttkbootstrap import Style
 
+from checkmark.evaluator.bulk import read_pocket_credentials
+from checkmark.evaluator.main import main
+
 
 class EvaluatorInterface(tk.Tk):
     """Graphical User Interface for assessment evaluation."""
 
-    def __init__(self) -> None:
+    def __init__(self, pocket_path=None) -> None:
         # TODO: Support multiple languages
         tk.Tk.__init__(self)
         self.iconphoto(True, tk.PhotoImage(file="data/app/icon.png"))
@@ -30,3 +36,38 @@ class EvaluatorInterface(tk.Tk):
 
         container = tk.Frame(self)
         container.pack(side="top", fill="both", expand=True)
+
+        # The pocket gives the password and the roster, the roster names the students of the compact solution QR codes.
+        self.password = None
+        self.students = None
+        self.pocket_label = tk.Label(container, text="Nincs betöltött csomag.")
+        self.pocket_button = ttk.Button(
+            container,
+            text="Csomag betöltése",
+            style="info.Outline.TButton",
+            command=self.choose_pocket,
+        )
+        self.pocket_label.grid(row=0, column=0, padx=10, pady=(18, 8), sticky="nw")
+        self.pocket_button.grid(row=0, column=1, padx=10, pady=(18, 8), sticky="ne")
+        if pocket_path is not None:
+            self.load_pocket(pocket_path)
+
+    def choose_pocket(self):
+        pocket_path = filedialog.askopenfilename(
+            title="Csomag betöltése",
+            filetypes=[("Csomag adatai", "pocket_data.json")],
+            initialdir="data/generated",
+        )
+        if pocket_path:
+            self.load_pocket(pocket_path)
+
+    def load_pocket(self, pocket_path):
+        try:
+            self.password, self.students = read_pocket_credentials(pocket_path)
+        except (OSError, ValueError, KeyError) as exception:
+            messagebox.showerror(title="Hiba!", message=f"A csomag adatai nem olvashatók:\n{exception}", icon="error")
+            return
+        self.pocket_label.configure(text=f"{Path(pocket_path).parent.name}: {len(self.students)} diák")
+
+    def evaluate(self, image_path):
+        return main(image_path, self.password, self.students)
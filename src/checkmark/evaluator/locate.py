@@ -0,0 +1,236 @@
+"""
+Coarse-to-fine localisation and decoding of the solution QR code on a photo or scan of an assessment.
+
+The strategies are tried in the order of STRATEGIES, the first one that finds the solution QR code wins:
+    finder: finder patterns are searched on a downscaled image, only the cropped QR code is decoded
+    opencv: the QRCodeDetector of OpenCV on the full image
+    scale=<factor>: the whole image is decoded at the given scale, 1.0 is the original behaviour
+The name of the successful strategy is reported, so the order can be tuned on real scans.
+
+pyzbar decodes the cropped and scaled images, if its zbar library is missing OpenCV is used instead.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+
+from checkmark.payload import is_compact_payload
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import ModuleType
+
+STRATEGIES = ("finder", "opencv", "scale=1.0", "scale=0.5", "scale=0.25")
+# Length of the longer side of the image the finder patterns are searched on.
+FINDER_SEARCH_SIZE = 1000
+# Version 1 tokens of cryptography.fernet, the original format of the solution QR codes.
+_FERNET_PREFIX = b"gAAAAA"
+
+
+@dataclass
+class LocatedQRCode:
+    """Content of the solution QR code and the strategy that found it."""
+
+    data: bytes
+    strategy: str
+
+
+def locate_solution_qr(
+    image: np.ndarray,
+    strategies: tuple[str, ...] = STRATEGIES,
+    accept: Callable[[bytes], bool] | None = None,
+    search_image: np.ndarray | None = None,
+) -> LocatedQRCode:
+    """Finds and decodes the solution QR code of the image.
+
+    Args:
+        image (np.ndarray): Grayscale, BGR or BGRA image of the assessment.
+        strategies (tuple[str, ...], optional): Strategies in the order they are tried. Defaults to STRATEGIES.
+        accept (Callable[[bytes], bool] | None, optional): Selects the solution QR code among the decoded
+        QR codes, e.g. the QR code of the online pocket is skipped. Defaults to is_solution_token.
+        search_image (np.ndarray | None, optional): The grayscale image downscaled by downscale_for_search,
+        computed when it is needed if not given. Defaults to None.
+
+    Raises:
+        ValueError: If none of the strategies found the solution QR code.
+
+    Returns:
+        LocatedQRCode: Content of the solution QR code and the name of the successful strategy.
+    """
+    accept = accept or is_solution_token
+    gray_image = _to_gray(image)
+    for strategy in strategies:
+        for data in _run_strategy(strategy, gray_image, search_image):
+            if accept(data):
+                return LocatedQRCode(data, strategy)
+    msg = "No solution QR code found."
+    raise ValueError(msg)
+
+
+def is_solution_token(data: bytes) -> bool:
+    """Checks whether the content of a QR code is a solution token, in the compact or in the original format."""
+    return is_compact_payload(data) or data.startswith(_FERNET_PREFIX)
+
+
+def downscale_for_search(gray_image: np.ndarray) -> np.ndarray:
+    """Downscales the grayscale image so that its longer side is at most FINDER_SEARCH_SIZE."""
+    scale = min(1.0, FINDER_SEARCH_SIZE / max(gray_image.shape))
+    if scale == 1.0:
+        return gray_image
+    return cv2.resize(gray_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def find_qr_regions(
+    gray_image: np.ndarray,
+    search_image: np.ndarray | None = None,
+) -> list[tuple[int, int, int, int]]:
+    """Searches the finder patterns on a downscaled image and groups them into QR codes.
+
+    Args:
+        gray_image (np.ndarray): Full resolution grayscale image.
+        search_image (np.ndarray | None, optional): The image downscaled by downscale_for_search.
+        Defaults to None.
+
+    Returns:
+        list[tuple[int, int, int, int]]: Bounding box (left, top, right, bottom) of each QR code candidate
+        in full resolution coordinates, larger candidates first.
+    """
+    if search_image is None:
+        search_image = downscale_for_search(gray_image)
+    scale_x = search_image.shape[1] / gray_image.shape[1]
+    scale_y = search_image.shape[0] / gray_image.shape[0]
+    finder_patterns = _find_finder_patterns(search_image)
+
+    regions = []
+    for group in _group_finder_patterns(finder_patterns):
+        if len(group) < 3:  # noqa: PLR2004
+            continue
+        # Half a finder pattern and the quiet zone around the centers of the outer finder patterns.
+        margin = max(size for _, _, size in group)
+        left = min(x for x, _, _ in group) - margin
+        top = min(y for _, y, _ in group) - margin
+        right = max(x for x, _, _ in group) + margin
+        bottom = max(y for _, y, _ in group) + margin
+        regions.append(
+            (
+                max(0, int(left / scale_x)),
+                max(0, int(top / scale_y)),
+                min(gray_image.shape[1], int(right / scale_x) + 1),
+                min(gray_image.shape[0], int(bottom / scale_y) + 1),
+            ),
+        )
+    return sorted(regions, key=lambda region: (region[2] - region[0]) * (region[3] - region[1]), reverse=True)
+
+
+def _run_strategy(strategy: str, gray_image: np.ndarray, search_image: np.ndarray | None) -> list[bytes]:
+    """Contents of the QR codes found by the strategy."""
+    if strategy == "finder":
+        decoded = []
+        for left, top, right, bottom in find_qr_regions(gray_image, search_image):
+            decoded.extend(_decode(gray_image[top:bottom, left:right]))
+        return decoded
+    if strategy == "opencv":
+        return _decode_opencv(gray_image)
+    if strategy.startswith("scale="):
+        scale = float(strategy.removeprefix("scale="))
+        if scale == 1.0:
+            return _decode(gray_image)
+        return _decode(cv2.resize(gray_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA))
+    msg = f"Unknown QR code strategy: {strategy}"
+    raise ValueError(msg)
+
+
+def _find_finder_patterns(gray_image: np.ndarray) -> list[tuple[float, float, float]]:
+    """Center and size of the finder patterns: a dark square containing a light square and a dark center."""
+    binary_image = cv2.threshold(gray_image, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+    contours, hierarchy = cv2.findContours(binary_image, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    if hierarchy is None:
+        return []
+    hierarchy = hierarchy[0]
+    finder_patterns = []
+    for index, contour in enumerate(contours):
+        ring = hierarchy[index][2]
+        center = hierarchy[ring][2] if ring != -1 else -1
+        if center == -1:
+            continue
+        outer_area = cv2.contourArea(contour)
+        ring_area = cv2.contourArea(contours[ring])
+        center_area = cv2.contourArea(contours[center])
+        if center_area == 0:
+            continue
+        # The modules of a finder pattern are 7x7, 5x5 and 3x3, the ratios allow for blur and perspective.
+        if not (2.5 < outer_area / center_area < 14 and 1.2 < outer_area / ring_area < 3.2):  # noqa: PLR2004
+            continue
+        _, _, width, height = cv2.boundingRect(contour)
+        if not 0.5 < width / height < 2:  # noqa: PLR2004
+            continue
+        moments = cv2.moments(contours[center])
+        finder_patterns.append(
+            (moments["m10"] / moments["m00"], moments["m01"] / moments["m00"], float(np.sqrt(outer_area))),
+        )
+    return finder_patterns
+
+
+def _group_finder_patterns(
+    finder_patterns: list[tuple[float, float, float]],
+) -> list[list[tuple[float, float, float]]]:
+    """Groups the finder patterns that are close enough to belong to the same QR code."""
+    # The finder patterns of a version 20 QR code are 90 modules apart, 13 times the size of a finder pattern.
+    groups: list[list[tuple[float, float, float]]] = []
+    for finder_pattern in finder_patterns:
+        x, y, size = finder_pattern
+        close_groups = [
+            group
+            for group in groups
+            if any(
+                np.hypot(x - other_x, y - other_y) < 13 * max(size, other_size)
+                for other_x, other_y, other_size in group
+            )
+        ]
+        merged_group = [finder_pattern]
+        for group in close_groups:
+            merged_group.extend(group)
+            groups.remove(group)
+        groups.append(merged_group)
+    return groups
+
+
+@cache
+def _load_pyzbar() -> ModuleType | None:
+    """The pyzbar module, or None if the zbar library is not installed."""
+    try:
+        from pyzbar import pyzbar
+    except ImportError:
+        return None
+    return pyzbar
+
+
+def _decode(gray_image: np.ndarray) -> list[bytes]:
+    if gray_image.size == 0:
+        return []
+    pyzbar = _load_pyzbar()
+    if pyzbar is None:
+        return _decode_opencv(gray_image)
+    return [symbol.data for symbol in pyzbar.decode(gray_image)]
+
+
+def _decode_opencv(gray_image: np.ndarray) -> list[bytes]:
+    found, decoded_info, _, _ = cv2.QRCodeDetector().detectAndDecodeMulti(gray_image)
+    if not found:
+        return []
+    return [data.encode("utf-8") for data in decoded_info if data]
+
+
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 2:  # noqa: PLR2004
+        return image
+    if image.shape[2] == 4:  # noqa: PLR2004
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -3,19 +3,23 @@ from __future__ import annotations
 from pathlib import Path
 
 import cv2
-from decode import decode_solution_data
-from evaluate import evaluate_assessment, load_image
 
+from checkmark.evaluator.bulk import read_pocket_credentials
+from checkmark.evaluator.decode import decode_solution_data
+from checkmark.evaluator.evaluate import EvaluationContext, evaluate_assessment
 
-def main(image_path, password=None):
-    image = load_image(image_path)
-    student, date, question_date, correct_data = decode_solution_data(image, password)
-    score, result_image = evaluate_assessment(image, correct_data)
+
+def main(image_path, password=None, students=None):
+    # the roster of the pocket names the student of the compact solution QR code
+    context = EvaluationContext(image_path)
+    student, date, question_date, correct_data = decode_solution_data(context, password, students)
+    score, result_image = evaluate_assessment(context, correct_data)
     return student, date, score, result_image
 
 
 if __name__ == "__main__":
     image_path = Path("data/uploads/hi2.jpg")
-    student, date, score, result_image = main(image_path)
+    password, students = read_pocket_credentials(Path("data/uploads/pocket_data.json"))
+    student, date, score, result_image = main(image_path, password, students)
     cv2.imshow("result image", result_image)
     cv2.waitKey(0)
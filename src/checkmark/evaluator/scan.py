@@ -0,0 +1,145 @@
+"""
+Page by page reading of the scans, including the multi-page TIFF and PDF files of the copiers.
+
+Only a single page is held in memory at a time, so the memory use does not grow with the size of the scan.
+Reading PDF files requires the optional pypdfium2 dependency: pip install "checkmark-assistant[pdf]"
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+from PIL import Image, ImageSequence
+
+from checkmark.evaluator.evaluate import load_image
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+MULTI_PAGE_EXTENSIONS = (".pdf", ".tif", ".tiff")
+# Resolution of the rasterized PDF pages, an A4 page is 1240x1754 pixels, enough for the solution QR code.
+PDF_DPI = 150
+
+
+@dataclass
+class ScanPage:
+    """A single page of a scan, the page number starts from 1."""
+
+    path: str
+    page: int
+    image: np.ndarray
+
+
+def is_multi_page(path: str | Path) -> bool:
+    """Checks whether the scan can contain more than one page, based on its extension."""
+    return Path(path).suffix.lower() in MULTI_PAGE_EXTENSIONS
+
+
+def count_scan_pages(path: str | Path) -> int:
+    """Number of pages of the scan, single image files are not opened."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".pdf":
+        document = _open_pdf(path)
+        try:
+            return len(document)
+        finally:
+            document.close()
+    if suffix in MULTI_PAGE_EXTENSIONS:
+        with Image.open(path) as image:
+            return getattr(image, "n_frames", 1)
+    return 1
+
+
+def read_scan_page(path: str | Path, page: int, dpi: int = PDF_DPI) -> np.ndarray:
+    """Reads a single page of the scan.
+
+    Args:
+        path (str | Path): Path to the scan.
+        page (int): Number of the page, starting from 1.
+        dpi (int, optional): Resolution of the rasterized PDF page. Defaults to PDF_DPI.
+
+    Raises:
+        IndexError: If the scan has fewer pages.
+
+    Returns:
+        np.ndarray: The page as a BGR image.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".pdf":
+        document = _open_pdf(path)
+        try:
+            if not 1 <= page <= len(document):
+                msg = f"Page {page} is out of range: {path}"
+                raise IndexError(msg)
+            return _render_pdf_page(document, page - 1, dpi)
+        finally:
+            document.close()
+    if suffix in MULTI_PAGE_EXTENSIONS:
+        with Image.open(path) as image:
+            try:
+                image.seek(page - 1)
+            except EOFError as exception:
+                msg = f"Page {page} is out of range: {path}"
+                raise IndexError(msg) from exception
+            return _to_bgr(image)
+    if page != 1:
+        msg = f"Page {page} is out of range: {path}"
+        raise IndexError(msg)
+    return load_image(Path(path))
+
+
+def iter_scan_pages(path: str | Path, dpi: int = PDF_DPI) -> Iterator[ScanPage]:
+    """Yields the pages of the scan one at a time, the next page is only read when it is requested.
+
+    Args:
+        path (str | Path): Path to the scan, a multi-page TIFF or PDF file or any image read by load_image.
+        dpi (int, optional): Resolution of the rasterized PDF pages. Defaults to PDF_DPI.
+
+    Yields:
+        ScanPage: The pages of the scan in order.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".pdf":
+        document = _open_pdf(path)
+        try:
+            for index in range(len(document)):
+                yield ScanPage(str(path), index + 1, _render_pdf_page(document, index, dpi))
+        finally:
+            document.close()
+    elif suffix in MULTI_PAGE_EXTENSIONS:
+        with Image.open(path) as image:
+            for index, frame in enumerate(ImageSequence.Iterator(image)):
+                yield ScanPage(str(path), index + 1, _to_bgr(frame))
+    else:
+        yield ScanPage(str(path), 1, load_image(Path(path)))
+
+
+def _open_pdf(path: str | Path):  # noqa: ANN202
+    """Opens the PDF document with pypdfium2, which is only imported when a PDF file is read."""
+    try:
+        import pypdfium2
+    except ImportError as exception:
+        msg = 'Reading PDF scans requires pypdfium2: pip install "checkmark-assistant[pdf]"'
+        raise ImportError(msg) from exception
+    return pypdfium2.PdfDocument(path)
+
+
+def _render_pdf_page(document, index: int, dpi: int) -> np.ndarray:  # noqa: ANN001
+    """Rasterizes a page of the PDF document."""
+    page = document[index]
+    try:
+        # PDF coordinates are in points, 72 points per inch.
+        return _to_bgr(page.render(scale=dpi / 72).to_pil())
+    finally:
+        page.close()
+
+
+def _to_bgr(image: Image.Image) -> np.ndarray:
+    """Converts a PIL image (e.g. a bilevel TIFF page) into the BGR format used by OpenCV."""
+    return cv2.cvtColor(np.array(image.convert("RGB")), cv2.COLOR_RGB2BGR)
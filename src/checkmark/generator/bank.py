@@ -0,0 +1,201 @@
+"""
+Native storage of the question banks: one SQLite database per subject directory, holding every topic of it.
+
+The Excel files of the teachers remain the source of the questions, "checkmark bank import" converts them
+into the database. A topic is loaded by its key (the name of its Excel file without the extension) with a
+single indexed query, without pandas or openpyxl.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from checkmark.generator.question import Question, QuestionBank, read_questions_from_excel
+
+if TYPE_CHECKING:
+    from checkmark.generator.question import QuestionCache
+
+BANK_NAME = "questions.sqlite3"
+BANK_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS topics (
+    topic TEXT PRIMARY KEY,
+    source_mtime_ns INTEGER NOT NULL,
+    source_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS questions (
+    topic TEXT NOT NULL REFERENCES topics (topic) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    question_index INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    option_a TEXT NOT NULL,
+    option_b TEXT NOT NULL,
+    option_c TEXT NOT NULL,
+    option_d TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    PRIMARY KEY (topic, position)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class ImportResult:
+    """Outcome of the import of a single Excel file."""
+
+    path: str
+    status: str
+    error: str | None = None
+
+
+def bank_path(subject_path: str | Path) -> Path:
+    """Path of the question bank database of the subject directory."""
+    return Path(subject_path) / BANK_NAME
+
+
+def write_topic(path: str | Path, topic: str, questions: QuestionBank, source: list[int]) -> None:
+    """Saves the questions of a topic into the database, replacing the previous questions of the topic.
+
+    Args:
+        path (str | Path): Path to the database, it is created if it does not exist.
+        topic (str): Key of the topic, the name of its Excel file without the extension.
+        questions (QuestionBank): The questions of the topic.
+        source (list[int]): Modification time and size of the Excel file the questions were read from.
+    """
+    with closing(_connect(path)) as connection, connection:
+        connection.execute("DELETE FROM topics WHERE topic = ?", (topic,))
+        connection.execute("INSERT INTO topics VALUES (?, ?, ?)", (topic, *source))
+        connection.executemany(
+            "INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    topic,
+                    position,
+                    question.index,
+                    *(_cell_text(text) for text in [question.body, *question.options]),
+                    question.correct,
+                )
+                for position, question in enumerate(questions)
+            ),
+        )
+
+
+def read_topic(path: str | Path, topic: str) -> tuple[QuestionBank, list[int]] | None:
+    """Loads the questions of a topic from the database.
+
+    Args:
+        path (str | Path): Path to the database.
+        topic (str): Key of the topic, the name of its Excel file without the extension.
+
+    Returns:
+        tuple[QuestionBank, list[int]] | None: The questions and the signature of the Excel file they were
+        imported from, or None if the database or the topic is missing.
+    """
+    if not Path(path).is_file():
+        return None
+    with closing(_connect(path)) as connection:
+        source = connection.execute(
+            "SELECT source_mtime_ns, source_size FROM topics WHERE topic = ?",
+            (topic,),
+        ).fetchone()
+        if source is None:
+            return None
+        rows = connection.execute(
+            "SELECT question_index, body, option_a, option_b, option_c, option_d, correct "
+            "FROM questions WHERE topic = ? ORDER BY position",
+            (topic,),
+        ).fetchall()
+    questions = QuestionBank(Question(row[0], row[1], list(row[2:6]), row[6]) for row in rows)
+    return questions, list(source)
+
+
+def list_topics(path: str | Path) -> list[str]:
+    """Keys of the topics in the database, or an empty list if the database is missing."""
+    if not Path(path).is_file():
+        return []
+    with closing(_connect(path)) as connection:
+        return [row[0] for row in connection.execute("SELECT topic FROM topics ORDER BY topic")]
+
+
+def read_topic_questions(questions_path: str, cache: QuestionCache | None = None) -> QuestionBank:
+    """Reads the questions of a topic, from the question bank database when it is up to date.
+
+    The database of the subject directory is used if the topic was imported from the current version
+    of the Excel file, or if the Excel file no longer exists. Otherwise the Excel file is read.
+
+    Args:
+        questions_path (str): Path to the Excel file of the topic.
+        cache (QuestionCache | None, optional): Cache used when the Excel file is read. Defaults to None.
+
+    Returns:
+        QuestionBank: The questions of the topic.
+    """
+    excel_path = Path(questions_path)
+    imported_topic = read_topic(bank_path(excel_path.parent), excel_path.stem)
+    if imported_topic is not None:
+        questions, source = imported_topic
+        if not excel_path.exists() or _source_signature(excel_path) == source:
+            return questions
+    return read_questions_from_excel(questions_path, cache)
+
+
+def import_excel_banks(assessments_path: str | Path = "data/assessments", *, force: bool = False) -> list[ImportResult]:
+    """Imports the Excel files of every subject directory into the question bank database of the directory.
+
+    Args:
+        assessments_path (str | Path, optional): Directory of the subjects. Defaults to "data/assessments".
+        force (bool, optional): Import the unchanged Excel files as well. Defaults to False.
+
+    Returns:
+        list[ImportResult]: Outcome of each Excel file, "imported", "unchanged" or "failed".
+    """
+    results = []
+    for excel_path in sorted(Path(assessments_path).glob("*/*.xlsx")):
+        database_path = bank_path(excel_path.parent)
+        try:
+            source = _source_signature(excel_path)
+            imported_topic = None if force else read_topic(database_path, excel_path.stem)
+            if imported_topic is not None and imported_topic[1] == source:
+                results.append(ImportResult(str(excel_path), "unchanged"))
+                continue
+            questions = read_questions_from_excel(str(excel_path))
+            write_topic(database_path, excel_path.stem, questions, source)
+        # An invalid Excel file or a damaged database should not stop the import of the others.
+        except (OSError, ValueError, KeyError, sqlite3.Error) as exception:
+            results.append(ImportResult(str(excel_path), "failed", str(exception)))
+            continue
+        results.append(ImportResult(str(excel_path), "imported"))
+    return results
+
+
+def _connect(path: str | Path) -> sqlite3.Connection:
+    """Opens the database and creates its tables, an incompatible database is recreated."""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA foreign_keys = ON")
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version != BANK_VERSION:
+        # The database only holds imported data, so it can be rebuilt from the Excel files.
+        connection.executescript("DROP TABLE IF EXISTS questions; DROP TABLE IF EXISTS topics;")
+        connection.executescript(_SCHEMA)
+        connection.execute(f"PRAGMA user_version = {BANK_VERSION}")
+    return connection
+
+
+def _cell_text(value: object) -> str:
+    """Text of a cell of the Excel table, an empty cell (None or NaN) is stored as an empty string."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def _source_signature(path: Path) -> list[int]:
+    """Modification time and size of the Excel file, these change whenever the file is edited."""
+    stat_result = path.stat()
+    return [stat_result.st_mtime_ns, stat_result.st_size]
@@ -0,0 +1,160 @@
+"""
+Headless batch generation of assessments from job specification files.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from checkmark.generator.catalog import Catalog, load_catalog
+from checkmark.generator.generate import CheckmarkFields, GenerationOptions, generate_assessment
+from checkmark.generator.journal import attach_journal, get_journal
+
+# Values used for the optional job fields, these match the defaults of the GUI.
+JOB_DEFAULTS: dict[str, Any] = {
+    "online_evaluator": False,
+    "question_number": 20,
+    "random_question_order": True,
+    "random_option_order": True,
+    "seed": None,
+}
+
+
+@dataclass
+class JobResult:
+    """Outcome of a single generation job."""
+
+    job: CheckmarkFields
+    success: bool
+    seconds: float
+    error: str | None = None
+
+
+@dataclass
+class BatchSummary:
+    """Throughput summary of a batch generation run."""
+
+    results: list[JobResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def students(self: BatchSummary) -> int:
+        """Number of students over all jobs."""
+        return sum(len(result.job.students) for result in self.results)
+
+    @property
+    def failed_jobs(self: BatchSummary) -> list[JobResult]:
+        """Jobs that could not be generated completely."""
+        return [result for result in self.results if not result.success]
+
+    def __str__(self: BatchSummary) -> str:
+        """Returns a human readable summary of the run."""
+        assessments_per_second = self.students / self.seconds if self.seconds else 0.0
+        lines = [
+            f"{job_label(result.job)}: {'OK' if result.success else 'FAILED'} "
+            f"({len(result.job.students)} students, {result.seconds:.2f} s)"
+            + (f" - {result.error}" if result.error else "")
+            for result in self.results
+        ]
+        lines.append(
+            f"Generated {self.students} assessments in {len(self.results)} jobs "
+            f"in {self.seconds:.2f} s ({assessments_per_second:.2f} assessments/s), "
+            f"{len(self.failed_jobs)} failed.",
+        )
+        return "\n".join(lines)
+
+
+def read_batch_jobs(path: str | Path, catalog: Catalog | None = None) -> list[CheckmarkFields]:
+    """Reads generation jobs from a JSON job specification file.
+
+    The file contains a list of jobs (or an object with a "jobs" list), where each job has the fields
+    of CheckmarkFields. "class" can be used instead of "class_". When "students" is missing, every
+    student of the class is selected. The remaining optional fields default to the values of the GUI.
+
+    Args:
+        path (str | Path): Path to the job specification file.
+        catalog (Catalog | None, optional): Catalog used to look up the students of the classes,
+        loaded only when a job has no students. Defaults to load_catalog().
+
+    Raises:
+        ValueError: If a job has unknown or missing fields.
+        KeyError: If a job has no students and its class is not in the catalog.
+
+    Returns:
+        list[CheckmarkFields]: The jobs in the order of the file.
+    """
+    with Path(path).open("r", encoding="utf-8") as file_handle:
+        specification = json.load(file_handle)
+    if isinstance(specification, dict):
+        specification = specification["jobs"]
+
+    field_names = {checkmark_field.name for checkmark_field in fields(CheckmarkFields)}
+    jobs: list[CheckmarkFields] = []
+    for number, job_specification in enumerate(specification, start=1):
+        job_data = JOB_DEFAULTS | job_specification
+        if "class" in job_data:
+            job_data["class_"] = job_data.pop("class")
+        if "students" not in job_data and "class_" in job_data:
+            catalog = catalog or load_catalog()
+            job_data["students"] = catalog.students(job_data["class_"])
+
+        unknown_fields = set(job_data) - field_names
+        missing_fields = field_names - set(job_data)
+        if unknown_fields or missing_fields:
+            msg = (
+                f"Invalid job #{number}: "
+                f"unknown fields {sorted(unknown_fields)}, missing fields {sorted(missing_fields)}."
+            )
+            raise ValueError(msg)
+        jobs.append(CheckmarkFields(**job_data))
+    return jobs
+
+
+def run_batch(
+    jobs: list[CheckmarkFields],
+    workers: int | None = None,
+    options: GenerationOptions | None = None,
+) -> BatchSummary:
+    """Generates the assessments of every job concurrently, without any graphical interface.
+
+    Args:
+        jobs (list[CheckmarkFields]): Jobs to generate.
+        workers (int | None, optional): Number of worker processes, None uses every CPU. Defaults to None.
+        options (GenerationOptions | None, optional): Settings of the generation of each job, every job
+        runs in a single worker process. Defaults to GenerationOptions().
+
+    Returns:
+        BatchSummary: Outcome of each job and the overall duration.
+    """
+    start = time.perf_counter()
+    # The journal is written only by this process, the workers send their records to it.
+    journal = get_journal()
+    initargs = (journal.path, journal.share())
+    with ProcessPoolExecutor(max_workers=workers, initializer=attach_journal, initargs=initargs) as executor:
+        results = list(executor.map(partial(_run_job, options=options or GenerationOptions()), jobs))
+    journal.flush()
+    return BatchSummary(results, time.perf_counter() - start)
+
+
+def job_label(job: CheckmarkFields) -> str:
+    """Short identifier of a job used in the summary."""
+    return f"{job.date} {job.subject} {job.class_} {job.topic}"
+
+
+def _run_job(job: CheckmarkFields, options: GenerationOptions) -> JobResult:
+    """Generates a single job in a worker process."""
+    start = time.perf_counter()
+    try:
+        success = generate_assessment(job, options)
+    # A broken job (e.g. missing question bank) should not stop the rest of the batch.
+    except Exception as exception:  # noqa: BLE001
+        return JobResult(job, success=False, seconds=time.perf_counter() - start, error=str(exception))
+    return JobResult(job, success=success, seconds=time.perf_counter() - start)
@@ -0,0 +1,353 @@
+"""
+Catalog of the available classes, subjects and topics, used instead of scanning the data directories.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from checkmark.generator.question import QuestionCache
+
+CATALOG_PATH = "data/app/catalog.json"
+
+
+@dataclass
+class ClassEntry:
+    """Roster of a class from the "data/classes" directory."""
+
+    class_: str
+    students: list[str]
+    content_hash: str
+    source: list[int]
+
+    @property
+    def roster_size(self: ClassEntry) -> int:
+        """Number of students in the class."""
+        return len(self.students)
+
+
+@dataclass
+class TopicEntry:
+    """Question bank of a topic."""
+
+    topic: str
+    file: str
+    question_count: int | None
+    content_hash: str
+    source: list[int]
+
+
+@dataclass
+class SubjectEntry:
+    """Subject directory of a class number in the "data/assessments" directory."""
+
+    subject: str
+    class_number: str
+    source: list[int]
+    topics: list[TopicEntry] = field(default_factory=list)
+
+    @property
+    def directory(self: SubjectEntry) -> str:
+        """Name of the directory of the subject."""
+        return f"{self.subject}-{self.class_number}"
+
+
+@dataclass
+class Catalog:
+    """Classes, subjects and topics of the data directory.
+
+    The modification time of every listed directory and file is stored in the catalog,
+    a catalog is outdated if any of them changed since it was built.
+    """
+
+    data_path: str = "data"
+    classes: list[ClassEntry] = field(default_factory=list)
+    subjects: list[SubjectEntry] = field(default_factory=list)
+    sources: dict[str, list[int]] = field(default_factory=dict)
+    version: int = 1
+
+    def class_names(self: Catalog) -> list[str]:
+        """Names of the classes in ascending order."""
+        return [class_entry.class_ for class_entry in self.classes]
+
+    def students(self: Catalog, class_: str) -> list[str]:
+        """Students of the class in the order of the class file.
+
+        Raises:
+            KeyError: If the class is not in the catalog.
+        """
+        for class_entry in self.classes:
+            if class_entry.class_ == class_:
+                return class_entry.students
+        msg = f"Unknown class: {class_}"
+        raise KeyError(msg)
+
+    def subject_names(self: Catalog, class_number: str) -> list[str]:
+        """Subjects of the class number in ascending order."""
+        return [subject.subject for subject in self.subjects if subject.class_number == class_number]
+
+    def topics(self: Catalog, class_number: str, subject: str) -> list[TopicEntry]:
+        """Topics of the subject of the class number in ascending order."""
+        for subject_entry in self.subjects:
+            if subject_entry.class_number == class_number and subject_entry.subject == subject:
+                return subject_entry.topics
+        return []
+
+    def is_outdated(self: Catalog) -> bool:
+        """Checks whether any directory or file of the catalog changed since the catalog was built."""
+        signatures = self._directory_signatures()
+        for class_entry in self.classes:
+            signatures[_class_path(self.data_path, class_entry.class_)] = class_entry.source
+        for subject_entry in self.subjects:
+            subject_path = f"{self.data_path}/assessments/{subject_entry.directory}"
+            for topic_entry in subject_entry.topics:
+                signatures[f"{subject_path}/{topic_entry.file}"] = topic_entry.source
+        return any(_source_signature(path) != signature for path, signature in signatures.items())
+
+    def is_listing_outdated(self: Catalog) -> bool:
+        """Checks whether a class, subject or topic was added, removed or renamed since the catalog was built.
+
+        Only the directories are checked, not the files in them, so this is cheap enough on a network share
+        to be done whenever a menu of the GUI is opened.
+        """
+        signatures = self._directory_signatures()
+        return any(_source_signature(path) != signature for path, signature in signatures.items())
+
+    def _directory_signatures(self: Catalog) -> dict[str, list[int]]:
+        """Signatures of the classes, the assessments and the subject directories when the catalog was built."""
+        signatures = dict(self.sources)
+        for subject_entry in self.subjects:
+            signatures[f"{self.data_path}/assessments/{subject_entry.directory}"] = subject_entry.source
+        return signatures
+
+
+def build_catalog(
+    data_path: str = "data",
+    previous: Catalog | None = None,
+    cache: QuestionCache | None = None,
+    *,
+    shallow: bool = False,
+) -> Catalog:
+    """Scans the data directory and builds the catalog of it.
+
+    The entries of the previous catalog are reused for the unchanged files, so only the changed
+    question banks and rosters are read again.
+
+    Args:
+        data_path (str, optional): Path to the data directory. Defaults to "data".
+        previous (Catalog | None, optional): Previously built catalog. Defaults to None.
+        cache (QuestionCache | None, optional): Cache used to count the questions. Defaults to None.
+        shallow (bool, optional): Only list the directories: the entries of the previous catalog are reused
+        by name without checking their files, and the new question banks are listed without reading them.
+        Only the new rosters are read. Defaults to False.
+
+    Returns:
+        Catalog: The catalog of the data directory.
+    """
+    classes_path = f"{data_path}/classes"
+    assessments_path = f"{data_path}/assessments"
+    catalog = Catalog(
+        data_path,
+        sources={path: _source_signature(path) for path in (classes_path, assessments_path)},
+    )
+    previous_classes = {class_entry.class_: class_entry for class_entry in previous.classes} if previous else {}
+    previous_subjects = {subject.directory: subject for subject in previous.subjects} if previous else {}
+
+    for class_file in _list_directory(classes_path):
+        if not class_file.endswith(".csv") or not _is_class_name(class_file.removesuffix(".csv")):
+            continue
+        class_ = class_file.removesuffix(".csv")
+        class_path = _class_path(data_path, class_)
+        previous_class = previous_classes.get(class_)
+        source = previous_class.source if shallow and previous_class is not None else _source_signature(class_path)
+        if previous_class is not None and previous_class.source == source:
+            catalog.classes.append(previous_class)
+            continue
+        content = Path(class_path).read_bytes()
+        students = content.decode("utf-8").splitlines()[0].strip().split(", ") if content.strip() else []
+        catalog.classes.append(ClassEntry(class_, students, hashlib.sha256(content).hexdigest(), source))
+    catalog.classes.sort(key=lambda class_entry: _class_sort_key(class_entry.class_))
+
+    for directory in _list_directory(assessments_path):
+        subject_path = f"{assessments_path}/{directory}"
+        subject, _, class_number = directory.rpartition("-")
+        if not (subject and Path(subject_path).is_dir()):
+            continue
+        previous_subject = previous_subjects.get(directory)
+        previous_topics = {topic.file: topic for topic in previous_subject.topics} if previous_subject else {}
+        subject_entry = SubjectEntry(subject, class_number, _source_signature(subject_path))
+        for topic_file in _list_directory(subject_path):
+            if not (topic_file.endswith(".xlsx") and _is_topic_file(topic_file)):
+                continue
+            previous_topic = previous_topics.get(topic_file)
+            if shallow:
+                # The empty source marks the question bank as not yet read, the next full build reads it.
+                topic_entry = previous_topic or TopicEntry(_topic_name(topic_file), topic_file, None, "", [])
+            else:
+                topic_entry = _topic_entry(f"{subject_path}/{topic_file}", previous_topic, cache)
+            subject_entry.topics.append(topic_entry)
+        subject_entry.topics.sort(key=lambda topic_entry: _topic_sort_key(topic_entry.file))
+        catalog.subjects.append(subject_entry)
+    catalog.subjects.sort(key=lambda subject_entry: subject_entry.directory)
+    return catalog
+
+
+def read_catalog(path: str | Path = CATALOG_PATH) -> Catalog | None:
+    """Reads the saved catalog, or returns None if it is missing or invalid."""
+    try:
+        with Path(path).open("r", encoding="utf-8") as file_handle:
+            catalog_data = json.load(file_handle)
+        catalog = Catalog(
+            catalog_data["data_path"],
+            [ClassEntry(**class_entry) for class_entry in catalog_data["classes"]],
+            [
+                SubjectEntry(
+                    subject["subject"],
+                    subject["class_number"],
+                    subject["source"],
+                    [TopicEntry(**topic) for topic in subject["topics"]],
+                )
+                for subject in catalog_data["subjects"]
+            ],
+            catalog_data["sources"],
+            catalog_data["version"],
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return catalog if catalog.version == Catalog.version else None
+
+
+def write_catalog(catalog: Catalog, path: str | Path = CATALOG_PATH) -> None:
+    """Saves the catalog, parallel readers never see a partially written file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as file_handle:
+        json.dump(asdict(catalog), file_handle, indent=4, ensure_ascii=False)
+    Path(file_handle.name).replace(path)
+
+
+def load_catalog(data_path: str = "data", path: str | Path = CATALOG_PATH) -> Catalog:
+    """Returns the saved catalog, rebuilding and saving it first if it is missing or outdated.
+
+    Args:
+        data_path (str, optional): Path to the data directory. Defaults to "data".
+        path (str | Path, optional): Path to the saved catalog. Defaults to CATALOG_PATH.
+
+    Returns:
+        Catalog: The up-to-date catalog of the data directory.
+    """
+    catalog = read_catalog(path)
+    if catalog is not None and catalog.data_path == data_path and not catalog.is_outdated():
+        return catalog
+    catalog = build_catalog(data_path, catalog if catalog is not None and catalog.data_path == data_path else None)
+    write_catalog(catalog, path)
+    return catalog
+
+
+def load_catalog_listing(
+    data_path: str = "data",
+    path: str | Path = CATALOG_PATH,
+    catalog: Catalog | None = None,
+) -> Catalog:
+    """Returns a catalog listing the current classes, subjects and topics, only the directories are checked.
+
+    Unlike load_catalog, the files are not checked and the new question banks are not read, so it can be
+    called from the GUI whenever a menu is opened. The new question banks have no question count until
+    load_catalog or "checkmark index" reads them. The catalog is not saved.
+
+    Args:
+        data_path (str, optional): Path to the data directory. Defaults to "data".
+        path (str | Path, optional): Path to the saved catalog, read if no catalog is given.
+        Defaults to CATALOG_PATH.
+        catalog (Catalog | None, optional): The catalog in use. Defaults to None.
+
+    Returns:
+        Catalog: The catalog, rebuilt from the directories if any of them changed.
+    """
+    if catalog is None:
+        catalog = read_catalog(path)
+    if catalog is not None and catalog.data_path != data_path:
+        catalog = None
+    if catalog is not None and not catalog.is_listing_outdated():
+        return catalog
+    return build_catalog(data_path, catalog, shallow=True)
+
+
+def topic_file_name(topic: str) -> str:
+    """Name of the question bank of the topic, e.g. "1_Első_téma.xlsx" for "1. Első téma"."""
+    return topic.replace(" ", "_").replace(".", "") + ".xlsx"
+
+
+def _topic_entry(topic_path: str, previous: TopicEntry | None, cache: QuestionCache | None) -> TopicEntry:
+    """Entry of the question bank, the previous entry is reused if the file is unchanged."""
+    source = _source_signature(topic_path)
+    if previous is not None and previous.source == source:
+        return previous
+    # pandas is only imported when an Excel file has to be read.
+    from checkmark.generator.bank import read_topic_questions
+    from checkmark.generator.question import QuestionCache
+
+    topic_file = Path(topic_path).name
+    try:
+        question_count: int | None = len(read_topic_questions(topic_path, cache or QuestionCache()))
+    # An invalid question bank is still listed, the error is reported when it is generated.
+    except (OSError, ValueError, KeyError):
+        question_count = None
+    content_hash = hashlib.sha256(Path(topic_path).read_bytes()).hexdigest()
+    return TopicEntry(_topic_name(topic_file), topic_file, question_count, content_hash, source)
+
+
+def _topic_name(topic_file: str) -> str:
+    """Name of the topic of the question bank, e.g. "1. Első téma" for "1_Első_téma.xlsx"."""
+    number, name = topic_file.removesuffix(".xlsx").split("_", maxsplit=1)
+    return f"{number}. {name.replace('_', ' ')}"
+
+
+def _class_path(data_path: str, class_: str) -> str:
+    return f"{data_path}/classes/{class_}.csv"
+
+
+def _list_directory(path: str) -> list[str]:
+    """Names in the directory, or an empty list if the directory is missing."""
+    try:
+        return os.listdir(path)  # noqa: PTH208
+    except OSError:
+        return []
+
+
+def _source_signature(path: str) -> list[int]:
+    """Modification time and size of the file or directory, or an empty list if it is missing."""
+    try:
+        stat_result = Path(path).stat()
+    except OSError:
+        return []
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+
+def _is_class_name(class_: str) -> bool:
+    number, _, letter = class_.partition("-")
+    return number.isdigit() and bool(letter)
+
+
+def _class_sort_key(class_: str) -> tuple[int, str]:
+    number, letter = class_.split("-", maxsplit=1)
+    return int(number), letter
+
+
+def _is_topic_file(topic_file: str) -> bool:
+    number, _, name = topic_file.partition("_")
+    return number.isdigit() and bool(name)
+
+
+def _topic_sort_key(topic_file: str) -> tuple[int, str]:
+    number, name = topic_file.split("_", maxsplit=1)
+    return int(number), name
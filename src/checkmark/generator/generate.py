@@ -8,18 +8,30 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import random
 import string
-from dataclasses import asdict, dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from textwrap import dedent
+from typing import TYPE_CHECKING
 
-import requests
+from checkmark.generator.bank import read_topic_questions
+from checkmark.generator.catalog import topic_file_name
+from checkmark.generator.journal import get_journal
+from checkmark.generator.manifest import Manifest, ManifestEntry, input_hash, read_manifest, write_manifest
+from checkmark.generator.pdf import PDFData, create_pdf, write_merged_pdf
+from checkmark.generator.question import QuestionCache, select_questions
+from checkmark.generator.registration import get_pocket_registrar
 
-from checkmark import BASE_URL, REGISTER_POCKET_ENDPOINT
-from checkmark.generator.pdf import PDFData, create_pdf
-from checkmark.generator.question import read_questions_from_excel, select_questions
+if TYPE_CHECKING:
+    import threading
+    from collections.abc import Callable, Iterable
+
+    from checkmark.generator.journal import GenerationJournal
+    from checkmark.generator.question import QuestionBank
 
 
 @dataclass
@@ -35,108 +47,343 @@ class CheckmarkFields:
     question_number: int
     random_question_order: bool
     random_option_order: bool
+    seed: int | None = None
 
 
 @dataclass
 class PocketData:
-    """Data for the online evaluation pocket. This info is sent to the server."""
+    """Data for the online evaluation pocket. This info is sent to the server.
+
+    The roster lists every student the pocket was generated for, in the order they were added.
+    The position of a student in it is the student ID of the compact solution QR code, so students
+    are only appended to the roster and an ID is never reused, even if the class changes.
+    """
 
     students: list[str]
     date: str
     pocket_id: str
     pocket_password: str
+    roster: list[str] = field(default_factory=list)
+
+    def __post_init__(self: PocketData) -> None:
+        """Pockets saved before the roster was introduced used the position in the students as the ID."""
+        if not self.roster:
+            self.roster = list(self.students)
+
+    def update_students(self: PocketData, students: list[str]) -> None:
+        """Selects the students of a new generation, the new students are appended to the roster."""
+        self.students = students
+        for student in students:
+            if student not in self.roster:
+                self.roster.append(student)
+
+    def student_id(self: PocketData, student: str) -> int:
+        """Stable ID of the student, the position of the student in the roster."""
+        return self.roster.index(student)
+
+
+@dataclass
+class GenerationOptions:
+    """Settings of the generation process. These do not change the content of the assessments."""
+
+    workers: int | None = 1
+    vector_qr: bool = False
+    merged: bool = False
+    duplex: bool = False
+    incremental: bool = False
+
+
+@dataclass
+class GenerationJob:
+    """Data shared by the assessments of every student of a job. This is sent to the worker processes."""
+
+    checkmark_fields: CheckmarkFields
+    all_questions: QuestionBank
+    pocket_data: PocketData
+    pdf_path: str
+    options: GenerationOptions
+    seed: int
+    # Input hashes of the documents already generated, these are not generated again.
+    previous_hashes: dict[str, str] = field(default_factory=dict)
 
 
-def generate_assessment(checkmark_fields: CheckmarkFields) -> bool:
+@dataclass
+class StudentResult:
+    """Outcome of the assessment generation for a single student."""
+
+    student: str
+    pdf_data: PDFData | None = None
+    error: str | None = None
+    input_hash: str | None = None
+    skipped: bool = False
+
+
+def generate_assessment(
+    checkmark_fields: CheckmarkFields,
+    options: GenerationOptions | None = None,
+    progress: Callable[[str, int, int], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> bool:
     """Manages and logs assessment generation.
 
     Args:
         checkmark_fields (CheckmarkFields): Data necessary for checkmark generator.
+        options (GenerationOptions | None, optional): Settings of the generation process.
+        With more than one worker the students are distributed across a process pool,
+        None uses as many workers as there are CPUs. With vector_qr the QR codes are drawn
+        as vector graphics instead of embedded images. With merged the assessments are written
+        into a single print-ordered PDF, duplex starts every assessment on a new sheet in it.
+        With incremental the pocket and the seed of the previous generation are reused, and
+        only the documents with changed inputs are generated again. A seeded generation reuses the
+        pocket of the previous generation too, so its documents are identical. Defaults to GenerationOptions().
+        progress (Callable[[str, int, int], None] | None, optional): Called with the student, the number of
+        the finished students and the number of all students after each student. Defaults to None.
+        cancel (threading.Event | None, optional): When set, the generation stops after the documents
+        being generated. Defaults to None.
 
     Returns:
-        bool: True if the assessments were generated successfully, False otherwise.
+        bool: True if the assessments were generated successfully, False otherwise (or if cancelled).
     """
-    logger = _setup_logger(__name__)
+    options = options or GenerationOptions()
+    journal = get_journal()
+    # Disable warning: "FFTM NOT subset; don't know how to subset; dropped" from fontTools
+    logging.getLogger("fontTools").setLevel(logging.ERROR)
     pdf_path = f"data/generated/{checkmark_fields.date}_{checkmark_fields.subject}_{checkmark_fields.class_}"
     Path(pdf_path).mkdir(parents=True, exist_ok=True)
 
     class_number = checkmark_fields.class_.split("-")[0]
-    topic_path = checkmark_fields.topic.replace(" ", "_").replace(".", "") + ".xlsx"
+    topic_path = topic_file_name(checkmark_fields.topic)
     questions_path = f"data/assessments/{checkmark_fields.subject}-{class_number}/{topic_path}"
-    all_questions = read_questions_from_excel(questions_path)
-
-    pocket_data = _generate_pocket_data(checkmark_fields.students, checkmark_fields.date)
+    all_questions = read_topic_questions(questions_path, QuestionCache())
+
+    manifest = read_manifest(pdf_path) if options.incremental else None
+    # A seeded run reuses the pocket as well, otherwise the pocket ID and password on the sheets would change.
+    reuse_pocket = options.incremental or checkmark_fields.seed is not None
+    pocket_data = _read_pocket_data(pdf_path) if reuse_pocket else None
+    if pocket_data is not None:
+        pocket_data.update_students(checkmark_fields.students)
+    else:
+        pocket_data = _generate_pocket_data(checkmark_fields.students, checkmark_fields.date)
     with Path(f"{pdf_path}/pocket_data.json").open("w", encoding="utf-8") as file_handle:
         json.dump(asdict(pocket_data), file_handle, indent=4, ensure_ascii=False)
 
-    if checkmark_fields.online_evaluator and not _send_pocket_data(pocket_data):
-        return False
+    # The pocket is registered in the background while the documents are generated.
+    registration = get_pocket_registrar().register(pocket_data) if checkmark_fields.online_evaluator else None
+
+    # Without a seed a new one is drawn, it is saved in the journal so any assessment can be regenerated.
+    seed = checkmark_fields.seed
+    if seed is None and manifest is not None:
+        seed = manifest.seed
+    if seed is None:
+        seed = random.SystemRandom().randrange(2**63)
+    previous_hashes = {}
+    if manifest is not None:
+        previous_hashes = {student: entry.input_hash for student, entry in manifest.students.items()}
+    job = GenerationJob(checkmark_fields, all_questions, pocket_data, pdf_path, options, seed, previous_hashes)
+    if options.merged:
+        # The questions are selected in the workers, the single document is written in this process.
+        generate_student = partial(_select_student_assessment, job=job)
+    else:
+        generate_student = partial(_generate_student_assessment, job=job)
+    workers = min(options.workers or os.cpu_count() or 1, len(checkmark_fields.students))
+    results = _run_students(generate_student, checkmark_fields.students, workers, progress, cancel)
+
+    cancelled = len(results) < len(checkmark_fields.students)
+    if cancelled:
+        journal.logger.warning(
+            "Generation cancelled after %d of %d students.",
+            len(results),
+            len(checkmark_fields.students),
+        )
+        if options.merged:
+            # An incomplete merged document is not written.
+            results = []
+    if options.merged:
+        results = _generate_merged_assessment(results, job)
+    else:
+        _update_manifest(results, job, manifest)
+    if registration is not None and not registration.result():
+        journal.logger.warning("Pocket %s is queued for a later registration.", pocket_data.pocket_id)
+    success = _record_results(results, checkmark_fields, journal)
+
+    # TODO: Add document printing functionality
+    # https://stackoverflow.com/questions/27195594/python-silent-print-pdf-to-specific-printer
+    return success and not cancelled
+
+
+def _run_students(
+    generate_student: Callable[[str], StudentResult],
+    students: list[str],
+    workers: int,
+    progress: Callable[[str, int, int], None] | None,
+    cancel: threading.Event | None,
+) -> list[StudentResult]:
+    """Generates the assessments of the students, stopping early if the generation is cancelled.
 
-    for student in checkmark_fields.students:
-        random.seed()
+    Results are returned in the order of the students, so the log stays ordered.
+    """
+    results: list[StudentResult] = []
+    if workers <= 1:
+        for student in students:
+            if cancel is not None and cancel.is_set():
+                break
+            results.append(generate_student(student))
+            if progress is not None:
+                progress(student, len(results), len(students))
+        return results
+
+    chunksize = max(1, len(students) // (4 * workers))
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for result in executor.map(generate_student, students, chunksize=chunksize):
+            results.append(result)
+            if progress is not None:
+                progress(result.student, len(results), len(students))
+            if cancel is not None and cancel.is_set():
+                break
+    finally:
+        # The documents already being generated are finished, the pending ones are dropped.
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def _select_student_assessment(student: str, job: GenerationJob) -> StudentResult:
+    """Selects the questions of a single student without creating the PDF document.
+
+    This function runs in the worker processes as well, so errors are returned instead of raised.
+    """
+    checkmark_fields = job.checkmark_fields
+    try:
         questions = select_questions(
-            all_questions,
+            job.all_questions,
             checkmark_fields.question_number,
             checkmark_fields.random_question_order,
             checkmark_fields.random_option_order,
+            student_rng(job.seed, student),
         )
+    # Any failure should only affect the assessment of the given student.
+    except Exception as exception:  # noqa: BLE001
+        return StudentResult(student, error=f"{type(exception).__name__}: {exception}")
+
+    pdf_data = PDFData(
+        student,
+        checkmark_fields.class_,
+        checkmark_fields.subject,
+        checkmark_fields.topic,
+        checkmark_fields.date,
+        questions,
+        job.pocket_data.pocket_id,
+        job.pocket_data.pocket_password,
+        vector_qr=job.options.vector_qr,
+        seed=job.seed,
+        student_id=job.pocket_data.student_id(student),
+    )
+    return StudentResult(student, pdf_data=pdf_data, input_hash=input_hash(pdf_data))
 
-        pdf_data = PDFData(
-            student,
-            checkmark_fields.class_,
-            checkmark_fields.subject,
-            checkmark_fields.topic,
-            checkmark_fields.date,
-            questions,
-            pocket_data.pocket_id,
-            pocket_data.pocket_password,
-        )
 
-        pdf = create_pdf(pdf_data)
-        pdf_name = f"{pdf_path}/{checkmark_fields.topic.replace('.', '')}_{student}.pdf"
-        pdf_name = pdf_name.replace(" ", "_")
-        pdf.output(pdf_name)
+def student_rng(seed: int, student: str, stream: str = "questions") -> random.Random:
+    """Independent random generator of a student derived from the seed of the job.
 
-        _log_data(pdf_data, logger)
+    The generator only depends on its arguments, so the assessment of a student is the same
+    regardless of the order of the students or how they are distributed across the workers.
 
-    # TODO: Add document printing functionality
-    # https://stackoverflow.com/questions/27195594/python-silent-print-pdf-to-specific-printer
-    return True
+    Args:
+        seed (int): Seed of the job.
+        student (str): Name of the student.
+        stream (str, optional): Purpose of the generator, each purpose gets a separate stream.
+        Defaults to "questions".
 
+    Returns:
+        random.Random: The seeded random generator.
+    """
+    # String seeds are hashed with SHA-512, independently of the hash randomization of the process.
+    return random.Random(f"{seed}:{stream}:{student}")  # noqa: S311
 
-def _setup_logger(logger_name: str) -> logging.Logger:
-    """Setting up the logger for the checkmark generator."""
-    log_path = "data/app/"
-    Path(log_path).mkdir(exist_ok=True)
 
-    logger = logging.getLogger(logger_name)
-    logger.setLevel(logging.INFO)
-    formatter = logging.Formatter("%(levelname)s:%(asctime)s:\n%(message)s\n")
-    file_handler = logging.FileHandler(log_path + "checkmark.log", encoding="utf-8")
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+def _generate_student_assessment(student: str, job: GenerationJob) -> StudentResult:
+    """Generates and saves the assessment of a single student.
 
-    # Disable warning: "FFTM NOT subset; don't know how to subset; dropped" from fontTools
-    logging.getLogger("fontTools").setLevel(logging.ERROR)
-    return logger
-
-
-def _log_data(pdf_data: PDFData, logger: logging.Logger) -> None:
-    """Save logged data."""
-    log_text = dedent(
-        f"""\
-        Pocket: {pdf_data.pocket_id}
-        Name: {pdf_data.student}
-        Class: {pdf_data.class_}
-        Subject: {pdf_data.subject}
-        Topic: {pdf_data.topic}
-        Date: {pdf_data.date}
-        Questions:
-    """,
-    )
-    for question_number, question in enumerate(pdf_data.questions):
-        log_text += f"{question_number + 1}: {question}\n"
-    logger.info(log_text)
+    This function runs in the worker processes as well, so errors are returned instead of raised.
+    """
+    result = _select_student_assessment(student, job)
+    if result.pdf_data is None:
+        return result
+    pdf_name = _student_pdf_name(job, student)
+    if job.previous_hashes.get(student) == result.input_hash and Path(pdf_name).exists():
+        result.skipped = True
+        return result
+    try:
+        pdf = create_pdf(result.pdf_data)
+        pdf.output(pdf_name)
+    # Any failure should only affect the assessment of the given student.
+    except Exception as exception:  # noqa: BLE001
+        return StudentResult(student, error=f"{type(exception).__name__}: {exception}")
+    return result
+
+
+def _student_pdf_name(job: GenerationJob, student: str) -> str:
+    """Path of the document of the student."""
+    pdf_name = f"{job.pdf_path}/{job.checkmark_fields.topic.replace('.', '')}_{student}.pdf"
+    return pdf_name.replace(" ", "_")
+
+
+def _update_manifest(results: list[StudentResult], job: GenerationJob, previous_manifest: Manifest | None) -> None:
+    """Saves the manifest of the generated documents and removes the documents of the dropped students."""
+    manifest = Manifest(job.seed)
+    for result in results:
+        if result.error is None and result.input_hash is not None:
+            manifest.students[result.student] = ManifestEntry(
+                Path(_student_pdf_name(job, result.student)).name,
+                result.input_hash,
+            )
+    if previous_manifest is not None:
+        for student, entry in previous_manifest.students.items():
+            if student not in job.checkmark_fields.students:
+                (Path(job.pdf_path) / entry.file).unlink(missing_ok=True)
+    write_manifest(job.pdf_path, manifest)
+
+
+def _generate_merged_assessment(results: list[StudentResult], job: GenerationJob) -> list[StudentResult]:
+    """Writes the selected assessments into a single document in the order of the students."""
+    pdf_data_list = [result.pdf_data for result in results if result.pdf_data is not None]
+    topic = job.checkmark_fields.topic.replace(".", "")
+    try:
+        write_merged_pdf(
+            pdf_data_list,
+            f"{job.pdf_path}/{topic}_{job.checkmark_fields.class_}.pdf".replace(" ", "_"),
+            job.options.duplex,
+        )
+    # A broken document affects every student of the job.
+    except Exception as exception:  # noqa: BLE001
+        error = f"{type(exception).__name__}: {exception}"
+        return [StudentResult(result.student, error=result.error or error) for result in results]
+    return results
+
+
+def _record_results(
+    results: Iterable[StudentResult],
+    checkmark_fields: CheckmarkFields,
+    journal: GenerationJournal,
+) -> bool:
+    """Records the results in the order of the students and reports whether all of them succeeded."""
+    success = True
+    for result in results:
+        if result.skipped:
+            continue
+        if result.pdf_data is not None:
+            journal.record_assessment(result.pdf_data)
+        else:
+            journal.record_error(
+                result.student,
+                checkmark_fields.class_,
+                checkmark_fields.subject,
+                checkmark_fields.topic,
+                checkmark_fields.date,
+                result.error,
+            )
+            success = False
+    journal.flush()
+    return success
 
 
 def _generate_pocket_data(students: list[str], date: str) -> PocketData:
@@ -149,15 +396,15 @@ def _generate_pocket_data(students: list[str], date: str) -> PocketData:
     return PocketData(students, date, pocket_id, pocket_password)
 
 
+def _read_pocket_data(pdf_path: str) -> PocketData | None:
+    """Reads the pocket data of a previous generation, or returns None if there is none."""
+    try:
+        with Path(f"{pdf_path}/pocket_data.json").open("r", encoding="utf-8") as file_handle:
+            return PocketData(**json.load(file_handle))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
 def _send_pocket_data(pocket_data: PocketData) -> bool:
     """Send pocket data to the server."""
-    target_url = BASE_URL + REGISTER_POCKET_ENDPOINT
-    ok_response = 200
-    data_json = json.dumps(asdict(pocket_data))
-    try:
-        response = requests.post(url=target_url, json=data_json, timeout=5).json()
-        if response.status_code != ok_response:
-            return False
-    except requests.exceptions.ConnectionError:
-        return False
-    return True
+    return get_pocket_registrar().send(asdict(pocket_data))
@@ -6,22 +6,28 @@ Graphical User Interface that aggregates necessary information for assessment ge
 
 from __future__ import annotations
 
+import importlib
 import json
 import os
 import platform
+import queue
 import random
 import subprocess
+import threading
 import tkinter as tk
 import webbrowser
 from pathlib import Path
 from tkinter import messagebox
+from typing import TYPE_CHECKING
 
-import requests
 import ttkbootstrap as ttk
 from ttkbootstrap import Style
 
-from checkmark import BASE_URL, REGISTER_POCKET_ENDPOINT
-from checkmark.generator.generate import CheckmarkFields, generate_assessment
+from checkmark.generator.catalog import load_catalog, load_catalog_listing
+
+if TYPE_CHECKING:
+    from checkmark.generator.catalog import Catalog
+    from checkmark.generator.generate import CheckmarkFields
 
 
 class GeneratorInterface(tk.Tk):
@@ -49,6 +55,14 @@ class GeneratorInterface(tk.Tk):
         self.style = Style(theme="superhero")
 
         self.validator = InterfaceValidation(self)
+        # The dropdowns are filled from the saved catalog, the UI thread only checks the data directories.
+        # The question banks and rosters are read by load_catalog in the background, as "checkmark index" does.
+        self.catalog = load_catalog_listing()
+        self._indexed_catalog: Catalog | None = None
+        self._index_thread: threading.Thread | None = None
+        self._index_catalog()
+        # The generator modules (pandas, fpdf2, ...) are imported in the background while the window opens.
+        threading.Thread(target=importlib.import_module, args=("checkmark.generator.generate",), daemon=True).start()
 
         container = tk.Frame(self)
         container.pack(side="top", fill="both", expand=True)
@@ -71,6 +85,27 @@ class GeneratorInterface(tk.Tk):
         self.data_page.grid(row=2, column=0, sticky="nsew")
         self.submit_page.grid(row=2, column=1, sticky="nsew")
 
+    def refresh_catalog(self: GeneratorInterface) -> None:
+        """Updates the catalog when a dropdown is opened, only the data directories are checked for changes."""
+        indexed_catalog, self._indexed_catalog = self._indexed_catalog, None
+        if indexed_catalog is not None:
+            self.catalog = indexed_catalog
+        if self.catalog.is_listing_outdated():
+            self.catalog = load_catalog_listing(catalog=self.catalog)
+            self._index_catalog()
+
+    def _index_catalog(self: GeneratorInterface) -> None:
+        """Reads the new and changed question banks and rosters into the catalog in a background thread."""
+        if self._index_thread is not None and self._index_thread.is_alive():
+            return
+
+        def index() -> None:
+            # The indexed catalog is picked up by refresh_catalog on the UI thread.
+            self._indexed_catalog = load_catalog()
+
+        self._index_thread = threading.Thread(target=index, daemon=True)
+        self._index_thread.start()
+
 
 class TopicPage(tk.Frame):
     """Top-Left part of the GUI. Responsible for selecting the class, subject and topic."""
@@ -95,7 +130,7 @@ class TopicPage(tk.Frame):
         # Class
         # TODO: Add styling to dropdown menu as well
         self.class_label = tk.Label(self, text=self.topic_page_language["class_label"])
-        self.available_classes = self._list_available_classes()
+        self.available_classes = self.controller.catalog.class_names()
         self.class_stringvar = tk.StringVar()
         self.class_stringvar.set(self.topic_page_language["class_stringvar"])
         self.class_stringvar.trace(
@@ -108,13 +143,8 @@ class TopicPage(tk.Frame):
             style="info.Outline.TMenubutton",
             width=15,
         )
-        self.class_menu = tk.Menu(self.class_menubutton, tearoff=0)
-        for class_name in self.available_classes:
-            self.class_menu.add_radiobutton(
-                label=class_name,
-                value=class_name,
-                variable=self.class_stringvar,
-            )
+        self.class_menu = tk.Menu(self.class_menubutton, tearoff=0, postcommand=self._refresh_classes)
+        self._fill_menu(self.class_menu, self.available_classes, self.class_stringvar)
         self.class_menubutton["menu"] = self.class_menu
 
         # Subject
@@ -130,7 +160,7 @@ class TopicPage(tk.Frame):
             state="disabled",
             width=15,
         )
-        self.subject_menu = tk.Menu(self.subject_menubutton, tearoff=0)
+        self.subject_menu = tk.Menu(self.subject_menubutton, tearoff=0, postcommand=self._refresh_subjects)
 
         # Topic
         self.topic_label = tk.Label(self, text=self.topic_page_language["topic_label"])
@@ -145,7 +175,7 @@ class TopicPage(tk.Frame):
             state="disabled",
             width=15,
         )
-        self.topic_menu = tk.Menu(self.topic_menubutton, tearoff=0)
+        self.topic_menu = tk.Menu(self.topic_menubutton, tearoff=0, postcommand=self._refresh_topics)
 
         # Grid
         self.class_label.grid(row=0, column=0, padx=10, pady=(18, 8), sticky="nw")
@@ -167,25 +197,16 @@ class TopicPage(tk.Frame):
     def _reset_subjects(self: TopicPage) -> None:
         """Reloads the possible subjects based on the selected class."""
         class_number = self.class_stringvar.get().split("-")[0]
-        self.available_subjects = self._list_available_subjects(class_number)
+        self.available_subjects = self.controller.catalog.subject_names(class_number)
 
         self.subject_stringvar.set(self.topic_page_language["subject_stringvar"])
         self.subject_menubutton.configure(state="normal")
-        self.subject_menu.delete(0, "end")
-
-        for subject in self.available_subjects:
-            subject_text = subject.split("-")[0]
-            self.subject_menu.add_radiobutton(
-                label=subject_text,
-                value=subject_text,
-                variable=self.subject_stringvar,
-            )
+        self._fill_menu(self.subject_menu, self.available_subjects, self.subject_stringvar)
         self.subject_menubutton["menu"] = self.subject_menu
         self._reset_topics()
 
     def _reset_topics(self: TopicPage, *args) -> None:  # type: ignore [no-untyped-def]  # noqa: ANN002, ARG002
         """Reloads the possible topics based on the selected class and subject."""
-        class_number = self.class_stringvar.get()
         subject_name = self.subject_stringvar.get()
 
         self.subject_menubutton.configure(text=subject_name)
@@ -197,23 +218,41 @@ class TopicPage(tk.Frame):
             self.topic_menu.delete(0, "end")
         else:
             self.topic_menubutton.configure(state="normal")
-            self.topic_menu.delete(0, "end")
+            self.available_topics = self._catalog_topics()
+            self._fill_menu(self.topic_menu, self.available_topics, self.topic_stringvar)
+            self.topic_menubutton["menu"] = self.topic_menu
 
-            self.available_topics = self._list_available_topics(
-                class_number.split("-")[0],
-                subject_name.split("-")[0],
-            )
+    def _refresh_classes(self: TopicPage) -> None:
+        """Reloads the catalog and the possible classes when the class dropdown is opened."""
+        self.controller.refresh_catalog()
+        self.available_classes = self.controller.catalog.class_names()
+        self._fill_menu(self.class_menu, self.available_classes, self.class_stringvar)
 
-            for available_topic in self.available_topics:
-                topic = available_topic.split(".")[0].replace("_", " ").split(" ")
-                topic[0] += "."
-                topic_value = " ".join(topic)
-                self.topic_menu.add_radiobutton(
-                    label=topic_value,
-                    value=topic_value,
-                    variable=self.topic_stringvar,
-                )
-            self.topic_menubutton["menu"] = self.topic_menu
+    def _refresh_subjects(self: TopicPage) -> None:
+        """Reloads the catalog and the possible subjects when the subject dropdown is opened."""
+        self.controller.refresh_catalog()
+        class_number = self.class_stringvar.get().split("-")[0]
+        self.available_subjects = self.controller.catalog.subject_names(class_number)
+        self._fill_menu(self.subject_menu, self.available_subjects, self.subject_stringvar)
+
+    def _refresh_topics(self: TopicPage) -> None:
+        """Reloads the catalog and the possible topics when the topic dropdown is opened."""
+        self.controller.refresh_catalog()
+        self.available_topics = self._catalog_topics()
+        self._fill_menu(self.topic_menu, self.available_topics, self.topic_stringvar)
+
+    def _catalog_topics(self: TopicPage) -> list[str]:
+        """Topics of the selected class and subject in the catalog."""
+        class_number = self.class_stringvar.get().split("-")[0]
+        subject_name = self.subject_stringvar.get()
+        return [topic_entry.topic for topic_entry in self.controller.catalog.topics(class_number, subject_name)]
+
+    @staticmethod
+    def _fill_menu(menu: tk.Menu, labels: list[str], variable: tk.StringVar) -> None:
+        """Replaces the items of the dropdown menu with a radio button for each label."""
+        menu.delete(0, "end")
+        for label in labels:
+            menu.add_radiobutton(label=label, value=label, variable=variable)
 
     def _change_topic_menubar_text(  # type: ignore [no-untyped-def]
         self: TopicPage,
@@ -222,66 +261,6 @@ class TopicPage(tk.Frame):
         """Change the text of the topic menubar when a topic is selected."""
         self.topic_menubutton.configure(text=self.topic_stringvar.get())
 
-    @staticmethod
-    def _list_available_classes() -> list[str]:
-        """
-        Checks the "data/classes" directory for .csv files for available classes.
-
-        Returns:
-            list[str]: List of the class numbers in ascending order.
-        """
-        available_classes: list[str] = []
-        for class_name in os.listdir("data/classes"):
-            if class_name.endswith(".csv"):
-                index = class_name.rindex(".")
-                available_classes.append(class_name[:index])
-
-        def compare_class_numbers(class_name: str) -> tuple[int, str]:
-            number, letter = class_name.split("-")
-            return int(number), letter
-
-        return sorted(set(available_classes), key=compare_class_numbers)
-
-    @staticmethod
-    def _list_available_subjects(class_number: str) -> list[str]:
-        """
-        Checks the "data/assessments" directory for available subjects that corresponds to the selected class.
-
-        Args:
-            class_number (str): The number of the selected class.
-
-        Returns:
-            list[str]: List of the available subjects in ascending order.
-        """
-        available_subjects = []
-        for subject_name in os.listdir("data/assessments"):
-            subject_name_is_directory = Path(f"data/assessments/{subject_name}").is_dir()
-            subject_name_matches_class = subject_name.split("-")[-1] == class_number
-            if subject_name_is_directory and subject_name_matches_class:
-                available_subjects.append(subject_name)
-        return sorted(set(available_subjects))
-
-    @staticmethod
-    def _list_available_topics(class_number: str, subject_name: str) -> list[str]:
-        """
-        Checks the "data/assessments" directory for available topics that corresponds to the selected class and subject.
-
-        Args:
-            class_number (str): Number of the selected class.
-            subject_name (str): Name of the selected subject.
-
-        Returns:
-            list[str]: List of the available topics in ascending order.
-        """
-        topic_names = os.listdir(f"data/assessments/{subject_name}-{class_number}")
-        available_topics = [t for t in topic_names if t.endswith(".xlsx")]
-
-        def _compare_topic_numbers(topic_name: str) -> tuple[int, str]:
-            number, letter = topic_name.split("_", maxsplit=1)
-            return int(number), letter
-
-        return sorted(set(available_topics), key=_compare_topic_numbers)
-
 
 class StudentPage(tk.Frame):
     """Top-Right part of the GUI. Responsible for selecting the students."""
@@ -350,9 +329,7 @@ class StudentPage(tk.Frame):
     def update_student_listbox(self: StudentPage) -> None:
         """Updates the student listbox with the available students from the selected class."""
         class_selected = self.controller.topic_page.class_stringvar.get()
-        class_content_path = Path(f"data/classes/{class_selected}.csv")
-        with class_content_path.open(mode="r", encoding="utf-8") as file_handle:
-            self.available_students = file_handle.readline().strip().split(", ")
+        self.available_students = self.controller.catalog.students(class_selected)
 
         self.student_listbox.delete(0, tk.END)
         for available_student in self.available_students:
@@ -529,6 +506,25 @@ class SubmitPage(tk.Frame):
         )
         self.submit_button.config(style="my.info.Outline.TButton")
 
+        # Progress, shown in place of the submit button during the generation
+        self.progress_frame = tk.Frame(self)
+        self.progress_frame.grid_columnconfigure(0, weight=1)
+        self.progressbar = ttk.Progressbar(self.progress_frame, mode="determinate", bootstyle="info-striped")
+        self.progress_label = ttk.Label(self.progress_frame, text="")
+        self.cancel_button = ttk.Button(
+            self.progress_frame,
+            text=self.submit_page_language["cancel_button"],
+            command=self.cancel,
+            bootstyle="danger-outline",
+        )
+        self.progressbar.grid(row=0, column=0, padx=10, pady=(18, 4), sticky="ew")
+        self.progress_label.grid(row=1, column=0, padx=10, pady=4)
+        self.cancel_button.grid(row=2, column=0, padx=10, pady=4)
+
+        # The generation runs in a worker thread, its messages are polled by the main thread.
+        self.generation_queue: queue.Queue[tuple[str, ...]] = queue.Queue()
+        self.cancel_event = threading.Event()
+
         # Feedback
         self.feedback_label = tk.Label(self, text=self.submit_page_language["feedback_label"])
         self.feedback_label.bind(
@@ -564,6 +560,8 @@ class SubmitPage(tk.Frame):
         ):
             return
 
+        from checkmark.generator.generate import CheckmarkFields
+
         checkmark_fields = CheckmarkFields(
             class_=class_,
             subject=subject,
@@ -576,8 +574,84 @@ class SubmitPage(tk.Frame):
             random_option_order=random_option_order,
         )
 
+        self.cancel_event = threading.Event()
+        self.generation_queue = queue.Queue()
+        self.progressbar.configure(maximum=len(students), value=0)
+        self.progress_label.configure(text=f"0/{len(students)}")
+        self.cancel_button.configure(state="normal")
+        self.submit_button.grid_remove()
+        self.progress_frame.grid(row=0, column=0, sticky="new")
+
+        worker = threading.Thread(target=self._generate, args=(checkmark_fields,), daemon=True)
+        worker.start()
+        self.after(100, self._poll_generation, checkmark_fields)
+
+    def cancel(self: SubmitPage) -> None:
+        """Stops the generation after the documents currently being generated."""
+        self.cancel_event.set()
+        self.cancel_button.configure(state="disabled")
+        self.progress_label.configure(text=self.submit_page_language["cancelling_label"])
+
+    def _generate(self: SubmitPage, checkmark_fields: CheckmarkFields) -> None:
+        """Runs the generation in the worker thread, the widgets are only updated by the main thread.
+
+        The finished message reports the number of completed students, so the main thread can tell
+        whether the generation actually stopped early.
+        """
+        completed_students = 0
+
+        def report_progress(student: str, completed: int, total: int) -> None:
+            nonlocal completed_students
+            completed_students = completed
+            self.generation_queue.put(("progress", student, str(completed), str(total)))
+
         try:
-            generate_assessment(checkmark_fields)
+            from checkmark.generator.generate import generate_assessment
+
+            success = generate_assessment(checkmark_fields, progress=report_progress, cancel=self.cancel_event)
+        # TODO: Look for specific exceptions
+        except Exception as exception:  # noqa: BLE001
+            self.generation_queue.put(("error", str(exception)))
+            return
+        self.generation_queue.put(("done", str(success), str(completed_students), str(len(checkmark_fields.students))))
+
+    def _poll_generation(self: SubmitPage, checkmark_fields: CheckmarkFields) -> None:
+        """Updates the progress bar from the messages of the worker thread until the generation finishes."""
+        while True:
+            try:
+                message = self.generation_queue.get_nowait()
+            except queue.Empty:
+                self.after(100, self._poll_generation, checkmark_fields)
+                return
+            if message[0] == "progress":
+                _, student, completed, total = message
+                self.progressbar.configure(value=int(completed))
+                if not self.cancel_event.is_set():
+                    self.progress_label.configure(text=f"{completed}/{total} {student}")
+                continue
+            break
+
+        self.progress_frame.grid_remove()
+        self.submit_button.grid()
+        if message[0] == "error":
+            messagebox.showerror(
+                title="Hiba!",
+                message=f"Hiba történt a dolgozatok elkészítése során:\n{message[1]}",
+                icon="error",
+            )
+        elif int(message[2]) < int(message[3]):
+            # A cancel clicked after the last student does not stop the generation.
+            messagebox.showinfo(
+                title=self.messagebox_language["cancelled_title"],
+                message=self.messagebox_language["cancelled_message"],
+            )
+        elif message[1] != str(True):
+            messagebox.showerror(
+                title="Hiba!",
+                message="Nem minden dolgozatot sikerült elkészíteni, a részletek a naplófájlban találhatók.",
+                icon="error",
+            )
+        else:
             open_folder = messagebox.askquestion(
                 title="Siker!",
                 message="A dolgozatok elkészültek. Szeretnéd megnyitni a mappát?",
@@ -589,14 +663,6 @@ class SubmitPage(tk.Frame):
                     f"data/generated/{checkmark_fields.date}_{checkmark_fields.subject}_{checkmark_fields.class_}",
                 )
 
-        # TODO: Look for specific exceptions
-        except Exception as exception:  # noqa: BLE001
-            messagebox.showerror(
-                title="Hiba!",
-                message=f"Hiba történt a dolgozatok elkészítése során:\n{exception}",
-                icon="error",
-            )
-
     @staticmethod
     def open_generated_documents_folder(path: str) -> None:
         """Opens the folder where the generated documents are stored."""
@@ -730,17 +796,11 @@ class InterfaceValidation:
         return True
 
     def validate_online_evaluator_connection(self: InterfaceValidation) -> bool:
-        """Validates that the program can connect to the internet and the checkmark server."""
-        if not self._validate_connection("https://google.com"):
-            messagebox.showerror(
-                title="Hálózati hiba",
-                message="Nem sikerült csatlakozni az internethez.",
-                icon="error",
-            )
-            return False
+        """Validates that the program can connect to the checkmark server."""
+        from checkmark.generator.registration import get_pocket_registrar
 
-        target_url = BASE_URL + REGISTER_POCKET_ENDPOINT
-        if not self._validate_connection(target_url):
+        # The connection of the shared session is reused by the pocket registration.
+        if not get_pocket_registrar().check_connection():
             messagebox.showerror(
                 title="Hálózati hiba",
                 message="Nem sikerült csatlakozni a szerverhez.",
@@ -748,15 +808,3 @@ class InterfaceValidation:
             )
             return False
         return True
-
-    @staticmethod
-    def _validate_connection(url: str) -> bool:
-        """Validates that the program can connect to the given URL."""
-        ok_response = 200
-        try:
-            response = requests.get(url, timeout=5)
-        except requests.exceptions.ConnectionError:
-            return False
-        if response.status_code != ok_response:  # noqa: SIM103
-            return False
-        return True
@@ -0,0 +1,257 @@
+"""
+Structured journal of the generated assessments.
+
+Every generated (or failed) assessment is a single JSON line in the journal, so the questions
+and the answer order of any student can be looked up after the generation.
+
+Only one process writes (and rotates) a journal file. Worker processes started with attach_journal
+send their records to the journal of the parent process through a multiprocessing queue.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import multiprocessing
+import queue
+from datetime import datetime
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from multiprocessing.queues import Queue
+
+    from checkmark.generator.pdf import PDFData
+
+JOURNAL_PATH = "data/app/journal.jsonl"
+
+_journals: dict[Path, GenerationJournal] = {}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats the journal entry of a log record as a single JSON line."""
+
+    def format(self: JsonLinesFormatter, record: logging.LogRecord) -> str:
+        """Returns the JSON line of the record, records without an entry only store their message."""
+        entry = getattr(record, "entry", {"message": record.getMessage()})
+        time = datetime.fromtimestamp(record.created).astimezone().isoformat(timespec="seconds")
+        return json.dumps({"time": time, "level": record.levelname} | entry, ensure_ascii=False)
+
+
+class GenerationJournal:
+    """JSON Lines journal of the generated assessments.
+
+    Records are put on a queue by the generating code and written by a background thread
+    through a buffer, so appending a record never waits for the disk. The journal file is
+    rotated when it grows above max_bytes.
+    """
+
+    def __init__(
+        self: GenerationJournal,
+        path: str | Path = JOURNAL_PATH,
+        max_bytes: int = 10_000_000,
+        backup_count: int = 5,
+        capacity: int = 256,
+    ) -> None:
+        """Initializes the GenerationJournal object and starts the background writer.
+
+        Args:
+            self (GenerationJournal): The GenerationJournal object.
+            path (str | Path, optional): Path to the journal file. Defaults to JOURNAL_PATH.
+            max_bytes (int, optional): Size of the journal file that triggers the rotation. Defaults to 10_000_000.
+            backup_count (int, optional): Number of rotated journal files kept. Defaults to 5.
+            capacity (int, optional): Number of records buffered before they are written. Defaults to 256.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        file_handler = RotatingFileHandler(
+            self.path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+        file_handler.setFormatter(JsonLinesFormatter())
+        self._buffer = MemoryHandler(capacity, flushLevel=logging.CRITICAL, target=file_handler)
+        self._queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, self._buffer)
+        self._listener.start()
+        # Records of the worker processes, created by share when the first worker is started.
+        self._shared_queue: Queue[logging.LogRecord] | None = None
+        self._shared_listener: QueueListener | None = None
+
+        self.logger = _journal_logger(self.path, QueueHandler(self._queue))
+
+    def share(self: GenerationJournal) -> Queue[logging.LogRecord]:
+        """Returns the queue the worker processes send their records to, see attach_journal.
+
+        The records of the queue are written by this journal, so the journal file is only
+        written and rotated by this process.
+        """
+        if self._shared_queue is None:
+            self._shared_queue = multiprocessing.Queue()
+            self._shared_listener = QueueListener(self._shared_queue, self._buffer)
+            self._shared_listener.start()
+        return self._shared_queue
+
+    def record_assessment(self: GenerationJournal, pdf_data: PDFData) -> None:
+        """Appends the questions and the answer order of a generated assessment."""
+        entry = {
+            "pocket": pdf_data.pocket_id,
+            "student": pdf_data.student,
+            "class": pdf_data.class_,
+            "subject": pdf_data.subject,
+            "topic": pdf_data.topic,
+            "date": pdf_data.date,
+            "seed": pdf_data.seed,
+            "questions": [question.index for question in pdf_data.questions],
+            "option_orders": [list(question.option_order) for question in pdf_data.questions],
+            "correct": [question.correct for question in pdf_data.questions],
+        }
+        self.logger.info("Generated assessment", extra={"entry": entry})
+
+    def record_error(  # noqa: PLR0913
+        self: GenerationJournal,
+        student: str,
+        class_: str,
+        subject: str,
+        topic: str,
+        date: str,
+        error: str | None,
+    ) -> None:
+        """Appends an assessment that could not be generated."""
+        entry = {
+            "student": student,
+            "class": class_,
+            "subject": subject,
+            "topic": topic,
+            "date": date,
+            "error": error,
+        }
+        self.logger.error("Failed assessment", extra={"entry": entry})
+
+    def flush(self: GenerationJournal) -> None:
+        """Writes every record appended so far, including the records of the worker processes, to the journal file."""
+        # Stopping the listeners processes the records still on the queues.
+        listeners = [self._listener, self._shared_listener]
+        for listener in listeners:
+            if listener is not None:
+                listener.stop()
+        self._buffer.flush()
+        for listener in listeners:
+            if listener is not None:
+                listener.start()
+
+    def close(self: GenerationJournal) -> None:
+        """Writes the remaining records and closes the journal file."""
+        self._listener.stop()
+        if self._shared_listener is not None and self._shared_queue is not None:
+            self._shared_listener.stop()
+            self._shared_queue.close()
+        self._buffer.close()
+        if self._buffer.target is not None:
+            self._buffer.target.close()
+
+
+class WorkerJournal(GenerationJournal):
+    """Journal of a worker process, its records are written by the journal of the parent process.
+
+    The records are sent to the parent process as soon as they are appended, so the worker never opens
+    the journal file and the processes can not rotate it over each other.
+    """
+
+    def __init__(self: WorkerJournal, path: str | Path, records_queue: Queue[logging.LogRecord]) -> None:
+        """Initializes the WorkerJournal object.
+
+        Args:
+            self (WorkerJournal): The WorkerJournal object.
+            path (str | Path): Path to the journal file of the parent process.
+            records_queue (Queue[logging.LogRecord]): The queue returned by share of the parent journal.
+        """
+        self.path = Path(path)
+        self.logger = _journal_logger(self.path, QueueHandler(records_queue))
+
+    def flush(self: WorkerJournal) -> None:
+        """Nothing to do, the records are already sent to the parent process."""
+
+    def close(self: WorkerJournal) -> None:
+        """Nothing to do, the journal file is closed by the parent process."""
+
+
+def attach_journal(path: str | Path, records_queue: Queue[logging.LogRecord]) -> None:
+    """Initializer of the worker processes: get_journal returns a journal sending its records to the parent.
+
+    Args:
+        path (str | Path): Path to the journal file of the parent process.
+        records_queue (Queue[logging.LogRecord]): The queue returned by share of the parent journal.
+    """
+    resolved_path = Path(path).resolve()
+    _journals[resolved_path] = WorkerJournal(resolved_path, records_queue)
+
+
+def get_journal(path: str | Path = JOURNAL_PATH) -> GenerationJournal:
+    """Returns the journal of the path, it is created only once per process.
+
+    Args:
+        path (str | Path, optional): Path to the journal file. Defaults to JOURNAL_PATH.
+
+    Returns:
+        GenerationJournal: The journal writing to the path.
+    """
+    resolved_path = Path(path).resolve()
+    if resolved_path not in _journals:
+        _journals[resolved_path] = GenerationJournal(resolved_path)
+    return _journals[resolved_path]
+
+
+def _journal_logger(path: Path, handler: logging.Handler) -> logging.Logger:
+    """Logger of the journal, every journal has its own so the records never reach the handlers of other loggers."""
+    logger = logging.getLogger(f"{__name__}.{path.resolve()}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.handlers = [handler]
+    return logger
+
+
+@atexit.register
+def _close_journals() -> None:
+    """Writes the buffered records of every journal when the process exits."""
+    for journal in _journals.values():
+        journal.close()
+    _journals.clear()
+
+
+def read_journal(path: str | Path = JOURNAL_PATH, **filters: Any) -> Iterator[dict[str, Any]]:  # noqa: ANN401
+    """Reads the records of the journal, including the rotated files, from the oldest to the newest.
+
+    Args:
+        path (str | Path, optional): Path to the journal file. Defaults to JOURNAL_PATH.
+        filters (Any): Only the records with the given field values are returned, e.g. student="John Doe".
+
+    Yields:
+        dict[str, Any]: The matching records.
+    """
+    path = Path(path)
+    rotated_paths = sorted(
+        (rotated_path for rotated_path in path.parent.glob(f"{path.name}.*") if rotated_path.suffix[1:].isdigit()),
+        key=lambda rotated_path: int(rotated_path.suffix[1:]),
+        reverse=True,
+    )
+    # Lines that do not contain the encoded filter values are skipped without decoding them.
+    needles = [json.dumps(value, ensure_ascii=False) for value in filters.values()]
+    for journal_path in [*rotated_paths, path]:
+        if not journal_path.exists():
+            continue
+        with journal_path.open("r", encoding="utf-8") as file_handle:
+            for line in file_handle:
+                if not all(needle in line for needle in needles):
+                    continue
+                record = json.loads(line)
+                if all(record.get(key) == value for key, value in filters.items()):
+                    yield record
@@ -0,0 +1,86 @@
+"""
+Manifest of the generated assessments, used to regenerate only the changed documents.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from checkmark.generator.pdf import TEMPLATE_VERSION
+
+if TYPE_CHECKING:
+    from checkmark.generator.pdf import PDFData
+
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class ManifestEntry:
+    """Generated document of a student and the hash of its inputs."""
+
+    file: str
+    input_hash: str
+
+
+@dataclass
+class Manifest:
+    """Generated documents of a job, stored next to the documents."""
+
+    seed: int | None = None
+    students: dict[str, ManifestEntry] = field(default_factory=dict)
+    version: int = 1
+
+
+def input_hash(pdf_data: PDFData) -> str:
+    """Hash of everything that determines the document of a student.
+
+    The hash covers the student data, the text and order of the questions and options,
+    the pocket data and the version of the document template.
+
+    Args:
+        pdf_data (PDFData): The data of the document.
+
+    Returns:
+        str: Hexadecimal SHA-256 hash of the inputs.
+    """
+    inputs = {
+        "template_version": TEMPLATE_VERSION,
+        "student": pdf_data.student,
+        "class": pdf_data.class_,
+        "subject": pdf_data.subject,
+        "topic": pdf_data.topic,
+        "date": pdf_data.date,
+        "questions": [
+            [question.index, question.body, question.options, question.correct] for question in pdf_data.questions
+        ],
+        "pocket_id": pdf_data.pocket_id,
+        "pocket_password": pdf_data.pocket_password,
+        "vector_qr": pdf_data.vector_qr,
+        "seed": pdf_data.seed,
+        "student_id": pdf_data.student_id,
+    }
+    return hashlib.sha256(json.dumps(inputs, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def read_manifest(pdf_path: str | Path) -> Manifest | None:
+    """Reads the manifest of the generated directory, or returns None if it is missing or invalid."""
+    try:
+        with (Path(pdf_path) / MANIFEST_NAME).open("r", encoding="utf-8") as file_handle:
+            manifest_data = json.load(file_handle)
+        students = {student: ManifestEntry(**entry) for student, entry in manifest_data["students"].items()}
+        manifest = Manifest(manifest_data["seed"], students, manifest_data["version"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return manifest if manifest.version == Manifest.version else None
+
+
+def write_manifest(pdf_path: str | Path, manifest: Manifest) -> None:
+    """Saves the manifest into the generated directory."""
+    with (Path(pdf_path) / MANIFEST_NAME).open("w", encoding="utf-8") as file_handle:
+        json.dump(asdict(manifest), file_handle, indent=4, ensure_ascii=False)
@@ -8,23 +8,40 @@ Underlying library: https://github.com/PyFPDF/fpdf2.
 
 from __future__ import annotations
 
-import base64
-import random
-import sys
+import bisect
+import copy
+import tempfile
 from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import cache, lru_cache
+from io import BytesIO
+from itertools import islice
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, TypeAlias
 
 import qrcode
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives.hashes import SHA256
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from fontTools import ttLib
 from fpdf import FPDF
 from fpdf.enums import XPos, YPos
+from fpdf.fonts import SubsetMap, TTFFont
 from PIL import Image
 
+from checkmark.crypto import get_crypto_context
+from checkmark.payload import SolutionData, encode_solution_payload
+
 if TYPE_CHECKING:
-    from checkmark.generator.question import Question
+    from collections.abc import Iterable
+
+    from checkmark.generator.question import SelectedQuestion
+
+# Increase when the layout of the documents changes, so incremental generation recreates every document.
+TEMPLATE_VERSION = 2
+
+# Number of assessments held in memory while a merged document is written.
+MERGE_CHUNK_SIZE = 16
+
+# Modules of a QR code including the quiet zone, True for dark modules.
+QRMatrix: TypeAlias = tuple[tuple[bool, ...], ...]  # noqa: UP040
 
 
 @dataclass
@@ -36,9 +53,13 @@ class PDFData:
     subject: str
     topic: str
     date: str
-    questions: list[Question]
+    questions: list[SelectedQuestion]
     pocket_id: str
     pocket_password: str
+    vector_qr: bool = False
+    seed: int | None = None
+    # Index of the student in the student list of the pocket, the solution QR code uses the compact payload with it.
+    student_id: int | None = None
 
 
 def create_pdf(pdf_data: PDFData) -> PDF:
@@ -51,6 +72,83 @@ def create_pdf(pdf_data: PDFData) -> PDF:
     return pdf
 
 
+def create_merged_pdf(pdf_data_list: Iterable[PDFData], duplex: bool = False) -> PDF | None:  # noqa: FBT001, FBT002
+    """Creates a single print-ordered PDF document from the assessments of multiple students.
+
+    The font and the shared images are embedded only once in the document.
+
+    Args:
+        pdf_data_list (Iterable[PDFData]): The data of the assessments in print order.
+        duplex (bool, optional): Whether every assessment should start on a new sheet in double-sided
+        printing. Defaults to False.
+
+    Returns:
+        PDF | None: The merged document, or None if there are no assessments.
+    """
+    pdf = None
+    for pdf_data in pdf_data_list:
+        if pdf is None:
+            pdf = PDF(pdf_data)
+        pdf.add_assessment(pdf_data, duplex)
+    return pdf
+
+
+def write_merged_pdf(
+    pdf_data_list: Iterable[PDFData],
+    path: str | Path,
+    duplex: bool = False,  # noqa: FBT001, FBT002
+    chunk_size: int = MERGE_CHUNK_SIZE,
+) -> bool:
+    """Writes a single print-ordered PDF document from the assessments of multiple students.
+
+    The assessments are created in chunks of chunk_size with create_merged_pdf, so memory does not grow
+    with the number of students. Each chunk is written to a temporary file next to the document and its
+    pages are appended with pikepdf, which only reads their content from the chunk files when the document
+    is saved. The font and the shared images are embedded once per chunk, not once per document, as each
+    chunk has its own font subset. Merging requires the optional pikepdf dependency.
+
+    Args:
+        pdf_data_list (Iterable[PDFData]): The data of the assessments in print order.
+        path (str | Path): Path of the merged document.
+        duplex (bool, optional): Whether every assessment should start on a new sheet in double-sided
+        printing. Defaults to False.
+        chunk_size (int, optional): Number of assessments in a chunk. Defaults to MERGE_CHUNK_SIZE.
+
+    Returns:
+        bool: True if the document was written, False if there are no assessments.
+
+    Raises:
+        ImportError: If pikepdf is not installed.
+    """
+    # pikepdf is an optional dependency, only needed for the merged documents.
+    try:
+        import pikepdf
+    except ImportError as exception:
+        msg = 'Writing merged PDFs requires pikepdf: pip install "checkmark-assistant[merged]"'
+        raise ImportError(msg) from exception
+
+    pdf_data_iterator = iter(pdf_data_list)
+    with tempfile.TemporaryDirectory(dir=Path(path).parent) as chunk_dir, pikepdf.new() as merged_pdf:
+        # The chunk files stay open until the merged document is saved, their pages are copied lazily.
+        chunk_pdfs: list[pikepdf.Pdf] = []
+        try:
+            while chunk := list(islice(pdf_data_iterator, chunk_size)):
+                chunk_path = Path(chunk_dir) / f"{len(chunk_pdfs)}.pdf"
+                # With duplex every assessment has an even number of pages, so does every chunk.
+                pdf = create_merged_pdf(chunk, duplex)
+                if pdf is not None:
+                    pdf.output(str(chunk_path))
+                del pdf
+                chunk_pdfs.append(pikepdf.open(chunk_path))
+                merged_pdf.pages.extend(chunk_pdfs[-1].pages)
+            if chunk_pdfs:
+                merged_pdf.save(path, deterministic_id=True)
+        finally:
+            for chunk_pdf in chunk_pdfs:
+                chunk_pdf.close()
+    return bool(chunk_pdfs)
+
+
 class PDF(FPDF):
     """PDF class for generating the checkmark PDF document."""
 
@@ -68,19 +166,35 @@ class PDF(FPDF):
         """
         super().__init__(*args, **kwargs)
         self.alias_nb_pages()
+        if pdf_data.seed is not None:
+            # The metadata should not depend on the time of the generation either.
+            self.set_creation_date(_assessment_date(pdf_data.date))
         self.set_auto_page_break(auto=False)
 
         self.margin = 15
         self.set_margin(self.margin)
 
         font_path = f"{Path.cwd()}/data/app/FreeSans.ttf"
-        self.add_font(fname=font_path, family="FreeSans")
+        self.add_cached_font(font_path, "FreeSans")
         self.font = "FreeSans"
         self.title_font_size = 20
         self.question_font_size = 14
         self.option_font_size = 12
         self.footer_font_size = 8
 
+        # First page of each assessment and the empty pages between them, a document can contain
+        # the assessments of multiple students.
+        self.first_pages = [1]
+        self.blank_pages: set[int] = set()
+        self.set_assessment_data(pdf_data)
+
+    def set_assessment_data(self: PDF, pdf_data: PDFData) -> None:
+        """Sets the data of the assessment displayed on the next pages.
+
+        Args:
+            self (PDF): The PDF object.
+            pdf_data (PDFData): The data necessary for the PDF generation.
+        """
         self.student = pdf_data.student
         self.class_ = pdf_data.class_
         self.subject = pdf_data.subject
@@ -89,18 +203,78 @@ class PDF(FPDF):
         self.questions = pdf_data.questions
         self.pocket_id = pdf_data.pocket_id
         self.pocket_password = pdf_data.pocket_password
+        self.student_id = pdf_data.student_id
 
         self.question_number = 0
         self.last_page = False
-        self.qr_pocket = self.create_pocket_qr_image()
-        self.qr_solution = self.create_solution_qr_image()
+        self.qr_pocket: Image.Image | QRMatrix
+        self.qr_solution: Image.Image | QRMatrix
+        if pdf_data.vector_qr:
+            self.qr_pocket = _create_pocket_qr_matrix(self.pocket_id)
+            self.qr_solution = create_qr_matrix(self.create_solution_qr_data())
+        else:
+            self.qr_pocket = self.create_pocket_qr_image()
+            self.qr_solution = self.create_solution_qr_image()
+
+    def add_assessment(self: PDF, pdf_data: PDFData, duplex: bool = False) -> None:  # noqa: FBT001, FBT002
+        """Appends the pages of an assessment to the document.
+
+        Args:
+            self (PDF): The PDF object.
+            pdf_data (PDFData): The data necessary for the PDF generation.
+            duplex (bool, optional): Whether to add an empty page after an odd number of pages,
+            so every assessment starts on a new sheet in double-sided printing. Defaults to False.
+        """
+        if self.page > 0:
+            self.set_assessment_data(pdf_data)
+            self.first_pages.append(self.page + 1)
+        self.add_page()
+        self.add_questions()
+        self.add_page()
+        self.add_checkmark_boxes()
+
+        if duplex and (self.page - self.first_page + 1) % 2 == 1:
+            self.last_page = False
+            self.blank_pages.add(self.page + 1)
+            self.add_page()
+
+    @property
+    def first_page(self: PDF) -> int:
+        """First page of the assessment on the current page."""
+        return self.first_pages[bisect.bisect_right(self.first_pages, self.page) - 1]
+
+    def add_cached_font(self: PDF, font_path: str, family: str) -> None:
+        """Adds a TrueType font to the document reusing the parsed font of the process-wide cache.
+
+        Parsing the font file and building its character maps happens only once per process.
+        Each document still gets its own subset map and font tables, as fpdf2 subsets the
+        font in place when the document is written out.
+
+        Args:
+            self (PDF): The PDF object.
+            font_path (str): Path to the TrueType font file.
+            family (str): Name of the font family used in set_font.
+        """
+        parsed_font, font_bytes = _parse_font(font_path)
+        font = copy.copy(parsed_font)
+        font.i = len(self.fonts) + 1
+        font.fontkey = family.lower()
+        font.ttfont = ttLib.TTFont(BytesIO(font_bytes), recalcTimestamp=False, fontNumber=0, lazy=True)
+        font.missing_glyphs = []
+
+        # Same reserved characters as in fpdf.fonts.TTFFont, so the page number alias remains replaceable.
+        reserved_characters = "\x00 \r\n"
+        if self.str_alias_nb_pages:
+            reserved_characters += "0123456789" + self.str_alias_nb_pages
+        font.subset = SubsetMap(font, [ord(char) for char in reserved_characters])  # type: ignore [call-arg]
+        self.fonts[font.fontkey] = font
 
     def header(self: PDF) -> None:
         """Displays the header of the document."""
         self.set_font(self.font, "", self.title_font_size)
         self.ln(5)
 
-        if self.page_no() == 1:
+        if self.page_no() == self.first_page:
             assessment_data = [
                 ["Név:", self.student],
                 ["Osztály:", self.class_],
@@ -119,7 +293,7 @@ class PDF(FPDF):
             self.ln(10)
 
             qr_size = 50
-            self.image(
+            self.add_qr_code(
                 self.qr_pocket,
                 self.w - (self.margin + qr_size) + 4,
                 self.margin,
@@ -140,7 +314,7 @@ class PDF(FPDF):
             self.ln(25)
 
             qr_size = 60
-            self.image(
+            self.add_qr_code(
                 self.qr_solution,
                 self.w - (self.margin + qr_size) + 4,
                 self.margin,
@@ -149,16 +323,29 @@ class PDF(FPDF):
 
     def footer(self: PDF) -> None:
         """Displays the footer of the document."""
+        if self.page in self.blank_pages:
+            return
         self.set_y(-1 * self.margin + 5)
         self.set_font(self.font, "", self.footer_font_size)
         self.set_text_color(180, 180, 180)
 
-        page_number_text = f"Oldal {self.page_no()}/{{nb}}"
+        page_number_text = f"Oldal {self.page_no() - self.first_page + 1}/{{nb}}"
         self.cell(0, 0, page_number_text, align="C")
 
         date_text = f"Dátum: {self.date.replace('-', '.')}."
         self.cell(0, 0, date_text, align="R", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
+    def _substitute_page_number(self: PDF) -> None:
+        """Replaces the page number alias with the number of pages of each assessment."""
+        alias = self.str_alias_nb_pages.encode("utf-16-be")
+        last_pages = [first_page - 1 for first_page in self.first_pages[1:]] + [self.pages_count]
+        for first_page, last_page in zip(self.first_pages, last_pages, strict=True):
+            pages = [page for page in range(first_page, last_page + 1) if page not in self.blank_pages]
+            encoded_page_count = str(len(pages)).encode("utf-16-be")
+            for page in pages:
+                self.pages[page].contents = self.pages[page].contents.replace(alias, encoded_page_count)
+        super()._substitute_page_number()  # type: ignore [misc]
+
     def add_questions(self: PDF) -> None:
         """Displays the selected questions and options."""
         # TODO: Cell overflow is still not working due to changing text character width
@@ -190,98 +377,277 @@ class PDF(FPDF):
         self.last_page = True
 
     def add_checkmark_boxes(self: PDF) -> None:
-        """Displays the boxes at the last page, where the answers are selected."""
-        # TODO: Give circles equal spaces from the borders
-        number_of_blocks = ((len(self.questions) - 1) // 5) + 1
+        """Displays the boxes at the last page, where the answers are selected.
+
+        The rectangles and circles are the same for every student, so they are stamped from a
+        template that is rendered once per layout. Only the labels are written for each document,
+        as text has to go through the font subset of the document.
+        """
+        template = _create_answer_sheet_template(
+            len(self.questions),
+            self.get_x(),
+            self.get_y(),
+            self.margin,
+            (self.w, self.h),
+        )
+        # fpdf2 has no public API to write raw content, it is pinned and test_fpdf_internals_of_answer_sheet_template
+        # fails if FPDF._out or the page contents change.
+        self._out(template.graphics)  # type: ignore [attr-defined]
+        self.line_width = template.line_width
+        for x, y, width, text in template.labels:
+            self.set_xy(x, y)
+            self.cell(width, 0, text, align="C")
+        self.set_xy(*template.end_position)
+
+    def draw_checkmark_boxes(self: PDF) -> None:
+        """Displays the boxes at the last page by drawing every element one by one."""
+        _draw_checkmark_boxes(self, len(self.questions), self.margin)
+
+    def add_qr_code(self: PDF, qr_code: Image.Image | QRMatrix, x: float, y: float, size: float) -> None:
+        """Places a QR code on the page, either as an image or drawn as vector rectangles.
+
+        Args:
+            self (PDF): The PDF object.
+            qr_code (Image.Image | QRMatrix): Raster image or module matrix of the QR code.
+            x (float): Abscissa of the top left corner.
+            y (float): Ordinate of the top left corner.
+            size (float): Width and height of the QR code, including the quiet zone.
+        """
+        if isinstance(qr_code, Image.Image):
+            self.image(qr_code, x, y, size)
+            return
+        if not qr_code:
+            return
+
+        # Neighbouring dark modules of a row are merged into a single rectangle.
+        module_size = size / len(qr_code)
+        self.set_fill_color(0, 0, 0)
+        for row_number, row in enumerate(qr_code):
+            column_number = 0
+            while column_number < len(row):
+                if not row[column_number]:
+                    column_number += 1
+                    continue
+                run_start = column_number
+                while column_number < len(row) and row[column_number]:
+                    column_number += 1
+                self.rect(
+                    x + run_start * module_size,
+                    y + row_number * module_size,
+                    (column_number - run_start) * module_size,
+                    module_size,
+                    style="F",
+                )
+
+    def create_solution_qr_data(self: PDF) -> bytes:
+        """Encodes the necessary information into an encrypted token stored in the solution QR code.
+
+        With a student ID the compact payload is used, otherwise the original Fernet token of the text
+        "student; date; question indices; correct options".
+        """
+        if self.student_id is not None:
+            solution = SolutionData(
+                self.student_id,
+                self.date,
+                [question.index for question in self.questions],
+                [question.correct for question in self.questions],
+            )
+            return encode_solution_payload(solution, self.pocket_password)
+        question_data = " ".join([str(question.index) for question in self.questions])
+        correct_data = " ".join([str(question.correct) for question in self.questions])
+        assessment_data = "; ".join([self.student, self.date, question_data, correct_data])  # noqa: FLY002
+        return get_crypto_context(self.pocket_password).encrypt(assessment_data)
 
-        total_width = self.w - 2 * self.margin
-        column_width = total_width / 10
+    def create_solution_qr_image(self: PDF) -> Image.Image:
+        """Encodes the necessary information into a string and creates a QR code from it."""
+        qr_image = qrcode.make(self.create_solution_qr_data())
+        return qr_image.convert("RGB")  # type: ignore [no-any-return]
 
-        circle_diameter = 10
-        column_gap = column_width - circle_diameter
+    def create_pocket_qr_image(self: PDF) -> Image.Image:
+        """Creates a QR code pointing to the webpage where the assessment can be uploaded."""
+        return _create_pocket_qr_image(self.pocket_id)
 
-        rectangle_width = column_width * 4
-        rectangle_height = 5 * circle_diameter + 4 * column_gap
 
-        self.get_x()
-        original_y = self.get_y()
+@dataclass(frozen=True)
+class AnswerSheetTemplate:
+    """Static part of the answer sheet, rendered once and stamped into every document."""
 
-        # TODO: Fix duplicate code
-        for block in range(number_of_blocks):
-            if block == 2:  # noqa: PLR2004
-                self.set_y(original_y)
+    graphics: bytes
+    labels: tuple[tuple[float, float, float, str], ...]
+    line_width: float
+    end_position: tuple[float, float]
+
+
+class _AnswerSheetRecorder(FPDF):
+    """Page that records the drawing calls of the answer sheet and the position of its labels."""
+
+    def __init__(self: _AnswerSheetRecorder, margin: float, page_size: tuple[float, float]) -> None:
+        super().__init__(format=page_size)
+        self.set_auto_page_break(auto=False)
+        self.set_margin(margin)
+        self.set_font("helvetica")
+        self.add_page()
+        self.graphics_calls: list[tuple[str, tuple[float, ...]]] = []
+        self.labels: list[tuple[float, float, float, str]] = []
+
+    def set_line_width(self: _AnswerSheetRecorder, width: float) -> None:
+        self.graphics_calls.append(("set_line_width", (width,)))
+        self.line_width = width
+
+    def rect(self: _AnswerSheetRecorder, x: float, y: float, w: float, h: float) -> None:  # type: ignore [override]
+        self.graphics_calls.append(("rect", (x, y, w, h)))
+
+    def circle(self: _AnswerSheetRecorder, x: float, y: float, r: float) -> None:  # type: ignore [override]
+        self.graphics_calls.append(("circle", (x, y, r)))
+
+    def cell(  # type: ignore [no-untyped-def, override]
+        self: _AnswerSheetRecorder,
+        w: float,
+        h: float,
+        text: str = "",
+        **kwargs,  # noqa: ANN003
+    ) -> bool:
+        if text:
+            self.labels.append((self.x, self.y, w, text))
+        return super().cell(w, h, text, **kwargs)
+
+
+@lru_cache(maxsize=32)
+def _create_answer_sheet_template(
+    question_count: int,
+    x: float,
+    y: float,
+    margin: float,
+    page_size: tuple[float, float],
+) -> AnswerSheetTemplate:
+    """Renders the static part of the answer sheet for the given layout once per process."""
+    recorder = _AnswerSheetRecorder(margin, page_size)
+    recorder.set_xy(x, y)
+    _draw_checkmark_boxes(recorder, question_count, margin)
+
+    # The recorded calls are replayed on an empty page, the new content of the page is the template.
+    canvas = FPDF(format=page_size)
+    canvas.add_page()
+    start = len(canvas.pages[1].contents)
+    for method, arguments in recorder.graphics_calls:
+        getattr(canvas, method)(*arguments)
+    graphics = bytes(canvas.pages[1].contents[start:]).rstrip(b"\n")
+
+    return AnswerSheetTemplate(graphics, tuple(recorder.labels), recorder.line_width, (recorder.x, recorder.y))
+
+
+def _draw_checkmark_boxes(pdf: FPDF, question_count: int, margin: float) -> None:
+    """Draws the boxes where the answers are selected, starting from the current position."""
+    # TODO: Give circles equal spaces from the borders
+    number_of_blocks = ((question_count - 1) // 5) + 1
+
+    total_width = pdf.w - 2 * margin
+    column_width = total_width / 10
+
+    circle_diameter = 10
+    column_gap = column_width - circle_diameter
+
+    rectangle_width = column_width * 4
+    rectangle_height = 5 * circle_diameter + 4 * column_gap
+
+    pdf.get_x()
+    original_y = pdf.get_y()
+
+    # TODO: Fix duplicate code
+    for block in range(number_of_blocks):
+        if block == 2:  # noqa: PLR2004
+            pdf.set_y(original_y)
+
+        if block >= 2:  # noqa: PLR2004
+            pdf.set_x(pdf.get_x() + total_width / 2)
+
+        # Options
+        pdf.set_line_width(0.5)
+        for s in " ABCD":
+            pdf.cell(column_width, 0, s, align="C")
+        pdf.cell(0, 5, "", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+        if block >= 2:  # noqa: PLR2004
+            pdf.set_x(pdf.get_x() + total_width / 2)
+
+        # Rectangles
+        rectangle_x = pdf.get_x() + column_width
+        rectangle_y = pdf.get_y()
+
+        pdf.set_line_width(1.5)
+        pdf.rect(
+            rectangle_x,
+            rectangle_y,
+            rectangle_width,
+            rectangle_height,
+        )
+
+        # Numbers
+        pdf.set_line_width(0.5)
+        pdf.set_y(pdf.get_y() + circle_diameter / 2)
+        for question_number in range(1, 6):
+            pdf.set_y(pdf.get_y() + circle_diameter / 2)
 
             if block >= 2:  # noqa: PLR2004
-                self.set_x(self.get_x() + total_width / 2)
+                pdf.set_x(pdf.get_x() + total_width / 2 + circle_diameter / 2)
+            else:
+                pdf.set_x(pdf.get_x() + circle_diameter / 2)
 
-            # Options
-            self.set_line_width(0.5)
-            for s in " ABCD":
-                self.cell(column_width, 0, s, align="C")
-            self.cell(0, 5, "", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            pdf.cell(circle_diameter, 0, str(block * 5 + question_number), align="C")
+            pdf.set_x(pdf.get_x() + column_gap)
+            pdf.set_y(pdf.get_y() - circle_diameter / 2)
 
             if block >= 2:  # noqa: PLR2004
-                self.set_x(self.get_x() + total_width / 2)
-
-            # Rectangles
-            rectangle_x = self.get_x() + column_width
-            rectangle_y = self.get_y()
-
-            self.set_line_width(1.5)
-            self.rect(
-                rectangle_x,
-                rectangle_y,
-                rectangle_width,
-                rectangle_height,
-            )
+                pdf.set_x(pdf.get_x() + total_width / 2)
+            # Circles
+            pdf.set_x(pdf.get_x() + column_gap / 2)
+            for _ in range(4):
+                pdf.set_x(pdf.get_x() + column_width)
+                pdf.circle(pdf.get_x(), pdf.get_y(), r=circle_diameter)
 
-            # Numbers
-            self.set_line_width(0.5)
-            self.set_y(self.get_y() + circle_diameter / 2)
-            for question_number in range(1, 6):
-                self.set_y(self.get_y() + circle_diameter / 2)
+            pdf.set_y(pdf.get_y() + 1.5 * circle_diameter)
 
-                if block >= 2:  # noqa: PLR2004
-                    self.set_x(self.get_x() + total_width / 2 + circle_diameter / 2)
-                else:
-                    self.set_x(self.get_x() + circle_diameter / 2)
+        pdf.ln(15)
 
-                self.cell(circle_diameter, 0, str(block * 5 + question_number), align="C")
-                self.set_x(self.get_x() + column_gap)
-                self.set_y(self.get_y() - circle_diameter / 2)
 
-                if block >= 2:  # noqa: PLR2004
-                    self.set_x(self.get_x() + total_width / 2)
-                # Circles
-                self.set_x(self.get_x() + column_gap / 2)
-                for _ in range(4):
-                    self.set_x(self.get_x() + column_width)
-                    self.circle(self.get_x(), self.get_y(), r=circle_diameter)
+def create_qr_matrix(data: str | bytes) -> QRMatrix:
+    """Creates the module matrix of a QR code, with the same settings as qrcode.make."""
+    qr_code = qrcode.QRCode()
+    qr_code.add_data(data)
+    qr_code.make(fit=True)
+    return tuple(tuple(row) for row in qr_code.get_matrix())
 
-                self.set_y(self.get_y() + 1.5 * circle_diameter)
 
-            self.ln(15)
+def _assessment_date(date: str) -> datetime:
+    """Date of the assessment at midnight UTC."""
+    return datetime.fromisoformat(date).replace(tzinfo=UTC)
 
-    def create_solution_qr_image(self: PDF) -> Image.Image:
-        """Encodes the necessary information into a string and creates a QR code from it."""
-        question_data = " ".join([str(question.index) for question in self.questions])
-        correct_data = " ".join([str(question.correct) for question in self.questions])
-        assessment_data = "; ".join([self.student, self.date, question_data, correct_data])  # noqa: FLY002
 
-        random.seed(0)
-        salt = random.getrandbits(128).to_bytes(16, sys.byteorder)
-        kdf = PBKDF2HMAC(algorithm=SHA256(), length=32, salt=salt, iterations=1)
-        key = base64.urlsafe_b64encode(kdf.derive(self.pocket_password.encode()))
+def _pocket_url(pocket_id: str) -> str:
+    """Webpage where the assessments of the pocket can be uploaded."""
+    return f"https://pythonvilag.hu/checkmark/pocket/{pocket_id}/"
 
-        fernet = Fernet(key)
-        token = fernet.encrypt(assessment_data.encode("utf-8"))
-        qr_image = qrcode.make(token)
-        return qr_image.convert("RGB")  # type: ignore [no-any-return]
 
-    def create_pocket_qr_image(self: PDF) -> Image.Image:
-        """Creates a QR code pointing to the webpage where the assessment can be uploaded."""
-        if not self.pocket_id:
-            return Image.new("RGB", (1, 1), color="white")
-        pocket_url = f"https://pythonvilag.hu/checkmark/pocket/{self.pocket_id}/"
-        qr_image = qrcode.make(pocket_url)
-        return qr_image.convert("RGB")  # type: ignore [no-any-return]
+# The pocket QR code is the same for every student of a job, so it is created only once.
+@lru_cache(maxsize=8)
+def _create_pocket_qr_image(pocket_id: str) -> Image.Image:
+    """Creates the raster pocket QR code, or an empty image when there is no pocket."""
+    if not pocket_id:
+        return Image.new("RGB", (1, 1), color="white")
+    qr_image = qrcode.make(_pocket_url(pocket_id))
+    return qr_image.convert("RGB")  # type: ignore [no-any-return]
+
+
+@lru_cache(maxsize=8)
+def _create_pocket_qr_matrix(pocket_id: str) -> QRMatrix:
+    """Creates the module matrix of the pocket QR code, or an empty matrix when there is no pocket."""
+    if not pocket_id:
+        return ()
+    return create_qr_matrix(_pocket_url(pocket_id))
+
+
+@cache
+def _parse_font(font_path: str) -> tuple[TTFFont, bytes]:
+    """Parses a TrueType font once per process. The returned font is only used as a template."""
+    font_bytes = Path(font_path).read_bytes()
+    return TTFFont(FPDF(), Path(font_path), "", ""), font_bytes  # type: ignore [arg-type]
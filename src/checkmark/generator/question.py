@@ -6,15 +6,24 @@ Question class and related functions.
 
 from __future__ import annotations
 
-import copy
+import hashlib
+import json
 import random
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, TypeAlias
 
-import pandas as pd
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    import pandas as pd
 
 
 class Question:
     """Question class to store the data of each question in an assessment."""
 
+    __slots__ = ("body", "correct", "index", "options")
+
     def __init__(self: Question, index: int, body: str, options: list[str], correct: int) -> None:
         """Initializes the Question object.
 
@@ -30,95 +39,296 @@ class Question:
         self.options = options
         self.correct = correct
 
-        self.shuffle_index_list = list(range(len(self.options)))
+    @property
+    def option_order(self: Question) -> tuple[int, ...]:
+        """Original index of the option displayed at each position, the options are in their original order."""
+        return tuple(range(len(self.options)))
+
+    def shuffled(self: Question, rng: random.Random | None = None) -> ShuffledQuestion:
+        """Returns a view of the question with its options in random order. The question itself is not changed.
+
+        The options are shuffled with rng, or with the global random generator when rng is None.
+        """
+        option_order = list(range(len(self.options)))
+        (rng.shuffle if rng is not None else random.shuffle)(option_order)
+        return ShuffledQuestion(self, tuple(option_order))
+
+    def __repr__(self: Question) -> str:
+        """Returns a string representation of the question."""
+        return (
+            f"Question(index={self.index}, "
+            f"body={self.body}, "
+            f"options={self.options}, "
+            f"correct={self.correct})"
+        )
+
+
+class ShuffledQuestion:
+    """Question of a single assessment with shuffled options.
+
+    Only the order of the options is stored, the text is read from the original question of the bank.
+    """
+
+    __slots__ = ("correct", "option_order", "question")
+
+    def __init__(self: ShuffledQuestion, question: Question, option_order: tuple[int, ...]) -> None:
+        """Initializes the ShuffledQuestion object.
+
+        Args:
+            self (ShuffledQuestion): The ShuffledQuestion object.
+            question (Question): The original question of the bank.
+            option_order (tuple[int, ...]): Original index of the option displayed at each position.
+        """
+        self.question = question
+        self.option_order = option_order
+        self.correct = option_order.index(question.correct)
+
+    @property
+    def index(self: ShuffledQuestion) -> int:
+        """The index of the original question."""
+        return self.question.index
+
+    @property
+    def body(self: ShuffledQuestion) -> str:
+        """The body of the original question."""
+        return self.question.body
+
+    @property
+    def options(self: ShuffledQuestion) -> list[str]:
+        """The options of the original question in the shuffled order."""
+        return [self.question.options[index] for index in self.option_order]
+
+    def __repr__(self: ShuffledQuestion) -> str:
+        """Returns a string representation of the question, in the same format as for Question."""
+        return (
+            f"Question(index={self.index}, "
+            f"body={self.body}, "
+            f"options={self.options}, "
+            f"correct={self.correct})"
+        )
+
+
+# Questions of a single assessment, either as they are in the bank or with shuffled options.
+SelectedQuestion: TypeAlias = "Question | ShuffledQuestion"  # noqa: UP040
+
+
+class QuestionBank:
+    """Validated questions of a topic with a hash index by the question number."""
+
+    __slots__ = ("_positions", "questions")
 
-    def is_question_valid(self: Question, questions: list[Question]) -> bool:
-        """Validates the question to ensure that each question has a unique index and a valid correct answer.
+    def __init__(self: QuestionBank, questions: Iterable[Question]) -> None:
+        """Initializes the QuestionBank object.
 
         Args:
-            questions (list[Question]): Already validated questions.
+            self (QuestionBank): The QuestionBank object.
+            questions (Iterable[Question]): The questions in the order of the source.
+
+        Raises:
+            KeyError: If multiple questions have the same index raise KeyError.
+            ValueError: If the correct answer is not A, B, C or D raise ValueError.
+        """
+        self.questions = list(questions)
+        self._positions: dict[int, int] = {}
+        for position, question in enumerate(self.questions):
+            if question.index in self._positions:
+                msg = f"Több {question.index} számú kérdés van az Excel táblában."
+                raise KeyError(msg)
+            if question.correct not in range(4):
+                msg = f"A {question.index} számú kérdés megoldása nem A, B, C vagy D."
+                raise ValueError(msg)
+            self._positions[question.index] = position
+
+    @classmethod
+    def from_dataframe(cls: type[QuestionBank], source_questions: pd.DataFrame) -> QuestionBank:
+        """Validates the questions of an Excel table in a single pass over the columns and creates the bank.
+
+        Args:
+            source_questions (pd.DataFrame): Questions read from the Excel file as strings.
 
         Raises:
             KeyError: If multiple questions have the same index raise KeyError.
             ValueError: If the correct answer is not A, B, C or D raise ValueError.
 
         Returns:
-            bool: True if the question is valid.
+            QuestionBank: The validated questions.
         """
-        if self.index in [q.index for q in questions]:
-            msg = f"Több {self.index} számú kérdés van az Excel táblában."
+        indices = source_questions["Feladat sorszám"].astype(float).astype(int)
+        duplicated_indices = indices[indices.duplicated()]
+        if not duplicated_indices.empty:
+            msg = f"Több {duplicated_indices.iloc[0]} számú kérdés van az Excel táblában."
             raise KeyError(msg)
-        if self.correct not in range(4):
-            msg = f"A {self.index} számú kérdés megoldása nem A, B, C vagy D."
+
+        corrects = source_questions["Megoldás"].str.upper().map({letter: k for k, letter in enumerate("ABCD")})
+        invalid_indices = indices[corrects.isna()]
+        if not invalid_indices.empty:
+            msg = f"A {invalid_indices.iloc[0]} számú kérdés megoldása nem A, B, C vagy D."
             raise ValueError(msg)
-        return True
 
-    def shuffled(self: Question) -> Question:
-        """Shuffles the options of the question and returns a new Question object."""
-        shuffled = copy.deepcopy(self)
-        random.shuffle(self.shuffle_index_list)
-        shuffled.correct = self.shuffle_index_list.index(shuffled.correct)
-        shuffled.options = [self.options[index] for index in self.shuffle_index_list]
-        return shuffled
+        bank = cls.__new__(cls)
+        bank.questions = [
+            Question(index, str(body), list(options), int(correct))
+            for index, body, options, correct in zip(
+                indices.tolist(),
+                source_questions["Kérdés"].tolist(),
+                source_questions[list("ABCD")].to_numpy().tolist(),
+                corrects.tolist(),
+                strict=True,
+            )
+        ]
+        bank._positions = {index: position for position, index in enumerate(indices.tolist())}  # noqa: SLF001
+        return bank
 
-    def __repr__(self: Question) -> str:
-        """Returns a string representation of the question."""
-        return (
-            f"Question(index={self.index}, "
-            f"body={self.body}, "
-            f"options={self.options}, "
-            f"correct={self.correct})"
+    def by_number(self: QuestionBank, index: int) -> Question:
+        """Returns the question with the given question number (index) in constant time."""
+        return self.questions[self._positions[index]]
+
+    def __contains__(self: QuestionBank, index: object) -> bool:
+        """Checks whether there is a question with the given question number."""
+        return index in self._positions
+
+    def __getitem__(self: QuestionBank, position: int) -> Question:
+        """Returns the question at the given position of the source."""
+        return self.questions[position]
+
+    def __iter__(self: QuestionBank) -> Iterator[Question]:
+        """Iterates over the questions in the order of the source."""
+        return iter(self.questions)
+
+    def __len__(self: QuestionBank) -> int:
+        """Returns the number of questions."""
+        return len(self.questions)
+
+
+class QuestionCache:
+    """On-disk cache of the questions already read from Excel files.
+
+    Each Excel file is stored in a separate JSON entry together with its modification time and size,
+    so a changed file is read again automatically. The least recently used entries are removed
+    when there are more than max_entries of them.
+    """
+
+    version = 1
+
+    def __init__(
+        self: QuestionCache,
+        cache_dir: str | Path = "data/app/cache/questions",
+        max_entries: int = 128,
+    ) -> None:
+        """Initializes the QuestionCache object.
+
+        Args:
+            self (QuestionCache): The QuestionCache object.
+            cache_dir (str | Path, optional): Directory of the cache entries. Defaults to "data/app/cache/questions".
+            max_entries (int, optional): Maximum number of cached Excel files. Defaults to 128.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+
+    def load(self: QuestionCache, path: str) -> QuestionBank | None:
+        """Returns the cached questions of the Excel file, or None if they are missing or outdated."""
+        entry_path = self._entry_path(path)
+        try:
+            with entry_path.open("r", encoding="utf-8") as file_handle:
+                entry = json.load(file_handle)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != self.version or entry.get("source") != self._source_signature(path):
+            return None
+
+        # Mark the entry as recently used for the eviction.
+        entry_path.touch()
+        return QuestionBank(
+            Question(index, body, options, correct) for index, body, options, correct in entry["questions"]
         )
 
+    def store(self: QuestionCache, path: str, questions: QuestionBank) -> None:
+        """Saves the questions of the Excel file and evicts the least recently used entries."""
+        entry = {
+            "version": self.version,
+            "source": self._source_signature(path),
+            "questions": [[q.index, q.body, q.options, q.correct] for q in questions],
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so parallel generators never read a partial entry.
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.cache_dir, delete=False) as file_handle:
+            json.dump(entry, file_handle, ensure_ascii=False)
+        Path(file_handle.name).replace(self._entry_path(path))
+        self._evict()
+
+    def _entry_path(self: QuestionCache, path: str) -> Path:
+        """Path of the cache entry that belongs to the Excel file."""
+        key = hashlib.sha256(str(Path(path).resolve()).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    @staticmethod
+    def _source_signature(path: str) -> list[int]:
+        """Modification time and size of the Excel file, these change whenever the file is edited."""
+        stat_result = Path(path).stat()
+        return [stat_result.st_mtime_ns, stat_result.st_size]
+
+    def _evict(self: QuestionCache) -> None:
+        """Removes the least recently used entries above the maximum number of entries."""
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+        for entry in entries[self.max_entries :]:
+            entry.unlink(missing_ok=True)
 
-def read_questions_from_excel(path: str) -> list[Question]:
+
+def read_questions_from_excel(path: str, cache: QuestionCache | None = None) -> QuestionBank:
     """Reads questions from an Excel file.
 
     Args:
         path (str): Path to the Excel file.
+        cache (QuestionCache | None, optional): Cache of the already read Excel files. When the file is
+        unchanged since it was cached, the questions are loaded without opening the Excel file. Defaults to None.
 
     Returns:
-        list[Question]: List of read questions.
+        QuestionBank: The read questions.
     """
+    if cache is not None:
+        cached_questions = cache.load(path)
+        if cached_questions is not None:
+            return cached_questions
+
+    # pandas is only imported when an Excel file has to be read.
+    import pandas as pd
+
     # TODO: Read questions from other sources like Google Sheets
-    questions: list[Question] = []
-
-    source_questions = pd.read_excel(path, dtype="str")
-    for _, source_question in source_questions.iterrows():
-        index = source_question["Feladat sorszám"]
-        body = source_question["Kérdés"]
-        options = [source_question[q] for q in "ABCD"]
-        correct = ord(source_question["Megoldás"].upper()) - ord("A")
-
-        question = Question(int(index), str(body), list(options), int(correct))
-        if question.is_question_valid(questions):
-            questions.append(question)
+    questions = QuestionBank.from_dataframe(pd.read_excel(path, dtype="str"))
+
+    if cache is not None:
+        cache.store(path, questions)
     return questions
 
 
 def select_questions(
-    all_questions: list[Question],
+    all_questions: QuestionBank,
     question_number: int,
     random_questions: bool,  # noqa: FBT001
     random_option_order: bool,  # noqa: FBT001
-) -> list[Question]:
+    rng: random.Random | None = None,
+) -> list[SelectedQuestion]:
     """Select a subset of questions from the list of all questions.
 
     Args:
-        all_questions (list[Question]): List of all questions available.
+        all_questions (QuestionBank): All questions available.
         question_number (int, optional): Number of questions to select. Defaults to 1.
         random_questions (bool, optional): Whether to select questions randomly. Defaults to False.
         random_option_order (bool, optional): Whether to shuffle the options of the questions.
         Defaults to False.
+        rng (random.Random | None, optional): Random generator of the selection and the shuffling,
+        a seeded generator makes the selection reproducible. Defaults to None, using the global generator.
 
     Returns:
-        list[Question]: List of selected questions.
+        list[SelectedQuestion]: List of selected questions. With random option order the options are
+        shuffled in views of the questions, the questions of the bank are not changed.
     """
     if random_questions:
-        selected_indices = random.sample(list(range(len(all_questions))), k=question_number)
+        sample = rng.sample if rng is not None else random.sample
+        selected_indices = sample(list(range(len(all_questions))), k=question_number)
     else:
         selected_indices = list(range(question_number))
 
     if random_option_order:
-        return [all_questions[index].shuffled() for index in selected_indices]
+        return [all_questions[index].shuffled(rng) for index in selected_indices]
     return [all_questions[index] for index in selected_indices]
@@ -0,0 +1,212 @@
+"""
+Registration of the online evaluation pockets on the checkmark server.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict
+from functools import cache
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from checkmark import BASE_URL, REGISTER_POCKET_ENDPOINT
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from checkmark.generator.generate import PocketData
+
+RETRY_QUEUE_PATH = "data/app/pocket_retry_queue.jsonl"
+
+
+class PocketRegistrar:
+    """Registers pockets in a background thread through a pooled HTTP session.
+
+    Pockets that could not be registered are saved into a local retry queue, which is sent
+    again after the next successful registration (or with flush_retry_queue). The retry queue
+    holds one pocket per pocket_id and is locked with a lock file, so the generations of
+    multiple processes can share it.
+    """
+
+    def __init__(
+        self: PocketRegistrar,
+        base_url: str = BASE_URL,
+        retry_queue_path: str | Path = RETRY_QUEUE_PATH,
+        timeout: float = 5,
+    ) -> None:
+        """Initializes the PocketRegistrar object.
+
+        Args:
+            self (PocketRegistrar): The PocketRegistrar object.
+            base_url (str, optional): URL of the checkmark server. Defaults to BASE_URL.
+            retry_queue_path (str | Path, optional): Path to the retry queue. Defaults to RETRY_QUEUE_PATH.
+            timeout (float, optional): Timeout of the requests in seconds. Defaults to 5.
+        """
+        self.target_url = base_url + REGISTER_POCKET_ENDPOINT
+        self.base_url = base_url
+        self.retry_queue_path = Path(retry_queue_path)
+        self.timeout = timeout
+
+        # The connections to the server are kept alive and reused by the later requests.
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=4))
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=4))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pocket-registrar")
+        self._retry_queue_lock = threading.Lock()
+
+    def register(self: PocketRegistrar, pocket_data: PocketData) -> Future[bool]:
+        """Registers the pocket in the background, the pockets of the retry queue are sent after it.
+
+        Args:
+            self (PocketRegistrar): The PocketRegistrar object.
+            pocket_data (PocketData): Data of the pocket.
+
+        Returns:
+            Future[bool]: Resolves to True if the pocket was registered, False if it was queued for a retry.
+        """
+        pocket = asdict(pocket_data)
+        registration = self._executor.submit(self._register_or_queue, pocket)
+        # The queue is flushed after the registration resolved, so the generation never waits for it.
+        self._executor.submit(self._flush_if_registered, registration)
+        return registration
+
+    def send(self: PocketRegistrar, pocket: dict[str, Any]) -> bool:
+        """Sends the pocket to the server and reports whether it was accepted."""
+        ok_response = 200
+        try:
+            # The server expects the pocket data as a JSON encoded string.
+            response = self.session.post(url=self.target_url, json=json.dumps(pocket), timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            return False
+        return response.status_code == ok_response
+
+    def check_connection(self: PocketRegistrar) -> bool:
+        """Checks whether the checkmark server can be reached."""
+        ok_response = 200
+        try:
+            response = self.session.get(self.target_url, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            return False
+        return response.status_code == ok_response
+
+    def flush_retry_queue(self: PocketRegistrar) -> int:
+        """Sends the queued pockets again, until the first one that fails.
+
+        The failed pocket and the ones after it are kept in the queue, they are not sent while the
+        server is unreachable (each of them would wait for the timeout).
+
+        Returns:
+            int: Number of the pockets registered from the queue.
+        """
+        # The lock is held while the pockets are sent, so no other process sends or appends them meanwhile.
+        with self._lock_retry_queue():
+            pockets = self._read_retry_queue()
+            registered = 0
+            while registered < len(pockets) and self.send(pockets[registered]):
+                registered += 1
+            if registered < len(pockets):
+                self._replace_retry_queue(pockets[registered:])
+            else:
+                self.retry_queue_path.unlink(missing_ok=True)
+        return registered
+
+    def close(self: PocketRegistrar) -> None:
+        """Waits for the pending registrations and closes the connections."""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def _register_or_queue(self: PocketRegistrar, pocket: dict[str, Any]) -> bool:
+        """Sends the pocket, or saves it into the retry queue if it could not be sent.
+
+        An incremental generation registers its pocket again, the queued pocket with the same
+        pocket_id is replaced by the new one.
+        """
+        if self.send(pocket):
+            return True
+        with self._lock_retry_queue():
+            pockets = [queued for queued in self._read_retry_queue() if queued["pocket_id"] != pocket["pocket_id"]]
+            self._replace_retry_queue([*pockets, pocket])
+        return False
+
+    def _flush_if_registered(self: PocketRegistrar, registration: Future[bool]) -> None:
+        """Flushes the retry queue if the server accepted the registration."""
+        if registration.result():
+            self.flush_retry_queue()
+
+    def _read_retry_queue(self: PocketRegistrar) -> list[dict[str, Any]]:
+        """Reads the retry queue, keeping only the last pocket of each pocket_id."""
+        try:
+            with self.retry_queue_path.open("r", encoding="utf-8") as file_handle:
+                pockets = [json.loads(line) for line in file_handle if line.strip()]
+        except OSError:
+            return []
+        return list({pocket["pocket_id"]: pocket for pocket in pockets}.values())
+
+    def _replace_retry_queue(self: PocketRegistrar, pockets: list[dict[str, Any]]) -> None:
+        """Replaces the retry queue with the pockets, one JSON line per pocket.
+
+        The pockets are written into a temporary file that is renamed over the retry queue,
+        so the queue is never left half written.
+        """
+        temporary_path = self.retry_queue_path.with_name(f"{self.retry_queue_path.name}.{os.getpid()}.tmp")
+        with temporary_path.open("w", encoding="utf-8") as file_handle:
+            file_handle.writelines(json.dumps(pocket, ensure_ascii=False) + "\n" for pocket in pockets)
+        temporary_path.replace(self.retry_queue_path)
+
+    @contextmanager
+    def _lock_retry_queue(self: PocketRegistrar) -> Iterator[None]:
+        """Locks the retry queue against the other threads of the process and the other processes."""
+        self.retry_queue_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = self.retry_queue_path.with_name(f"{self.retry_queue_path.name}.lock")
+        with self._retry_queue_lock, lock_path.open("a+b") as lock_file:
+            _lock_file(lock_file)
+            try:
+                yield
+            finally:
+                _unlock_file(lock_file)
+
+
+def _lock_file(lock_file: IO[bytes]) -> None:
+    """Waits for the exclusive lock of the file."""
+    if sys.platform == "win32":
+        lock_file.seek(0)
+        while True:
+            # LK_LOCK gives up after 10 seconds, it is retried until the lock is acquired.
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            except OSError:
+                continue
+            return
+    else:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(lock_file: IO[bytes]) -> None:
+    """Releases the lock of the file."""
+    if sys.platform == "win32":
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@cache
+def get_pocket_registrar() -> PocketRegistrar:
+    """Returns the registrar of the process, so the connections are shared by every generation."""
+    return PocketRegistrar()
@@ -0,0 +1,158 @@
+"""
+Compact binary payload of the solution QR codes, shared by the generator and the evaluator.
+
+The payload is "CM", the format version and the base32 encoded compact token of the solution.
+Only uppercase letters and digits are used, so the QR code is encoded in the denser alphanumeric mode.
+
+Content of the token (version 1), before it is sealed with the pocket password:
+    varint: index of the student in the student list of the pocket
+    varint: date of the assessment, days since 1970-01-01
+    varint: number of the questions
+    varint: index of each question in the question bank
+    2 bits: correct option of each question, packed into bytes (first question in the lowest bits)
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+from datetime import date
+
+from checkmark.crypto import get_crypto_context
+
+PAYLOAD_PREFIX = b"CM"
+PAYLOAD_VERSION = 1
+TAG_SIZE = 8
+_EPOCH = date(1970, 1, 1)
+_OPTIONS_PER_BYTE = 4
+
+
+@dataclass
+class SolutionData:
+    """Data stored in the solution QR code of an assessment."""
+
+    student_id: int
+    date: str
+    question_indices: list[int]
+    correct_options: list[int]
+
+
+def is_compact_payload(payload: bytes) -> bool:
+    """Checks whether the payload is in the compact format, instead of the original Fernet token."""
+    return payload.startswith(PAYLOAD_PREFIX)
+
+
+def encode_solution_payload(solution: SolutionData, password: str) -> bytes:
+    """Packs and seals the solution data into a compact payload.
+
+    Args:
+        solution (SolutionData): The solution data of the assessment.
+        password (str): The password of the pocket.
+
+    Raises:
+        ValueError: If a correct option does not fit into 2 bits.
+
+    Returns:
+        bytes: The payload stored in the QR code.
+    """
+    data = bytearray()
+    _write_varint(data, solution.student_id)
+    _write_varint(data, (date.fromisoformat(solution.date) - _EPOCH).days)
+    _write_varint(data, len(solution.question_indices))
+    for question_index in solution.question_indices:
+        _write_varint(data, question_index)
+    data += _pack_options(solution.correct_options)
+
+    header = PAYLOAD_PREFIX + str(PAYLOAD_VERSION).encode("ascii")
+    token = get_crypto_context(password).seal(bytes(data), header, TAG_SIZE)
+    return header + base64.b32encode(token).rstrip(b"=")
+
+
+def decode_solution_payload(payload: bytes, password: str) -> SolutionData:
+    """Opens and unpacks a compact payload.
+
+    Args:
+        payload (bytes): The payload read from the QR code.
+        password (str): The password of the pocket.
+
+    Raises:
+        ValueError: If the payload is invalid, of an unknown version or not created with the password.
+
+    Returns:
+        SolutionData: The solution data of the assessment.
+    """
+    header_size = len(PAYLOAD_PREFIX) + 1
+    header, encoded_token = payload[:header_size], payload[header_size:]
+    if header != PAYLOAD_PREFIX + str(PAYLOAD_VERSION).encode("ascii"):
+        msg = f"Unknown solution payload: {header!r}"
+        raise ValueError(msg)
+    padding = b"=" * (-len(encoded_token) % 8)
+    try:
+        token = base64.b32decode(encoded_token + padding)
+    except ValueError as exception:
+        msg = "Invalid solution payload encoding."
+        raise ValueError(msg) from exception
+    data = get_crypto_context(password).open(token, header, TAG_SIZE)
+
+    position = 0
+    student_id, position = _read_varint(data, position)
+    days, position = _read_varint(data, position)
+    question_number, position = _read_varint(data, position)
+    question_indices = []
+    for _ in range(question_number):
+        question_index, position = _read_varint(data, position)
+        question_indices.append(question_index)
+    correct_options = _unpack_options(data[position:], question_number)
+    assessment_date = date.fromordinal(_EPOCH.toordinal() + days).isoformat()
+    return SolutionData(student_id, assessment_date, question_indices, correct_options)
+
+
+def _write_varint(data: bytearray, value: int) -> None:
+    """Appends an unsigned integer in LEB128 encoding, 7 bits per byte."""
+    if value < 0:
+        msg = f"Negative value can not be encoded: {value}"
+        raise ValueError(msg)
+    while value >= 0x80:  # noqa: PLR2004
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> tuple[int, int]:
+    """Reads an unsigned LEB128 integer and returns it with the position after it."""
+    value = 0
+    shift = 0
+    while True:
+        if position >= len(data):
+            msg = "Truncated solution payload."
+            raise ValueError(msg)
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+def _pack_options(options: list[int]) -> bytes:
+    """Packs the options into 2 bits each."""
+    packed = bytearray((len(options) + _OPTIONS_PER_BYTE - 1) // _OPTIONS_PER_BYTE)
+    for number, option in enumerate(options):
+        if not 0 <= option < _OPTIONS_PER_BYTE:
+            msg = f"Option does not fit into 2 bits: {option}"
+            raise ValueError(msg)
+        packed[number // _OPTIONS_PER_BYTE] |= option << (2 * (number % _OPTIONS_PER_BYTE))
+    return bytes(packed)
+
+
+def _unpack_options(packed: bytes, option_number: int) -> list[int]:
+    """Unpacks the given number of 2-bit options."""
+    if len(packed) != (option_number + _OPTIONS_PER_BYTE - 1) // _OPTIONS_PER_BYTE:
+        msg = "Invalid length of the solution payload."
+        raise ValueError(msg)
+    return [
+        packed[number // _OPTIONS_PER_BYTE] >> (2 * (number % _OPTIONS_PER_BYTE)) & 0b11
+        for number in range(option_number)
+    ]
@@ -1,5 +1,18 @@
+from __future__ import annotations
+
 import importlib.metadata
+import json
 import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+import qrcode
+
+from checkmark.payload import SolutionData, encode_solution_payload
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 
 def test_version_command() -> None:
@@ -12,3 +25,103 @@ def test_empty_command() -> None:
     result = subprocess.run(["checkmark"], capture_output=True, text=True)  # noqa: PLW1510, S603, S607
     assert result.stderr == "Error! No command given. Use --help for more information.\n"
     assert result.stdout == ""
+
+
+def test_generate_batch_missing_jobs_file() -> None:
+    result = subprocess.run(  # noqa: PLW1510, S603
+        ["checkmark", "generate", "--batch", "missing_jobs.json"],  # noqa: S607
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 1
+    assert result.stderr.startswith("Error! Could not read the batch jobs:")
+
+
+def test_index_command(tmp_path: Path) -> None:
+    (tmp_path / "data/classes").mkdir(parents=True)
+    (tmp_path / "data/classes/9-a.csv").write_text("John Doe, Jane Doe\n", encoding="utf-8")
+    result = subprocess.run(  # noqa: PLW1510, S603
+        ["checkmark", "index"],  # noqa: S607
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+    )
+    assert result.returncode == 0
+    assert result.stdout.splitlines() == [
+        "9-a: 2 students",
+        "Indexed 1 classes, 0 subjects and 0 topics into data/app/catalog.json.",
+    ]
+    assert (tmp_path / "data/app/catalog.json").exists()
+
+
+@pytest.mark.parametrize(
+    ("module", "heavy_modules"),
+    [
+        ("checkmark.cli", ["pandas", "fpdf", "cryptography", "qrcode", "requests", "ttkbootstrap", "cv2", "pyzbar"]),
+        ("checkmark.generator.generator_interface", ["pandas", "fpdf", "cryptography", "requests", "cv2"]),
+    ],
+)
+def test_startup_does_not_import_heavy_modules(module: str, heavy_modules: list[str]) -> None:
+    result = subprocess.run(  # noqa: PLW1510, S603
+        [sys.executable, "-c", f"import sys, {module}; print(*[m for m in {heavy_modules} if m in sys.modules])"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0
+    assert result.stdout.strip() == ""
+
+
+def test_bank_import_command(tmp_path: Path) -> None:
+    result = subprocess.run(  # noqa: PLW1510, S603
+        ["checkmark", "bank", "import"],  # noqa: S607
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+    )
+    assert result.returncode == 0
+    assert result.stdout == "Imported 0 of 0 Excel files, 0 failed.\n"
+
+
+def test_evaluate_scans_command(tmp_path: Path) -> None:
+    (tmp_path / "scans").mkdir()
+    (tmp_path / "scans/broken.jpg").write_bytes(b"not an image")
+    result = subprocess.run(  # noqa: PLW1510, S603
+        ["checkmark", "evaluate", "--input", "scans", "--output", "results.json", "--workers", "1"],  # noqa: S607
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+    )
+    assert result.returncode == 1
+    lines = result.stdout.splitlines()
+    assert lines[0].startswith("scans/broken.jpg: FAILED - ")
+    assert lines[1].startswith("Evaluated 1 sheets in ")
+    assert lines[1].endswith(", 1 failed.")
+    results = json.loads((tmp_path / "results.json").read_text(encoding="utf-8"))
+    assert [row["path"] for row in results] == ["scans/broken.jpg"]
+
+
+def test_evaluate_scans_command_without_scans(tmp_path: Path) -> None:
+    result = subprocess.run(  # noqa: PLW1510, S603
+        ["checkmark", "evaluate", "--input", "*.jpg"],  # noqa: S607
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+    )
+    assert result.returncode == 1
+    assert result.stderr == "Error! No scans found: *.jpg\n"
+
+
+def test_evaluate_compact_scans_without_pocket(tmp_path: Path) -> None:
+    (tmp_path / "scans").mkdir()
+    for student_id in range(3):
+        payload = encode_solution_payload(SolutionData(student_id, "2042-01-01", [1, 2], [0, 3]), "PASSWORD")
+        qrcode.make(payload).convert("RGB").save(tmp_path / f"scans/{student_id}.png")
+    result = subprocess.run(  # noqa: PLW1510, S603
+        ["checkmark", "evaluate", "--input", "scans", "--workers", "1"],  # noqa: S607
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+    )
+    assert result.returncode == 1
+    assert result.stdout == ""
+    assert result.stderr.startswith("Error! The scans have compact solution QR codes")
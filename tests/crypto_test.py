@@ -0,0 +1,51 @@
+import base64
+import random
+import sys
+
+import pytest
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.hashes import SHA256
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from checkmark.crypto import CryptoContext, get_crypto_context
+
+
+def test_crypto_context_round_trip() -> None:
+    context = CryptoContext("PASSWORD")
+    token = context.encrypt("John Doe; 2042-01-01; 1 2 3; 0 3 1")
+    assert context.decrypt(token) == "John Doe; 2042-01-01; 1 2 3; 0 3 1"
+
+
+def test_crypto_context_matches_previous_key_derivation() -> None:
+    random.seed(0)
+    salt = random.getrandbits(128).to_bytes(16, sys.byteorder)
+    kdf = PBKDF2HMAC(algorithm=SHA256(), length=32, salt=salt, iterations=1)
+    key = base64.urlsafe_b64encode(kdf.derive(b"PASSWORD"))
+    token = Fernet(key).encrypt(b"John Doe; 2042-01-01; 1 2 3; 0 3 1")
+
+    assert CryptoContext("PASSWORD").key == key
+    assert CryptoContext("PASSWORD").decrypt(token) == "John Doe; 2042-01-01; 1 2 3; 0 3 1"
+
+
+def test_crypto_context_does_not_touch_global_random_state() -> None:
+    random.seed(42)
+    state = random.getstate()
+    CryptoContext("PASSWORD").encrypt("message")
+    assert random.getstate() == state
+
+
+def test_get_crypto_context_is_cached() -> None:
+    assert get_crypto_context("PASSWORD") is get_crypto_context("PASSWORD")
+    assert get_crypto_context("PASSWORD") is not get_crypto_context("OTHER")
+
+
+def test_crypto_context_seal() -> None:
+    context = CryptoContext("PASSWORD")
+    token = context.seal(b"solution", b"CM1")
+    assert len(token) == len(b"solution") + 8
+    assert context.open(token, b"CM1") == b"solution"
+    assert context.seal(b"solution", b"CM1") == token
+    with pytest.raises(ValueError, match="Invalid token"):
+        context.open(token, b"CM2")
+    with pytest.raises(ValueError, match="Invalid token"):
+        CryptoContext("OTHER").open(token, b"CM1")
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import csv
+import json
+from typing import TYPE_CHECKING
+
+from PIL import Image
+
+from checkmark.evaluator import bulk
+from checkmark.evaluator.bulk import EvaluationSummary, ResultWriter, SheetResult, evaluate_scans, list_scans
+from checkmark.evaluator.scan import iter_scan_pages
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    import pytest
+
+    from checkmark.evaluator.scan import ScanPage
+
+
+def test_list_scans(tmp_path: Path) -> None:
+    for name in ["b.jpg", "a.PNG", "notes.txt", "sub/c.jpg"]:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_bytes(b"")
+    assert list_scans(str(tmp_path)) == [str(tmp_path / "a.PNG"), str(tmp_path / "b.jpg")]
+    assert list_scans(f"{tmp_path}/**/*.jpg") == [str(tmp_path / "b.jpg"), str(tmp_path / "sub/c.jpg")]
+    assert list_scans(str(tmp_path / "missing")) == []
+
+
+def test_evaluate_scans_maps_pages(tmp_path: Path) -> None:
+    pages = [Image.new("L", (60, 40), 255) for _ in range(3)]
+    pages[0].save(tmp_path / "stack.tiff", save_all=True, append_images=pages[1:])
+    (tmp_path / "broken.tif").write_bytes(b"not an image")
+    paths = [str(tmp_path / "stack.tiff"), str(tmp_path / "broken.tif")]
+    summary = evaluate_scans(paths, workers=2, password="password")  # noqa: S106
+    labels = sorted(result.label for result in summary.results)
+    assert labels == [paths[1], f"{paths[0]}#1", f"{paths[0]}#2", f"{paths[0]}#3"]
+    assert len(summary.failed_sheets) == 4
+
+
+def test_evaluate_scans_reads_multi_page_scans_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pages = [Image.new("L", (60, 40), 255) for _ in range(5)]
+    pages[0].save(tmp_path / "stack.tiff", save_all=True, append_images=pages[1:])
+    read_paths: list[str] = []
+
+    def read_pages(path: str) -> Iterator[ScanPage]:
+        read_paths.append(path)
+        yield from iter_scan_pages(path)
+
+    monkeypatch.setattr(bulk, "iter_scan_pages", read_pages)
+    summary = evaluate_scans([str(tmp_path / "stack.tiff")], workers=1, password="password")  # noqa: S106
+    assert read_paths == [str(tmp_path / "stack.tiff")]
+    assert sorted(result.page for result in summary.results if result.page is not None) == [1, 2, 3, 4, 5]
+
+
+def test_evaluate_scans_reports_failed_sheets(tmp_path: Path) -> None:
+    paths = [str(tmp_path / "missing.jpg"), str(tmp_path / "broken.png")]
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+    progress: list[SheetResult] = []
+    summary = evaluate_scans(paths, workers=2, password="password", progress=progress.append)  # noqa: S106
+    assert summary.results == progress
+    assert sorted(result.path for result in summary.results) == sorted(paths)
+    assert summary.failed_sheets == summary.results
+    assert all(result.error for result in summary.results)
+    assert str(summary).startswith("Evaluated 2 sheets in ")
+    assert str(summary).endswith(" 2 failed.")
+
+
+def test_result_writer(tmp_path: Path) -> None:
+    results = [
+        SheetResult("a.jpg", success=True, seconds=0.5, student="Jane Doe", date="2024-01-01", score="4/5 (0)"),
+        SheetResult("b.jpg", success=False, seconds=0.1, error="No QR code"),
+    ]
+    for file_name in ["results.csv", "results.json"]:
+        writer = ResultWriter(tmp_path / file_name)
+        for result in results:
+            writer.write(result)
+        writer.close()
+
+    with (tmp_path / "results.csv").open(encoding="utf-8") as file_handle:
+        rows = list(csv.DictReader(file_handle))
+    assert [row["student"] for row in rows] == ["Jane Doe", ""]
+    assert rows[1]["error"] == "No QR code"
+    json_rows = json.loads((tmp_path / "results.json").read_text(encoding="utf-8"))
+    assert [SheetResult(**row) for row in json_rows] == results
+
+    ResultWriter(tmp_path / "empty.json").close()
+    assert json.loads((tmp_path / "empty.json").read_text(encoding="utf-8")) == []
+    assert str(EvaluationSummary()) == "Evaluated 0 sheets in 0.00 s (0.00 sheets/s), 0 failed."
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+
+from checkmark.evaluator import evaluate
+from checkmark.evaluator.evaluate import (
+    THRESHOLDS,
+    EvaluationContext,
+    cut_image_border,
+    get_answers,
+    get_warped_images,
+    order_points,
+    to_gray,
+    x_marks_the_spot,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def _assessment_image() -> tuple[np.ndarray, list[np.ndarray]]:
+    rng = np.random.default_rng(42)
+    image = rng.integers(180, 256, size=(800, 1200, 3), dtype=np.uint8)
+    contours = []
+    for left in (60, 640):
+        top, width, height = 80, 500, 640
+        corners = [[left, top], [left + width, top], [left + width, top + height], [left, top + height]]
+        contours.append(np.array(corners).reshape(4, 1, 2))
+        cell_width, cell_height = width // 4, height // 5
+        for row in range(5):
+            # a dark mark, a faint mark, or no mark at all in the row
+            option = rng.integers(4)
+            color = [30, 140, 255][row % 3]
+            center = (left + option * cell_width + cell_width // 2, top + row * cell_height + cell_height // 2)
+            cv2.circle(image, center, 40, (color, color, color), cv2.FILLED)
+    return image, contours
+
+
+def _reference_warped_images(image: np.ndarray, contours: list[np.ndarray], threshold: int) -> list[np.ndarray]:
+    # The original pipeline, frozen: the BGR image is warped, converted to gray and thresholded at every threshold.
+    height, width = image.shape[:2]
+    dst_matrix = np.array([[0, 0], [width, 0], [0, height], [width, height]], dtype="float32")
+    warped_images = []
+    for contour in contours:
+        matrix = cv2.getPerspectiveTransform(order_points(contour), dst_matrix)
+        warped_image = cv2.cvtColor(cv2.warpPerspective(image, matrix, (width, height)), cv2.COLOR_BGR2GRAY)
+        warped_image = cv2.threshold(warped_image, threshold, 255, cv2.THRESH_BINARY_INV)[1]
+        warped_images.append(cut_image_border(warped_image))
+    return warped_images
+
+
+def _reference_answers(image: np.ndarray, contours: list[np.ndarray], correct_answers: list[int]) -> list[int | None]:
+    cumulator = [[0, 0, 0, 0, 0] for _ in correct_answers]
+    uncertains = [0 for _ in correct_answers]
+    for threshold in range(16, 240, 4):
+        warped_images = _reference_warped_images(image, contours, threshold)
+        for k, answer in enumerate(get_answers(warped_images)):
+            if answer is not None:
+                cumulator[k][answer] += 1
+            else:
+                uncertains[k] += 1
+    given_answers: list[int | None] = []
+    for counts, uncertain in zip(cumulator, uncertains, strict=True):
+        if max(counts) * 2 > sum(counts) and max(counts) * 20 > uncertain:
+            given_answers.append(int(np.argmax(counts)))
+        else:
+            given_answers.append(None)
+    return given_answers
+
+
+def test_x_marks_the_spot_matches_threshold_sweep() -> None:
+    image, contours = _assessment_image()
+    correct_answers = [0] * 10
+    warped_images, given_answers = x_marks_the_spot(image, contours, correct_answers)
+    reference_answers = _reference_answers(image, contours, correct_answers)
+    assert given_answers == reference_answers
+    # The evaluation passes the grayscale image, which is warped after the conversion.
+    assert x_marks_the_spot(to_gray(image), contours, correct_answers)[1] == reference_answers
+    assert any(answer is None for answer in given_answers)
+    assert any(answer is not None for answer in given_answers)
+    reference_images = get_warped_images(image.shape[1], image.shape[0], contours, image)
+    assert [img.shape for img in warped_images] == [img.shape for img in reference_images]
+
+
+def test_x_marks_the_spot_debug_callback() -> None:
+    image, contours = _assessment_image()
+    calls = []
+
+    def debug(threshold: int, warped_images: list[np.ndarray], given_answers: list[int | None]) -> None:
+        calls.append((threshold, len(warped_images), len(given_answers)))
+        expected_images = get_warped_images(image.shape[1], image.shape[0], contours, image, threshold1=threshold)
+        assert all(np.array_equal(img, expected) for img, expected in zip(warped_images, expected_images, strict=True))
+        assert given_answers == get_answers(expected_images)
+
+    x_marks_the_spot(image, contours, [0] * 10, debug=debug)
+    assert calls == [(int(threshold), 2, 10) for threshold in THRESHOLDS]
+
+
+def test_evaluation_context_decodes_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    image_path = tmp_path / "sheet.png"
+    cv2.imwrite(str(image_path), np.random.default_rng(0).integers(0, 256, size=(2000, 3000, 3), dtype=np.uint8))
+    loaded_paths = []
+    load_image = evaluate.load_image
+    monkeypatch.setattr(evaluate, "load_image", lambda path: loaded_paths.append(path) or load_image(path))
+
+    context = EvaluationContext(image_path)
+    assert context.gray is context.gray
+    assert context.gray.shape == (2000, 3000)
+    assert context.working_image.shape == (800, 1200, 3)
+    assert context.working_gray.shape == (800, 1200)
+    assert context.search_gray.shape == (667, 1000)
+    assert loaded_paths == [image_path]
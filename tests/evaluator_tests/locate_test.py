@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+import qrcode
+from PIL import Image
+
+from checkmark.evaluator.decode import decode_solution_data
+from checkmark.evaluator.evaluate import EvaluationContext
+from checkmark.evaluator.locate import find_qr_regions, locate_solution_qr
+from checkmark.payload import SolutionData, encode_solution_payload
+
+SOLUTION = SolutionData(1, "2024-03-01", list(range(20)), [index % 4 for index in range(20)])
+
+
+def _photo(payload: bytes, qr_size: int = 300) -> np.ndarray:
+    """A large, noisy photo with the solution and the pocket QR code in the bottom corners."""
+    rng = np.random.default_rng(0)
+    photo = rng.integers(220, 250, size=(3000, 4000), dtype=np.uint8)
+    for data, left in [(payload, 3400), (b"https://www.pythonvilag.hu/checkmark/pocket/1", 200)]:
+        qr_image = np.array(qrcode.make(data).convert("L").resize((qr_size, qr_size), Image.Resampling.BOX))
+        photo[2400 : 2400 + qr_size, left : left + qr_size] = qr_image
+    cv2.putText(photo, "Name: Jane Doe  1. Question?", (200, 300), cv2.FONT_HERSHEY_SIMPLEX, 3, 0, 5)
+    return cv2.cvtColor(photo, cv2.COLOR_GRAY2BGR)
+
+
+def test_locate_solution_qr() -> None:
+    payload = encode_solution_payload(SOLUTION, "PASSWORD")
+    photo = _photo(payload)
+    regions = find_qr_regions(cv2.cvtColor(photo, cv2.COLOR_BGR2GRAY))
+    assert len(regions) == 2
+    assert all(right - left < 400 and bottom - top < 400 for left, top, right, bottom in regions)
+
+    located_qr = locate_solution_qr(photo)
+    assert (located_qr.data, located_qr.strategy) == (payload, "finder")
+    # The QR code of the pocket is skipped by the fallback strategies as well.
+    assert locate_solution_qr(photo, strategies=("opencv",)).data == payload
+    assert decode_solution_data(photo, "PASSWORD", ["John Doe", "Jane Doe"])[:2] == ("Jane Doe", "2024-03-01")
+    context = EvaluationContext(photo)
+    assert decode_solution_data(context, "PASSWORD", ["John Doe", "Jane Doe"])[0] == "Jane Doe"
+    assert context.image is photo
+
+
+def test_locate_solution_qr_fails() -> None:
+    blank_photo = np.full((600, 800, 3), 255, dtype=np.uint8)
+    with pytest.raises(ValueError, match="No solution QR code found"):
+        locate_solution_qr(blank_photo)
+    with pytest.raises(ValueError, match="Unknown QR code strategy"):
+        locate_solution_qr(blank_photo, strategies=("guess",))
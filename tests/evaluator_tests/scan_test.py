@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from checkmark.evaluator.scan import count_scan_pages, is_multi_page, iter_scan_pages, read_scan_page
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def tiff_path(tmp_path: Path) -> Path:
+    path = tmp_path / "stack.tif"
+    pages = [Image.new("L", (60, 40), color) for color in (0, 100, 200)]
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+    return path
+
+
+def test_iter_scan_pages_of_tiff(tiff_path: Path) -> None:
+    assert is_multi_page(tiff_path)
+    assert count_scan_pages(tiff_path) == 3
+    pages = iter_scan_pages(tiff_path)
+    first_page = next(pages)
+    assert (first_page.path, first_page.page) == (str(tiff_path), 1)
+    assert first_page.image.shape == (40, 60, 3)
+    assert [(page.page, int(page.image[0, 0, 0])) for page in pages] == [(2, 100), (3, 200)]
+    assert np.array_equal(read_scan_page(tiff_path, 2), np.full((40, 60, 3), 100, dtype=np.uint8))
+    with pytest.raises(IndexError):
+        read_scan_page(tiff_path, 4)
+
+
+def test_iter_scan_pages_of_image(tmp_path: Path) -> None:
+    path = tmp_path / "sheet.png"
+    Image.new("RGB", (60, 40), (255, 0, 0)).save(path)
+    assert not is_multi_page(path)
+    assert count_scan_pages(path) == 1
+    (page,) = iter_scan_pages(path)
+    assert page.page == 1
+    assert page.image[0, 0].tolist() == [0, 0, 255]
+
+
+def test_iter_scan_pages_of_pdf(tmp_path: Path) -> None:
+    pytest.importorskip("pypdfium2")
+    path = tmp_path / "stack.pdf"
+    pages = [Image.new("RGB", (200, 100), color) for color in ((0, 0, 0), (255, 255, 255))]
+    pages[0].save(path, save_all=True, append_images=pages[1:], resolution=100)
+    assert count_scan_pages(path) == 2
+    images = [page.image for page in iter_scan_pages(path, dpi=50)]
+    assert [image.shape for image in images] == [(50, 100, 3), (50, 100, 3)]
+    assert np.array_equal(read_scan_page(path, 2, dpi=50), images[1])
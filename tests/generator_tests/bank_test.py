@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pandas as pd
+import pytest
+
+from checkmark.generator.bank import bank_path, import_excel_banks, list_topics, read_topic, read_topic_questions
+from checkmark.generator.generate import CheckmarkFields, generate_assessment
+from checkmark.generator.question import read_questions_from_excel
+
+if TYPE_CHECKING:
+    from checkmark.generator.question import QuestionBank
+
+
+def _bank_contents(questions: QuestionBank) -> list[tuple[int, str, list[str], int]]:
+    return [(question.index, question.body, question.options, question.correct) for question in questions]
+
+
+def test_import_excel_banks(generator_workspace: Path, temp_excel_path: Path) -> None:
+    subject_path = generator_workspace / "data/assessments/Teszt-9"
+    shutil.copy(temp_excel_path / "reoccurring_index.xlsx", subject_path / "2_Hibás_téma.xlsx")
+
+    results = import_excel_banks()
+    assert [(result.status, result.error is None) for result in results] == [("imported", True), ("failed", False)]
+    assert list_topics(bank_path(subject_path)) == ["1_Első_téma"]
+
+    imported_topic = read_topic(bank_path(subject_path), "1_Első_téma")
+    assert imported_topic is not None
+    excel_questions = read_questions_from_excel(str(subject_path / "1_Első_téma.xlsx"))
+    assert _bank_contents(imported_topic[0]) == _bank_contents(excel_questions)
+    assert imported_topic[0].by_number(2).body == "Kérdés 2"
+    assert read_topic(bank_path(subject_path), "3_Hiányzó_téma") is None
+
+    assert [result.status for result in import_excel_banks()] == ["unchanged", "failed"]
+    assert [result.status for result in import_excel_banks(force=True)] == ["imported", "failed"]
+
+
+def test_read_topic_questions_prefers_up_to_date_bank(generator_workspace: Path, temp_excel_path: Path) -> None:
+    subject_path = generator_workspace / "data/assessments/Teszt-9"
+    excel_path = subject_path / "1_Első_téma.xlsx"
+    import_excel_banks()
+    imported_questions = read_topic_questions(str(excel_path))
+
+    # A changed Excel file is read again until it is imported, here it is an invalid one.
+    shutil.copy(temp_excel_path / "reoccurring_index.xlsx", excel_path)
+    stat_result = excel_path.stat()
+    os.utime(excel_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+    with pytest.raises(KeyError):
+        read_topic_questions(str(excel_path))
+
+    # Without the Excel file the imported questions are used.
+    excel_path.unlink()
+    assert _bank_contents(read_topic_questions(str(excel_path))) == _bank_contents(imported_questions)
+
+
+def test_generate_assessment_from_bank(generator_workspace: Path) -> None:
+    import_excel_banks()
+    (generator_workspace / "data/assessments/Teszt-9/1_Első_téma.xlsx").unlink()
+    checkmark_fields = CheckmarkFields("9-a", "Teszt", "1. Első téma", ["John Doe"], False, "2042-01-01", 3, True, True)  # noqa: FBT003
+    assert generate_assessment(checkmark_fields)
+    assert len(list((generator_workspace / "data/generated/2042-01-01_Teszt_9-a").glob("*.pdf"))) == 1
+
+
+def test_import_excel_banks_skips_failed_files(generator_workspace: Path) -> None:
+    subject_path = generator_workspace / "data/assessments/Teszt-9"
+    empty_cells = pd.DataFrame(
+        {
+            "Feladat sorszám": [1, 2],
+            "Kérdés": ["Kérdés 1", "Kérdés 2"],
+            "A": ["A1", "A2"],
+            "B": ["B1", None],
+            "C": ["C1", None],
+            "D": ["D1", "D2"],
+            "Megoldás": ["A", "D"],
+        },
+    )
+    empty_cells.to_excel(subject_path / "2_Üres_cellák.xlsx", index=False)
+    damaged_subject_path = generator_workspace / "data/assessments/Sérült-9"
+    damaged_subject_path.mkdir()
+    shutil.copy(subject_path / "1_Első_téma.xlsx", damaged_subject_path)
+    bank_path(damaged_subject_path).write_bytes(b"not a database" * 100)
+
+    results = import_excel_banks()
+    assert [(Path(result.path).parent.name, result.status) for result in results] == [
+        ("Sérült-9", "failed"),
+        ("Teszt-9", "imported"),
+        ("Teszt-9", "imported"),
+    ]
+    assert results[0].error
+    imported_topic = read_topic(bank_path(subject_path), "2_Üres_cellák")
+    assert imported_topic is not None
+    assert imported_topic[0].by_number(2).options == ["A2", "", "", "D2"]
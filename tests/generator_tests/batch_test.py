@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from checkmark.generator.batch import read_batch_jobs, run_batch
+from checkmark.generator.journal import read_journal
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _write_jobs(path: Path, jobs: list[dict[str, object]]) -> Path:
+    jobs_path = path / "jobs.json"
+    jobs_path.write_text(json.dumps(jobs), encoding="utf-8")
+    return jobs_path
+
+
+def test_read_batch_jobs(generator_workspace: Path) -> None:
+    jobs_path = _write_jobs(
+        generator_workspace,
+        [
+            {"class": "9-a", "subject": "Teszt", "topic": "1. Első téma", "date": "2042-01-01", "question_number": 3},
+            {"class_": "9-a", "subject": "Teszt", "topic": "1. Első téma", "date": "2042-01-02", "students": ["A B"]},
+        ],
+    )
+    jobs = read_batch_jobs(jobs_path)
+    assert len(jobs) == 2
+    assert jobs[0].students == ["John Doe", "Jane Doe", "Max Mustermann"]
+    assert jobs[0].question_number == 3
+    assert jobs[1].students == ["A B"]
+    assert jobs[1].question_number == 20
+    assert jobs[1].random_question_order
+
+
+def test_read_batch_jobs_invalid_fields(generator_workspace: Path) -> None:
+    jobs_path = _write_jobs(generator_workspace, [{"class": "9-a", "subject": "Teszt", "colour": "red"}])
+    with pytest.raises(ValueError, match="colour"):
+        read_batch_jobs(jobs_path)
+
+
+def test_run_batch(generator_workspace: Path) -> None:
+    jobs_path = _write_jobs(
+        generator_workspace,
+        [
+            {"class": "9-a", "subject": "Teszt", "topic": "1. Első téma", "date": "2042-01-01", "question_number": 3},
+            {"class": "9-a", "subject": "Hiányzó", "topic": "1. Első téma", "date": "2042-01-01"},
+        ],
+    )
+    summary = run_batch(read_batch_jobs(jobs_path), workers=2)
+    assert summary.students == 6
+    assert [result.success for result in summary.results] == [True, False]
+    assert len(summary.failed_jobs) == 1
+    assert len(list((generator_workspace / "data/generated/2042-01-01_Teszt_9-a").glob("*.pdf"))) == 3
+    assert "Generated 6 assessments in 2 jobs" in str(summary)
+    # The records of the workers are written by the journal of this process.
+    records = list(read_journal(generator_workspace / "data/app/journal.jsonl"))
+    assert sorted(record["student"] for record in records) == ["Jane Doe", "John Doe", "Max Mustermann"]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from checkmark.generator import catalog as catalog_module
+from checkmark.generator.catalog import (
+    build_catalog,
+    load_catalog,
+    load_catalog_listing,
+    read_catalog,
+    topic_file_name,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_build_catalog(generator_workspace: Path) -> None:
+    (generator_workspace / "data/classes/10-b.csv").write_text("Erika Mustermann\n", encoding="utf-8")
+    (generator_workspace / "data/assessments/Teszt-9/2_Második_téma.xlsx").write_bytes(b"invalid")
+    (generator_workspace / "data/assessments/Teszt-9/notes.txt").write_text("", encoding="utf-8")
+
+    catalog = build_catalog()
+    assert catalog.class_names() == ["9-a", "10-b"]
+    assert catalog.students("9-a") == ["John Doe", "Jane Doe", "Max Mustermann"]
+    assert catalog.classes[1].roster_size == 1
+    assert catalog.subject_names("9") == ["Teszt"]
+    assert catalog.subject_names("10") == []
+    topics = catalog.topics("9", "Teszt")
+    assert [topic.topic for topic in topics] == ["1. Első téma", "2. Második téma"]
+    assert [topic.question_count for topic in topics] == [3, None]
+    assert all(len(topic.content_hash) == 64 for topic in topics)
+    assert [topic_file_name(topic.topic) for topic in topics] == [topic.file for topic in topics]
+    with pytest.raises(KeyError):
+        catalog.students("11-c")
+
+
+def test_load_catalog_is_invalidated_by_mtime(generator_workspace: Path) -> None:
+    catalog = load_catalog()
+    assert read_catalog() == catalog
+    assert not catalog.is_outdated()
+    assert load_catalog() == catalog
+
+    class_path = generator_workspace / "data/classes/9-a.csv"
+    class_path.write_text("John Doe, Jane Doe\n", encoding="utf-8")
+    stat_result = class_path.stat()
+    os.utime(class_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+    assert catalog.is_outdated()
+
+    updated_catalog = load_catalog()
+    assert updated_catalog.students("9-a") == ["John Doe", "Jane Doe"]
+    # The unchanged question bank is not read again.
+    assert updated_catalog.subjects == catalog.subjects
+    assert read_catalog() == updated_catalog
+
+
+def _touch(path: Path) -> None:
+    stat_result = path.stat()
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+
+
+def test_load_catalog_listing_checks_only_directories(
+    generator_workspace: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    catalog = load_catalog()
+    class_path = generator_workspace / "data/classes/9-a.csv"
+    class_path.write_text("John Doe\n", encoding="utf-8")
+    _touch(class_path)
+    # A changed file is left to load_catalog, the listing stays the same.
+    assert not catalog.is_listing_outdated()
+    assert load_catalog_listing() == catalog
+
+    subject_path = generator_workspace / "data/assessments/Teszt-9"
+    (subject_path / "1_Első_téma.xlsx").rename(subject_path / "2_Második_téma.xlsx")
+    _touch(subject_path)
+    (generator_workspace / "data/classes/10-b.csv").write_text("Erika Mustermann\n", encoding="utf-8")
+    _touch(generator_workspace / "data/classes")
+    assert catalog.is_listing_outdated()
+
+    # The question banks are not read while the listing is rebuilt.
+    topic_entry = catalog_module._topic_entry  # noqa: SLF001
+    monkeypatch.setattr(catalog_module, "_topic_entry", None)
+    listing = load_catalog_listing(catalog=catalog)
+    assert listing.class_names() == ["9-a", "10-b"]
+    assert listing.students("9-a") == ["John Doe", "Jane Doe", "Max Mustermann"]
+    assert listing.students("10-b") == ["Erika Mustermann"]
+    [topic] = listing.topics("9", "Teszt")
+    assert (topic.topic, topic.question_count) == ("2. Második téma", None)
+    assert not listing.is_listing_outdated()
+    assert listing.is_outdated()
+    assert read_catalog() == catalog
+
+    monkeypatch.setattr(catalog_module, "_topic_entry", topic_entry)
+    updated_catalog = load_catalog()
+    assert updated_catalog.students("9-a") == ["John Doe"]
+    assert [topic.question_count for topic in updated_catalog.topics("9", "Teszt")] == [3]
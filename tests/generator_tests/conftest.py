@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import shutil
 from pathlib import Path
 
 import pandas as pd
@@ -48,3 +49,21 @@ def temp_excel_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
     df_unexpected_correct_value.to_excel(excel_path / "unexpected_correct_value.xlsx", index=False)
 
     return excel_path
+
+
+@pytest.fixture()
+def generator_workspace(
+    tmp_path: Path,
+    temp_excel_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Path:
+    """Working directory with the data layout expected by the generator."""
+    package_root = Path(__file__).parents[2]
+    (tmp_path / "data/app").mkdir(parents=True)
+    shutil.copy(package_root / "data/app/FreeSans.ttf", tmp_path / "data/app/FreeSans.ttf")
+    (tmp_path / "data/assessments/Teszt-9").mkdir(parents=True)
+    shutil.copy(temp_excel_path / "correct.xlsx", tmp_path / "data/assessments/Teszt-9/1_Első_téma.xlsx")
+    (tmp_path / "data/classes").mkdir(parents=True)
+    (tmp_path / "data/classes/9-a.csv").write_text("John Doe, Jane Doe, Max Mustermann\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -1,8 +1,44 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from checkmark.evaluator.decode import decode_solution_token
 from checkmark.generator.generate import (
+    CheckmarkFields,
+    GenerationJob,
+    GenerationOptions,
     PocketData,
     _generate_pocket_data,
+    _select_student_assessment,
     _send_pocket_data,
+    generate_assessment,
+    student_rng,
 )
+from checkmark.generator.journal import read_journal
+from checkmark.generator.pdf import create_pdf
+from checkmark.generator.question import read_questions_from_excel
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _checkmark_fields(students: list[str]) -> CheckmarkFields:
+    return CheckmarkFields(
+        class_="9-a",
+        subject="Teszt",
+        topic="1. Első téma",
+        students=students,
+        online_evaluator=False,
+        date="2042-01-01",
+        question_number=3,
+        random_question_order=True,
+        random_option_order=True,
+    )
 
 
 def test_generate_pocket_data() -> None:
@@ -23,3 +59,149 @@ def test_send_pocket_data() -> None:
     date = "2042-01-01"
     pocket_data = _generate_pocket_data(students, date)
     assert not _send_pocket_data(pocket_data)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_assessment(generator_workspace: Path, workers: int) -> None:
+    students = ["John Doe", "Jane Doe", "Max Mustermann"]
+    assert generate_assessment(_checkmark_fields(students), GenerationOptions(workers=workers))
+
+    generated_path = generator_workspace / "data/generated/2042-01-01_Teszt_9-a"
+    assert sorted(path.name for path in generated_path.glob("*.pdf")) == [
+        "1_Első_téma_Jane_Doe.pdf",
+        "1_Első_téma_John_Doe.pdf",
+        "1_Első_téma_Max_Mustermann.pdf",
+    ]
+    records = list(read_journal(generator_workspace / "data/app/journal.jsonl"))
+    assert [record["student"] for record in records] == students
+    assert all(len(record["questions"]) == len(record["option_orders"]) == 3 for record in records)
+
+
+def test_generate_assessment_reports_student_errors(generator_workspace: Path) -> None:
+    students = ["John Doe", "Jane/Doe", "Max Mustermann"]
+    assert not generate_assessment(_checkmark_fields(students), GenerationOptions(workers=2))
+
+    generated_path = generator_workspace / "data/generated/2042-01-01_Teszt_9-a"
+    assert len(list(generated_path.glob("*.pdf"))) == 2
+    records = list(read_journal(generator_workspace / "data/app/journal.jsonl", level="ERROR"))
+    assert [record["student"] for record in records] == ["Jane/Doe"]
+    assert records[0]["error"].startswith("FileNotFoundError")
+
+
+def test_generate_assessment_progress_and_cancel(generator_workspace: Path) -> None:
+    students = ["John Doe", "Jane Doe", "Max Mustermann"]
+    cancel = threading.Event()
+    progress = []
+
+    def report_progress(student: str, completed: int, total: int) -> None:
+        progress.append((student, completed, total))
+        if completed == 2:
+            cancel.set()
+
+    assert not generate_assessment(_checkmark_fields(students), progress=report_progress, cancel=cancel)
+    assert progress == [("John Doe", 1, 3), ("Jane Doe", 2, 3)]
+
+    generated_path = generator_workspace / "data/generated/2042-01-01_Teszt_9-a"
+    assert len(list(generated_path.glob("*.pdf"))) == 2
+    records = list(read_journal(generator_workspace / "data/app/journal.jsonl"))
+    assert [record["student"] for record in records if record["level"] == "INFO"] == students[:2]
+    warnings = [record["message"] for record in records if record["level"] == "WARNING"]
+    assert warnings == ["Generation cancelled after 2 of 3 students."]
+
+
+def test_generate_merged_assessment(generator_workspace: Path) -> None:
+    pytest.importorskip("pikepdf")
+    students = ["John Doe", "Jane Doe", "Max Mustermann"]
+    assert generate_assessment(_checkmark_fields(students), GenerationOptions(workers=2, merged=True, duplex=True))
+
+    generated_path = generator_workspace / "data/generated/2042-01-01_Teszt_9-a"
+    assert [path.name for path in generated_path.glob("*.pdf")] == ["1_Első_téma_9-a.pdf"]
+    records = list(read_journal(generator_workspace / "data/app/journal.jsonl"))
+    assert [record["student"] for record in records] == students
+    assert all(len(record["questions"]) == len(record["option_orders"]) == 3 for record in records)
+
+
+def test_seeded_student_assessment_is_reproducible(generator_workspace: Path) -> None:
+    def student_pdf(job: GenerationJob, student: str) -> bytes:
+        pdf_data = _select_student_assessment(student, job).pdf_data
+        assert pdf_data is not None
+        return bytes(create_pdf(pdf_data).output())
+
+    all_questions = read_questions_from_excel(str(generator_workspace / "data/assessments/Teszt-9/1_Első_téma.xlsx"))
+    pocket_data = _generate_pocket_data(["John Doe", "Jane Doe"], "2042-01-01")
+    job = GenerationJob(_checkmark_fields([]), all_questions, pocket_data, "", GenerationOptions(), seed=42)
+    other_job = GenerationJob(_checkmark_fields([]), all_questions, pocket_data, "", GenerationOptions(), seed=43)
+
+    random.seed(0)
+    john_pdf = student_pdf(job, "John Doe")
+    jane_pdf = student_pdf(job, "Jane Doe")
+    random.seed(1)
+    assert student_pdf(job, "Jane Doe") == jane_pdf
+    assert student_pdf(job, "John Doe") == john_pdf
+    assert student_pdf(other_job, "John Doe") != john_pdf
+    assert student_rng(42, "John Doe").random() == student_rng(42, "John Doe").random()
+    assert student_rng(42, "John Doe").random() != student_rng(42, "Jane Doe").random()
+
+
+def test_seeded_generation_is_reproducible(generator_workspace: Path) -> None:
+    generated_path = generator_workspace / "data/generated/2042-01-01_Teszt_9-a"
+    checkmark_fields = _checkmark_fields(["John Doe", "Jane Doe"])
+    checkmark_fields.seed = 42
+    assert generate_assessment(checkmark_fields)
+    pdfs = {path.name: path.read_bytes() for path in generated_path.glob("*.pdf")}
+    pocket_data = (generated_path / "pocket_data.json").read_text(encoding="utf-8")
+
+    # The second run reuses the pocket of the first one, so the pocket QR code and the solution QR code are unchanged.
+    assert generate_assessment(checkmark_fields)
+    assert (generated_path / "pocket_data.json").read_text(encoding="utf-8") == pocket_data
+    assert {path.name: path.read_bytes() for path in generated_path.glob("*.pdf")} == pdfs
+
+
+def test_generate_incremental_assessment(generator_workspace: Path) -> None:
+    generated_path = generator_workspace / "data/generated/2042-01-01_Teszt_9-a"
+    options = GenerationOptions(incremental=True)
+    assert generate_assessment(_checkmark_fields(["John Doe", "Jane Doe"]), options)
+    pocket_data = (generated_path / "pocket_data.json").read_text(encoding="utf-8")
+    modification_times = {path.name: path.stat().st_mtime_ns for path in generated_path.glob("*.pdf")}
+
+    assert generate_assessment(_checkmark_fields(["John Doe", "Max Mustermann"]), options)
+    assert sorted(path.name for path in generated_path.glob("*.pdf")) == [
+        "1_Első_téma_John_Doe.pdf",
+        "1_Első_téma_Max_Mustermann.pdf",
+    ]
+    john_pdf = generated_path / "1_Első_téma_John_Doe.pdf"
+    assert john_pdf.stat().st_mtime_ns == modification_times[john_pdf.name]
+    assert json.loads(pocket_data)["pocket_id"] in (generated_path / "pocket_data.json").read_text(encoding="utf-8")
+    manifest = json.loads((generated_path / "manifest.json").read_text(encoding="utf-8"))
+    assert sorted(manifest["students"]) == ["John Doe", "Max Mustermann"]
+
+    records = list(read_journal(generator_workspace / "data/app/journal.jsonl"))
+    assert [record["student"] for record in records] == ["John Doe", "Jane Doe", "Max Mustermann"]
+
+
+def test_student_ids_are_stable_when_students_are_added(generator_workspace: Path) -> None:
+    generated_path = generator_workspace / "data/generated/2042-01-01_Teszt_9-a"
+    options = GenerationOptions(incremental=True)
+    assert generate_assessment(_checkmark_fields(["John Doe", "Max Mustermann"]), options)
+    max_pdf = generated_path / "1_Első_téma_Max_Mustermann.pdf"
+    modification_time = max_pdf.stat().st_mtime_ns
+
+    # A student is added between the two students of the first generation.
+    assert generate_assessment(_checkmark_fields(["John Doe", "Jane Doe", "Max Mustermann"]), options)
+    pocket_data = PocketData(**json.loads((generated_path / "pocket_data.json").read_text(encoding="utf-8")))
+    assert pocket_data.roster == ["John Doe", "Max Mustermann", "Jane Doe"]
+    # The ID printed on the sheet of Max is unchanged, so the sheet is not generated again.
+    assert max_pdf.stat().st_mtime_ns == modification_time
+
+    all_questions = read_questions_from_excel("data/assessments/Teszt-9/1_Első_téma.xlsx")
+    job = GenerationJob(_checkmark_fields([]), all_questions, pocket_data, "", GenerationOptions(), seed=42)
+    for student in ["John Doe", "Jane Doe", "Max Mustermann"]:
+        pdf_data = _select_student_assessment(student, job).pdf_data
+        assert pdf_data is not None
+        token = create_pdf(pdf_data).create_solution_qr_data()
+        assert decode_solution_token(token, pocket_data.pocket_password, pocket_data.roster)[0] == student
+
+    # Removed students keep their ID, it is never given to another student.
+    pocket_data.update_students(["Jane Doe", "Erika Mustermann"])
+    assert pocket_data.roster == ["John Doe", "Max Mustermann", "Jane Doe", "Erika Mustermann"]
+    assert PocketData(["John Doe", "Jane Doe"], "2042-01-01", "ID", "PASSWORD").student_id("Jane Doe") == 1
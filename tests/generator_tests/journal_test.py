@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING
+
+from checkmark.generator.journal import GenerationJournal, WorkerJournal, attach_journal, get_journal, read_journal
+from checkmark.generator.pdf import PDFData
+from checkmark.generator.question import Question
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _pdf_data(student: str) -> PDFData:
+    questions = [
+        Question(1, "Kérdés 1", ["A", "B", "C", "D"], 0).shuffled(),
+        Question(2, "Kérdés 2", ["A", "B", "C", "D"], 3),
+    ]
+    return PDFData(student, "9-a", "Teszt", "1. Első téma", "2042-01-01", questions, "POCKET", "PASSWORD")
+
+
+def test_record_assessment(tmp_path: Path) -> None:
+    journal = GenerationJournal(tmp_path / "journal.jsonl")
+    pdf_data = _pdf_data("John Doe")
+    journal.record_assessment(pdf_data)
+    journal.record_error("Jane Doe", "9-a", "Teszt", "1. Első téma", "2042-01-01", "OSError: disk full")
+    journal.flush()
+
+    records = list(read_journal(tmp_path / "journal.jsonl"))
+    assert [record["level"] for record in records] == ["INFO", "ERROR"]
+    assert records[0]["student"] == "John Doe"
+    assert records[0]["class"] == "9-a"
+    assert records[0]["questions"] == [1, 2]
+    assert records[0]["option_orders"] == [list(pdf_data.questions[0].option_order), [0, 1, 2, 3]]
+    assert records[0]["correct"] == [pdf_data.questions[0].correct, 3]
+    assert records[1]["error"] == "OSError: disk full"
+    journal.close()
+
+
+def test_read_journal_filters_rotated_files(tmp_path: Path) -> None:
+    journal = GenerationJournal(tmp_path / "journal.jsonl", max_bytes=1000, backup_count=20, capacity=1)
+    students = [f"Diák {number}" for number in range(20)]
+    for student in students:
+        journal.record_assessment(_pdf_data(student))
+    journal.close()
+
+    assert list(tmp_path.glob("journal.jsonl.*"))
+    assert [record["student"] for record in read_journal(tmp_path / "journal.jsonl")] == students
+    assert [record["student"] for record in read_journal(tmp_path / "journal.jsonl", student="Diák 7")] == ["Diák 7"]
+    assert not list(read_journal(tmp_path / "journal.jsonl", student="Diák"))
+
+
+def test_get_journal(tmp_path: Path) -> None:
+    assert get_journal(tmp_path / "journal.jsonl") is get_journal(tmp_path / "journal.jsonl")
+    assert len(get_journal(tmp_path / "journal.jsonl").logger.handlers) == 1
+
+
+def _record_students(first_student: int, path: Path) -> None:
+    journal = get_journal(path)
+    assert isinstance(journal, WorkerJournal)
+    for number in range(first_student, first_student + 25):
+        journal.record_assessment(_pdf_data(f"Diák {number}"))
+    journal.flush()
+
+
+def test_worker_journals_write_through_parent(tmp_path: Path) -> None:
+    journal_path = tmp_path / "journal.jsonl"
+    journal = GenerationJournal(journal_path, max_bytes=2000, backup_count=100, capacity=1)
+    with ProcessPoolExecutor(2, initializer=attach_journal, initargs=(journal_path, journal.share())) as executor:
+        list(executor.map(partial(_record_students, path=journal_path), range(0, 100, 25)))
+    journal.close()
+
+    # Only this process rotates the journal file, so no record is lost or overwritten.
+    assert len(list(tmp_path.glob("journal.jsonl.*"))) > 1
+    students = [record["student"] for record in read_journal(journal_path)]
+    assert sorted(students) == sorted(f"Diák {number}" for number in range(100))
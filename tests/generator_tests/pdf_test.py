@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import gc
+import re
+import sys
+import weakref
+from typing import TYPE_CHECKING
+
+import cv2
+import fpdf
+import numpy as np
+import pytest
+from fpdf import FPDF
+
+from checkmark.evaluator.decode import decode_solution_token
+from checkmark.generator import pdf
+from checkmark.generator.pdf import PDF, PDFData, create_merged_pdf, create_pdf, create_qr_matrix, write_merged_pdf
+from checkmark.generator.question import Question
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _pdf_data(student: str) -> PDFData:
+    questions = [Question(index, f"Kérdés {index}", ["A", "B", "C", "D"], 0) for index in range(1, 6)]
+    return PDFData(student, "9-a", "Teszt", "1. Első téma", "2042-01-01", questions, "", "PASSWORD")
+
+
+def test_cached_font_is_shared(generator_workspace: Path) -> None:  # noqa: ARG001
+    first_pdf = create_pdf(_pdf_data("John Doe"))
+    second_pdf = create_pdf(_pdf_data("Jane Doe"))
+    first_font = first_pdf.fonts["freesans"]
+    second_font = second_pdf.fonts["freesans"]
+
+    assert first_font.cw is second_font.cw
+    assert first_font.ttfont is not second_font.ttfont
+    assert first_font.subset is not second_font.subset
+
+    assert bytes(first_pdf.output()).startswith(b"%PDF")
+    assert bytes(second_pdf.output()).startswith(b"%PDF")
+
+
+def test_create_qr_matrix() -> None:
+    matrix = create_qr_matrix("https://pythonvilag.hu/checkmark/pocket/1/")
+    assert len(matrix) == len(matrix[0])
+    # Modules of the quiet zone are light.
+    assert not any(matrix[0])
+
+    image = np.kron(np.array(matrix, dtype=np.uint8) ^ 1, np.ones((10, 10), dtype=np.uint8)) * 255
+    data, _, _ = cv2.QRCodeDetector().detectAndDecode(image)
+    assert data == "https://pythonvilag.hu/checkmark/pocket/1/"
+
+
+def test_vector_qr(generator_workspace: Path) -> None:  # noqa: ARG001
+    raster_pdf_data = _pdf_data("John Doe")
+    raster_pdf_data.pocket_id = "261017070923561410PC"
+    vector_pdf_data = _pdf_data("John Doe")
+    vector_pdf_data.pocket_id = "261017070923561410PC"
+    vector_pdf_data.vector_qr = True
+
+    raster_pdf = create_pdf(raster_pdf_data)
+    vector_pdf = create_pdf(vector_pdf_data)
+    raster_output = bytes(raster_pdf.output())
+    vector_output = bytes(vector_pdf.output())
+
+    assert len(raster_pdf.image_cache.images) == 2
+    assert not vector_pdf.image_cache.images
+    assert len(vector_output) < len(raster_output)
+
+
+def test_compact_solution_qr(generator_workspace: Path) -> None:  # noqa: ARG001
+    legacy_pdf = create_pdf(_pdf_data("John Doe"))
+    pdf_data = _pdf_data("John Doe")
+    pdf_data.student_id = 1
+    compact_pdf = create_pdf(pdf_data)
+
+    payload = compact_pdf.create_solution_qr_data()
+    assert len(create_qr_matrix(payload)) < len(create_qr_matrix(legacy_pdf.create_solution_qr_data()))
+
+    matrix = create_qr_matrix(payload)
+    image = np.kron(np.array(matrix, dtype=np.uint8) ^ 1, np.ones((10, 10), dtype=np.uint8)) * 255
+    data, _, _ = cv2.QRCodeDetector().detectAndDecode(image)
+    assert decode_solution_token(data.encode("ascii"), "PASSWORD", ["Jane Doe", "John Doe"]) == (
+        "John Doe",
+        "2042-01-01",
+        [1, 2, 3, 4, 5],
+        [0, 0, 0, 0, 0],
+    )
+
+
+def _page_operations(pdf: PDF) -> tuple[list[bytes], list[bytes]]:
+    """Graphics and text operations of the current page, without the order in which they were drawn."""
+    content = bytes(pdf.pages[pdf.page].contents)
+    texts = sorted(re.findall(rb"BT .*? ET", content, flags=re.DOTALL))
+    content = re.sub(rb"BT .*? ET", b"", content, flags=re.DOTALL)
+    graphics = sorted(line for line in content.splitlines() if line.strip())
+    return graphics, texts
+
+
+def test_answer_sheet_template(generator_workspace: Path) -> None:  # noqa: ARG001
+    pdf_data = _pdf_data("John Doe")
+    pdf_data.questions *= 3
+    template_pdf = create_pdf(pdf_data)
+
+    direct_pdf = PDF(pdf_data)
+    direct_pdf.add_page()
+    direct_pdf.add_questions()
+    direct_pdf.add_page()
+    direct_pdf.draw_checkmark_boxes()
+
+    assert _page_operations(template_pdf) == _page_operations(direct_pdf)
+    assert (template_pdf.get_x(), template_pdf.get_y()) == (direct_pdf.get_x(), direct_pdf.get_y())
+
+
+def test_fpdf_internals_of_answer_sheet_template() -> None:
+    # The template is cut from PDFPage.contents and written with the private FPDF._out, which is why fpdf2
+    # is pinned. If this fails after upgrading fpdf2, add_checkmark_boxes has to be adapted first.
+    assert fpdf.__version__ == "2.7.8"
+    canvas = FPDF()
+    canvas.add_page()
+    start = len(canvas.pages[1].contents)
+    canvas._out(b"0 0 m 1 1 l S")  # noqa: SLF001
+    assert bytes(canvas.pages[1].contents[start:]) == b"0 0 m 1 1 l S\n"
+
+
+def _footer(pdf: PDF, page: int) -> bytes:
+    return re.findall(rb"BT [^\n]*? ET", bytes(pdf.pages[page].contents))[-2]
+
+
+def test_create_merged_pdf(generator_workspace: Path) -> None:  # noqa: ARG001
+    students = ["John Doe", "Jane Doe", "Max Mustermann"]
+    single_pdf = create_pdf(_pdf_data("John Doe"))
+    merged_pdf = create_merged_pdf([_pdf_data(student) for student in students])
+    assert merged_pdf is not None
+    single_output = bytes(single_pdf.output())
+    merged_output = bytes(merged_pdf.output())
+
+    assert merged_pdf.pages_count == 3 * single_pdf.pages_count
+    assert merged_pdf.first_pages == [1, 3, 5]
+    # The font and the pocket QR code are embedded only once.
+    assert merged_output.count(b"/FontFile2") == single_output.count(b"/FontFile2") == 1
+    assert len(merged_pdf.image_cache.images) == 4
+
+    # Every assessment has its own page numbers.
+    page_numbers_pdf = create_merged_pdf([_pdf_data(student) for student in students])
+    assert page_numbers_pdf is not None
+    page_numbers_pdf._substitute_page_number()  # noqa: SLF001
+    assert _footer(page_numbers_pdf, 3) == _footer(page_numbers_pdf, 1)
+    assert _footer(page_numbers_pdf, 4) == _footer(page_numbers_pdf, 2)
+    assert _footer(page_numbers_pdf, 1) != _footer(page_numbers_pdf, 2)
+
+    assert create_merged_pdf([]) is None
+
+
+def test_create_merged_pdf_duplex(generator_workspace: Path) -> None:  # noqa: ARG001
+    pdf_data_list = [_pdf_data("John Doe"), _pdf_data("Jane Doe")]
+    pdf_data_list[0].questions *= 4
+    merged_pdf = create_merged_pdf(pdf_data_list, duplex=True)
+    assert merged_pdf is not None
+
+    assert merged_pdf.pages_count == 6
+    assert merged_pdf.first_pages == [1, 5]
+    assert merged_pdf.blank_pages == {4}
+    assert b"Tj" not in bytes(merged_pdf.pages[4].contents)
+    assert bytes(merged_pdf.output()).startswith(b"%PDF")
+
+
+def test_write_merged_pdf_in_chunks(generator_workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pikepdf = pytest.importorskip("pikepdf")
+    students = ["John Doe", "Jane Doe", "Max Mustermann", "Erika Mustermann", "Jan Novák"]
+    pdf_data_list = [_pdf_data(student) for student in students]
+    pdf_data_list[0].questions *= 4
+    chunks: list[weakref.ref[PDF]] = []
+
+    def create_chunk(chunk: list[PDFData], duplex: bool) -> PDF | None:  # noqa: FBT001
+        # Only the chunk being created is held in memory.
+        gc.collect()
+        assert all(previous_chunk() is None for previous_chunk in chunks)
+        assert len(chunk) <= 2
+        chunk_pdf = create_merged_pdf(chunk, duplex)
+        assert chunk_pdf is not None
+        chunks.append(weakref.ref(chunk_pdf))
+        return chunk_pdf
+
+    monkeypatch.setattr(pdf, "create_merged_pdf", create_chunk)
+    merged_path = generator_workspace / "merged.pdf"
+    assert write_merged_pdf(pdf_data_list, merged_path, duplex=True, chunk_size=2)
+    assert len(chunks) == 3
+
+    single_pdf = create_merged_pdf(pdf_data_list, duplex=True)
+    assert single_pdf is not None
+    with pikepdf.open(merged_path) as merged_pdf:
+        assert len(merged_pdf.pages) == single_pdf.pages_count == 12
+    assert [path.name for path in generator_workspace.glob("*.pdf")] == ["merged.pdf"]
+    assert not write_merged_pdf([], generator_workspace / "empty.pdf")
+    assert not (generator_workspace / "empty.pdf").exists()
+
+
+def test_write_merged_pdf_without_pikepdf(generator_workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "pikepdf", None)
+    with pytest.raises(ImportError, match=re.escape('pip install "checkmark-assistant[merged]"')):
+        write_merged_pdf([_pdf_data("John Doe")], generator_workspace / "merged.pdf")
+    assert not (generator_workspace / "merged.pdf").exists()
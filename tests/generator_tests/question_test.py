@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import random
+import shutil
 from typing import TYPE_CHECKING
 
+import pandas as pd
 import pytest
 
-from checkmark.generator.question import read_questions_from_excel, select_questions
+from checkmark.generator.question import (
+    Question,
+    QuestionBank,
+    QuestionCache,
+    ShuffledQuestion,
+    read_questions_from_excel,
+    select_questions,
+)
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -61,3 +70,85 @@ def test_qestion_repr(temp_excel_path: Path) -> None:
     question = read_questions_from_excel(str(temp_excel_path / "correct.xlsx"))[0]
     print(repr(question))
     assert repr(question) == "Question(index=1, body=Kérdés 1, options=['A1', 'B1', 'C1', 'D1'], correct=0)"
+
+
+def test_question_cache(temp_excel_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    excel_path = tmp_path / "questions.xlsx"
+    shutil.copy(temp_excel_path / "correct.xlsx", excel_path)
+    cache = QuestionCache(tmp_path / "cache")
+    questions = read_questions_from_excel(str(excel_path), cache)
+
+    def fail_read_excel(*args, **kwargs):  # noqa: ANN002, ANN003, ARG001, ANN202
+        raise AssertionError
+
+    with monkeypatch.context() as patch:
+        patch.setattr(pd, "read_excel", fail_read_excel)
+        cached_questions = read_questions_from_excel(str(excel_path), cache)
+    assert [repr(q) for q in cached_questions] == [repr(q) for q in questions]
+
+
+def test_question_cache_invalidation(temp_excel_path: Path, tmp_path: Path) -> None:
+    excel_path = tmp_path / "questions.xlsx"
+    shutil.copy(temp_excel_path / "correct.xlsx", excel_path)
+    cache = QuestionCache(tmp_path / "cache")
+    assert cache.load(str(excel_path)) is None
+    read_questions_from_excel(str(excel_path), cache)
+    assert cache.load(str(excel_path)) is not None
+
+    pd.DataFrame(
+        {
+            "Feladat sorszám": [1],
+            "Kérdés": ["Új kérdés"],
+            "A": ["A1"],
+            "B": ["B1"],
+            "C": ["C1"],
+            "D": ["D1"],
+            "Megoldás": ["D"],
+        },
+    ).to_excel(excel_path, index=False)
+    assert cache.load(str(excel_path)) is None
+    questions = read_questions_from_excel(str(excel_path), cache)
+    assert len(questions) == 1
+    assert questions[0].body == "Új kérdés"
+
+
+def test_question_cache_eviction(temp_excel_path: Path, tmp_path: Path) -> None:
+    cache = QuestionCache(tmp_path / "cache", max_entries=1)
+    read_questions_from_excel(str(temp_excel_path / "correct.xlsx"), cache)
+    shutil.copy(temp_excel_path / "correct.xlsx", tmp_path / "other.xlsx")
+    read_questions_from_excel(str(tmp_path / "other.xlsx"), cache)
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 1
+    assert cache.load(str(temp_excel_path / "correct.xlsx")) is None
+    assert cache.load(str(tmp_path / "other.xlsx")) is not None
+
+
+def test_question_bank(temp_excel_path: Path) -> None:
+    questions = read_questions_from_excel(str(temp_excel_path / "correct.xlsx"))
+    assert isinstance(questions, QuestionBank)
+    assert [q.index for q in questions] == [1, 2, 3]
+    assert 2 in questions
+    assert 4 not in questions
+    assert questions.by_number(3).body == "Kérdés 3"
+    with pytest.raises(KeyError):
+        questions.by_number(4)
+
+
+def test_question_bank_validation() -> None:
+    with pytest.raises(KeyError, match="Több 1 számú kérdés"):
+        QuestionBank([Question(1, "K1", ["A", "B", "C", "D"], 0), Question(1, "K2", ["A", "B", "C", "D"], 0)])
+    with pytest.raises(ValueError, match="A 2 számú kérdés megoldása"):
+        QuestionBank([Question(1, "K1", ["A", "B", "C", "D"], 0), Question(2, "K2", ["A", "B", "C", "D"], 4)])
+
+
+def test_shuffled_question_is_a_view(temp_excel_path: Path) -> None:
+    questions = read_questions_from_excel(str(temp_excel_path / "correct.xlsx"))
+    random.seed(0)
+    shuffled_questions = [questions[0].shuffled() for _ in range(20)]
+
+    assert repr(questions[0]) == "Question(index=1, body=Kérdés 1, options=['A1', 'B1', 'C1', 'D1'], correct=0)"
+    for shuffled_question in shuffled_questions:
+        assert isinstance(shuffled_question, ShuffledQuestion)
+        assert shuffled_question.question is questions[0]
+        assert shuffled_question.body is questions[0].body
+        assert shuffled_question.options[shuffled_question.correct] == "A1"
+        assert sorted(shuffled_question.options) == ["A1", "B1", "C1", "D1"]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING
+
+import pytest
+from flask import Flask, Response, make_response, request
+from werkzeug.serving import make_server
+
+from checkmark.generator.generate import PocketData
+from checkmark.generator.registration import PocketRegistrar
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+class StandInServer:
+    """Local stand-in of the checkmark server, storing the registered pockets."""
+
+    def __init__(self: StandInServer) -> None:
+        self.pockets: list[dict[str, str]] = []
+        self.attempts = 0
+        self.available = True
+        app = Flask(__name__)
+        app.add_url_rule("/checkmark/register-pocket", view_func=self.register_pocket, methods=["GET", "POST"])
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/checkmark"
+
+    def register_pocket(self: StandInServer) -> Response:
+        if request.method == "POST":
+            self.attempts += 1
+        if not self.available:
+            return make_response("Unavailable", 503)
+        if request.method == "POST":
+            self.pockets.append(json.loads(str(request.get_json())))
+        return make_response("Success", 200)
+
+
+@pytest.fixture()
+def stand_in_server() -> Iterator[StandInServer]:
+    server = StandInServer()
+    thread = threading.Thread(target=server.server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.server.shutdown()
+
+
+def _pocket_data(pocket_id: str) -> PocketData:
+    return PocketData(["John Doe", "Jane Doe"], "2042-01-01", pocket_id, "PASSWORD")
+
+
+def test_register_pocket(stand_in_server: StandInServer, tmp_path: Path) -> None:
+    registrar = PocketRegistrar(stand_in_server.base_url, tmp_path / "retry_queue.jsonl")
+    assert registrar.check_connection()
+    assert registrar.register(_pocket_data("420101000000000000AB")).result()
+    registrar.close()
+
+    assert [pocket["pocket_id"] for pocket in stand_in_server.pockets] == ["420101000000000000AB"]
+    assert not (tmp_path / "retry_queue.jsonl").exists()
+
+
+def test_failed_registration_is_retried(stand_in_server: StandInServer, tmp_path: Path) -> None:
+    registrar = PocketRegistrar(stand_in_server.base_url, tmp_path / "retry_queue.jsonl")
+    stand_in_server.available = False
+    assert not registrar.register(_pocket_data("420101000000000000AB")).result()
+    assert not registrar.register(_pocket_data("420101000000000000CD")).result()
+    assert registrar.flush_retry_queue() == 0
+    assert len((tmp_path / "retry_queue.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+
+    # The queued pockets are sent after the next successful registration.
+    stand_in_server.available = True
+    assert registrar.register(_pocket_data("420101000000000000EF")).result()
+    registrar.close()
+    assert [pocket["pocket_id"] for pocket in stand_in_server.pockets] == [
+        "420101000000000000EF",
+        "420101000000000000AB",
+        "420101000000000000CD",
+    ]
+    assert not (tmp_path / "retry_queue.jsonl").exists()
+
+
+def test_retry_queue_keeps_one_pocket_per_id(stand_in_server: StandInServer, tmp_path: Path) -> None:
+    registrar = PocketRegistrar(stand_in_server.base_url, tmp_path / "retry_queue.jsonl")
+    stand_in_server.available = False
+    assert not registrar.register(_pocket_data("420101000000000000AB")).result()
+    assert not registrar.register(_pocket_data("420101000000000000CD")).result()
+    pocket_data = PocketData(["John Doe", "Jane Doe", "Baby Doe"], "2042-01-01", "420101000000000000AB", "PASSWORD")
+    assert not registrar.register(pocket_data).result()
+    registrar.close()
+
+    lines = (tmp_path / "retry_queue.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["pocket_id"] for line in lines] == ["420101000000000000CD", "420101000000000000AB"]
+    assert json.loads(lines[1])["students"] == ["John Doe", "Jane Doe", "Baby Doe"]
+
+
+def test_flush_stops_at_the_first_failure(stand_in_server: StandInServer, tmp_path: Path) -> None:
+    registrar = PocketRegistrar(stand_in_server.base_url, tmp_path / "retry_queue.jsonl")
+    stand_in_server.available = False
+    for pocket_id in ["420101000000000000AB", "420101000000000000CD", "420101000000000000EF"]:
+        assert not registrar.register(_pocket_data(pocket_id)).result()
+    # The failed registrations do not flush the queue.
+    assert stand_in_server.attempts == 3
+
+    assert registrar.flush_retry_queue() == 0
+    registrar.close()
+    assert stand_in_server.attempts == 4
+    assert len((tmp_path / "retry_queue.jsonl").read_text(encoding="utf-8").splitlines()) == 3
+
+
+def test_unreachable_server(tmp_path: Path) -> None:
+    registrar = PocketRegistrar("http://127.0.0.1:9/checkmark", tmp_path / "retry_queue.jsonl", timeout=1)
+    assert not registrar.check_connection()
+    assert not registrar.register(_pocket_data("420101000000000000AB")).result()
+    registrar.close()
+    assert (tmp_path / "retry_queue.jsonl").exists()
+
+
+def _register_pockets(prefix: str, base_url: str, retry_queue_path: Path) -> None:
+    registrar = PocketRegistrar(base_url, retry_queue_path)
+    for number in range(20):
+        assert not registrar.register(_pocket_data(f"4201010000000000{prefix}{number:02d}")).result()
+    registrar.close()
+
+
+def test_retry_queue_is_shared_by_processes(stand_in_server: StandInServer, tmp_path: Path) -> None:
+    stand_in_server.available = False
+    register_pockets = partial(_register_pockets, base_url=stand_in_server.base_url, retry_queue_path=tmp_path / "q")
+    # Both processes append to the queue while the other one rewrites it in flush_retry_queue.
+    with ProcessPoolExecutor(2) as executor:
+        list(executor.map(register_pockets, ["AB", "CD"]))
+    assert len((tmp_path / "q").read_text(encoding="utf-8").splitlines()) == 40
+
+    stand_in_server.available = True
+    registrar = PocketRegistrar(stand_in_server.base_url, tmp_path / "q")
+    assert registrar.flush_retry_queue() == 40
+    registrar.close()
+    assert len({pocket["pocket_id"] for pocket in stand_in_server.pockets}) == 40
+    assert not (tmp_path / "q").exists()
@@ -0,0 +1,65 @@
+import pytest
+
+from checkmark.crypto import get_crypto_context
+from checkmark.evaluator.decode import decode_solution_token
+from checkmark.payload import SolutionData, decode_solution_payload, encode_solution_payload, is_compact_payload
+
+
+def _solution() -> SolutionData:
+    return SolutionData(17, "2042-01-01", [3, 150, 1, 42, 127, 128], [0, 3, 1, 2, 3, 0])
+
+
+def test_solution_payload_round_trip() -> None:
+    payload = encode_solution_payload(_solution(), "PASSWORD")
+    assert is_compact_payload(payload)
+    assert payload.isalnum()
+    assert payload.upper() == payload
+    assert decode_solution_payload(payload, "PASSWORD") == _solution()
+    # The payload only depends on the solution and the password.
+    assert encode_solution_payload(_solution(), "PASSWORD") == payload
+
+
+def test_solution_payload_is_smaller_than_fernet_token() -> None:
+    solution = SolutionData(0, "2042-01-01", list(range(1, 21)), [index % 4 for index in range(20)])
+    message = "; ".join(
+        [
+            "John Doe",
+            solution.date,
+            " ".join(str(index) for index in solution.question_indices),
+            " ".join(str(option) for option in solution.correct_options),
+        ],
+    )
+    payload = encode_solution_payload(solution, "PASSWORD")
+    assert len(payload) < len(get_crypto_context("PASSWORD").encrypt(message)) / 2
+
+
+def test_solution_payload_is_authenticated() -> None:
+    payload = encode_solution_payload(_solution(), "PASSWORD")
+    with pytest.raises(ValueError, match="Invalid token"):
+        decode_solution_payload(payload, "OTHER")
+
+    tampered_character = b"A" if payload[-1:] != b"A" else b"B"
+    with pytest.raises(ValueError, match="Invalid"):
+        decode_solution_payload(payload[:-1] + tampered_character, "PASSWORD")
+    with pytest.raises(ValueError, match="Unknown solution payload"):
+        decode_solution_payload(b"CM9" + payload[3:], "PASSWORD")
+
+
+def test_solution_payload_invalid_option() -> None:
+    solution = _solution()
+    solution.correct_options[0] = 4
+    with pytest.raises(ValueError, match="2 bits"):
+        encode_solution_payload(solution, "PASSWORD")
+
+
+def test_decode_solution_token_is_backward_compatible() -> None:
+    fernet_token = get_crypto_context("PASSWORD").encrypt("John Doe; 2042-01-01; 3 150 1; 0 3 1")
+    assert decode_solution_token(fernet_token, "PASSWORD") == ("John Doe", "2042-01-01", [3, 150, 1], [0, 3, 1])
+
+    payload = encode_solution_payload(SolutionData(1, "2042-01-01", [3, 150, 1], [0, 3, 1]), "PASSWORD")
+    students = ["Jane Doe", "John Doe"]
+    assert decode_solution_token(payload, "PASSWORD", students) == ("John Doe", "2042-01-01", [3, 150, 1], [0, 3, 1])
+    with pytest.raises(ValueError, match="roster of the pocket is needed"):
+        decode_solution_token(payload, "PASSWORD")
+    with pytest.raises(ValueError, match="not in the roster"):
+        decode_solution_token(payload, "PASSWORD", students[:1])